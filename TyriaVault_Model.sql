@@ -14,9 +14,50 @@ CREATE  TABLE schema_tyriavault.achievements (
 	flags                jsonb    ,
 	icon                 text    ,
 	last_fetched         timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	content_hash         char(64)    ,
 	CONSTRAINT pk_achievements PRIMARY KEY ( id )
  );
 
+CREATE  TABLE schema_tyriavault.build_checks ( 
+	id                   bigint  NOT NULL GENERATED BY DEFAULT AS IDENTITY ( INCREMENT BY 1  MINVALUE 0  ) ,
+	build_id             integer  NOT NULL  ,
+	checked_at           timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	triggered_jobs       jsonb DEFAULT '{}'::jsonb NOT NULL  ,
+	upstream_requests    integer DEFAULT 0 NOT NULL  ,
+	skipped_requests     integer DEFAULT 0 NOT NULL  ,
+	CONSTRAINT pk_build_checks PRIMARY KEY ( id )
+ );
+
+CREATE INDEX idx_build_checks ON schema_tyriavault.build_checks  ( checked_at );
+
+CREATE  TABLE schema_tyriavault.crawl_checkpoints ( 
+	job_name             varchar(60)  NOT NULL  ,
+	status               varchar(20)  NOT NULL  ,
+	started_at           timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	updated_at           timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	watermark            bigint    ,
+	total_ids            integer DEFAULT 0 NOT NULL  ,
+	chunks_done          integer DEFAULT 0 NOT NULL  ,
+	inserted             integer DEFAULT 0 NOT NULL  ,
+	updated              integer DEFAULT 0 NOT NULL  ,
+	unchanged            integer DEFAULT 0 NOT NULL  ,
+	finished_at          timestamptz    ,
+	CONSTRAINT pk_crawl_checkpoints PRIMARY KEY ( job_name )
+ );
+
+CREATE  TABLE schema_tyriavault.crawl_runs ( 
+	id                   bigint  NOT NULL GENERATED BY DEFAULT AS IDENTITY ( INCREMENT BY 1  MINVALUE 0  ) ,
+	job_name             varchar(60)  NOT NULL  ,
+	owner                varchar(120)  NOT NULL  ,
+	started_at           timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	status               varchar(20)  NOT NULL  ,
+	finished_at          timestamptz    ,
+	detail               text    ,
+	CONSTRAINT pk_crawl_runs PRIMARY KEY ( id )
+ );
+
+CREATE INDEX idx_crawl_runs ON schema_tyriavault.crawl_runs  ( job_name, started_at );
+
 CREATE  TABLE schema_tyriavault.currencies ( 
 	id                   integer  NOT NULL GENERATED BY DEFAULT AS IDENTITY ( INCREMENT BY 1  MINVALUE 0  ) ,
 	name_es              varchar(100)  NOT NULL  ,
@@ -119,14 +160,19 @@ CREATE  TABLE schema_tyriavault.items_cache (
 	vendor_value         integer DEFAULT 0   ,
 	flags                jsonb    ,
 	last_fetched         timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL  ,
+	content_hash         char(64)    ,
 	CONSTRAINT pk_items_cache PRIMARY KEY ( id ),
 	CONSTRAINT fk_items_cache_item_type FOREIGN KEY ( item_type_id ) REFERENCES schema_tyriavault.item_types( id ) ON DELETE CASCADE ON UPDATE CASCADE ,
 	CONSTRAINT fk_items_cache_rarities FOREIGN KEY ( rarity_id ) REFERENCES schema_tyriavault.rarities( id ) ON DELETE CASCADE ON UPDATE CASCADE 
  );
 
-CREATE INDEX idx_items_cache_1 ON schema_tyriavault.items_cache  ( rarity_id );
+CREATE INDEX idx_items_cache_1 ON schema_tyriavault.items_cache  ( rarity_id, id );
 
-CREATE INDEX idx_items_cache_0 ON schema_tyriavault.items_cache  ( item_type_id );
+CREATE INDEX idx_items_cache_0 ON schema_tyriavault.items_cache  ( item_type_id, id );
+
+CREATE INDEX idx_items_cache_2 ON schema_tyriavault.items_cache  ( item_type_id, rarity_id, id );
+
+CREATE INDEX idx_items_cache_3 ON schema_tyriavault.items_cache  ( required_level, id );
 
 CREATE  TABLE schema_tyriavault.unlocked_dyes ( 
 	id                   integer  NOT NULL GENERATED BY DEFAULT AS IDENTITY ( INCREMENT BY 1  MINVALUE 0  ) ,
@@ -172,6 +218,7 @@ CREATE  TABLE schema_tyriavault.api_keys (
 	permissions          jsonb    ,
 	game_account_id      integer    ,
 	last_time_checked    timestamptz    ,
+	last_used            timestamptz    ,
 	CONSTRAINT pk_api_keys PRIMARY KEY ( id ),
 	CONSTRAINT fk_api_keys_game_accounts FOREIGN KEY ( game_account_id ) REFERENCES schema_tyriavault.game_accounts( id ) ON DELETE SET NULL ON UPDATE CASCADE 
  );
@@ -181,8 +228,9 @@ CREATE UNIQUE INDEX unq_api_keys ON schema_tyriavault.api_keys ( api_key );
 CREATE INDEX idx_api_keys ON schema_tyriavault.api_keys  ( game_account_id );
 
 CREATE  TABLE schema_tyriavault.bank ( 
-	id                   integer  NOT NULL  ,
+	id                   bigint  NOT NULL GENERATED BY DEFAULT AS IDENTITY ( INCREMENT BY 1  MINVALUE 0  ) ,
 	game_account_id      integer  NOT NULL  ,
+	slot                 integer  NOT NULL  ,
 	item_id              bigint    ,
 	stack_count          integer    ,
 	charges              integer    ,
@@ -191,7 +239,8 @@ CREATE  TABLE schema_tyriavault.bank (
 	dye03_id             integer    ,
 	dye04_id             integer    ,
 	CONSTRAINT pk_bank PRIMARY KEY ( id ),
-	CONSTRAINT unq_bank_game_account_id UNIQUE ( game_account_id ) ,
+	CONSTRAINT unq_bank_slot UNIQUE ( game_account_id, slot ) ,
+	CONSTRAINT fk_bank_game_accounts FOREIGN KEY ( game_account_id ) REFERENCES schema_tyriavault.game_accounts( id ) ON DELETE CASCADE ON UPDATE CASCADE ,
 	CONSTRAINT fk_bank_items_cache FOREIGN KEY ( item_id ) REFERENCES schema_tyriavault.items_cache( id ) ON DELETE SET NULL ON UPDATE CASCADE ,
 	CONSTRAINT fk_bank_dyes FOREIGN KEY ( dye01_id ) REFERENCES schema_tyriavault.dyes( id )   ,
 	CONSTRAINT fk_bank_dyes_0 FOREIGN KEY ( dye02_id ) REFERENCES schema_tyriavault.dyes( id )   ,
@@ -258,6 +307,16 @@ COMMENT ON COLUMN schema_tyriavault.worlds.name_en IS 'Name in english';
 
 COMMENT ON COLUMN schema_tyriavault.worlds.name_de IS 'Name in german';
 
+COMMENT ON TABLE schema_tyriavault.bank IS 'Non empty bank slots of a given game account';
+
+COMMENT ON COLUMN schema_tyriavault.bank.slot IS 'Position of the slot in the bank, from 0';
+
+COMMENT ON TABLE schema_tyriavault.build_checks IS 'Every poll of the GW2 /v2/build endpoint and the catalogue crawls it triggered';
+
+COMMENT ON TABLE schema_tyriavault.crawl_checkpoints IS 'Progress of the resumable crawls, written in the same transaction as every batch';
+
+COMMENT ON TABLE schema_tyriavault.crawl_runs IS 'Every run of a scheduled job, executed by the elected leader instance';
+
 COMMENT ON TABLE schema_tyriavault.game_accounts IS 'Table holding info about the game account of GW2';
 
 COMMENT ON COLUMN schema_tyriavault.game_accounts.id IS 'Game account ID -> Auto generated by TyriaAccount';
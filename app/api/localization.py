@@ -0,0 +1,50 @@
+from fastapi import HTTPException, Query
+from fastapi.params import Header
+
+# Languages of the localized columns (name_<lang>, description_<lang>)
+LANGUAGES = ("en", "es", "de", "fr")
+
+
+def parse_accept_language(header: str | None) -> str | None:
+    """
+    Picks the supported language the client prefers from an Accept-Language header,
+    e.g. "fr-CH, fr;q=0.9, en;q=0.8" -> "fr".
+    :return: None if no supported language is accepted.
+    """
+    best, best_q = None, 0.0
+    for part in (header or "").split(","):
+        tag, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        lang = tag.strip().split("-")[0].lower()
+        # Ties keep the first listed language
+        if lang in LANGUAGES and q > best_q:
+            best, best_q = lang, q
+    return best
+
+
+def get_lang(
+        lang: str | None = Query(None, description=f"Return only the texts in this language: {', '.join(LANGUAGES)}"),
+        accept_language: str | None = Header(None, description="Used when `lang` is not given")) -> str | None:
+    """
+    Language of the localized texts requested by the client, `lang` first then Accept-Language.
+    With a language, routes return flat `name` / `description` fields instead of every name_<lang> column.
+    :return: None if the client asked for none, every language is then returned.
+    :raise HTTPException: 400 on an unsupported `lang`.
+    """
+    if lang is not None:
+        if lang not in LANGUAGES:
+            raise HTTPException(status_code=400, detail=f"Unsupported language: {lang}")
+        return lang
+    return parse_accept_language(accept_language)
+
+
+def localized_name(column: str) -> str | None:
+    """The flat field of a localized column ("name_fr" -> "name"), None for the other columns."""
+    base, _, lang = column.rpartition("_")
+    return base if base and lang in LANGUAGES else None
@@ -0,0 +1,130 @@
+import asyncio
+import gzip
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.api.responses import STALE_RESPONSE_HEADERS, encode_json
+from app.core.config import settings
+
+
+@dataclass
+class PrecomputedResponse:
+    """
+    A JSON response body serialized and compressed once, served as is to every request.
+    Both representations have their own strong ETag, the gzipped one being `etag` with a "-gzip" suffix.
+    """
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    built_at: float
+    stale: bool = False
+
+    @classmethod
+    def from_content(cls, content, stale: bool = False) -> "PrecomputedResponse":
+        """:param content: JSON compatible content, e.g. a list of row dicts."""
+        body = encode_json(content)
+        return cls(
+            body=body,
+            gzip_body=gzip.compress(body, mtime=0),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            built_at=time.monotonic(),
+            stale=stale,
+        )
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+    def matches(self, if_none_match: str | None, etag: str | None = None) -> bool:
+        """:param etag: ETag of the served representation, `etag` (identity) by default."""
+        if not if_none_match:
+            return False
+        # If-None-Match uses the weak comparison: W/"x" matches "x"
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or (etag or self.etag) in candidates
+
+
+@dataclass
+class StaleContent:
+    """Content built from stale GW2 data: returned by a build to be served (flagged) once, but not cached."""
+    content: object
+
+
+class PrecomputedResponseCache:
+    """
+    In-process cache of whole API responses for rarely changing data (e.g. the worlds list).
+
+    A response is built once (query, serialization, gzip, ETag) and then served as bytes. Requests with
+    a matching If-None-Match get a 304 without building anything nor touching the database.
+    Entries are dropped by `invalidate`, called in every worker through the Postgres change notifications
+    (see app.db.notifications), and expire after `ttl` seconds in case a notification was missed.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, PrecomputedResponse] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Bumped by invalidate, so a build that started before an invalidation is not kept
+        self._generation = 0
+
+    def peek(self, name: str) -> PrecomputedResponse | None:
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.built_at >= self.ttl:
+            return None
+        return entry
+
+    async def get(self, name: str, build: Callable[[], Awaitable[object]]) -> PrecomputedResponse:
+        """
+        Returns the cached response `name`, building it with `build` (which returns the content to serialize,
+        or a StaleContent) if missing or expired. Concurrent misses share one build.
+        """
+        entry = self.peek(name)
+        if entry is not None:
+            return entry
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            entry = self.peek(name)
+            if entry is not None:
+                return entry
+            generation = self._generation
+            content = await build()
+            if isinstance(content, StaleContent):
+                return PrecomputedResponse.from_content(content.content, stale=True)
+            entry = PrecomputedResponse.from_content(content)
+            if generation == self._generation:
+                self._entries[name] = entry
+            return entry
+
+    def invalidate(self, name: str | None = None):
+        """Drops the response `name` and its variants (e.g. "worlds:en"), or every response when None."""
+        self._generation += 1
+        if name is None:
+            self._entries.clear()
+        else:
+            for key in [key for key in self._entries if key == name or key.startswith(f"{name}:")]:
+                del self._entries[key]
+
+    @staticmethod
+    def respond(request: Request, entry: PrecomputedResponse) -> Response:
+        """
+        Turns a cached response into a 200, gzipped when accepted, or a 304 when the client has the selected
+        representation already.
+        """
+        gzipped = "gzip" in request.headers.get("accept-encoding", "")
+        etag = entry.gzip_etag if gzipped else entry.etag
+        # The language of the cached responses may come from Accept-Language
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding, Accept-Language"}
+        if entry.stale:
+            headers.update(STALE_RESPONSE_HEADERS)
+        if entry.matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            return Response(content=entry.gzip_body, media_type="application/json",
+                            headers={**headers, "Content-Encoding": "gzip"})
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = PrecomputedResponseCache(ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
-from . import common, worlds, account
+from . import common, worlds, account, crawls, items
 
 api_router = APIRouter()
 api_router.include_router(common.router)
 api_router.include_router(account.router)
 api_router.include_router(worlds.router)
+api_router.include_router(crawls.router)
+api_router.include_router(items.router)
@@ -1,19 +1,39 @@
+import time
+
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from fastapi.params import Header, Depends
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.api.responses import mark_stale
+from app.api.v1.schemas import GameAccountOut
+from app.core.token_cache import RejectedToken, token_cache
 from app.core.utils import split_bearer_token
+from app.crawlers.account_sync import LAST_USED_PRECISION, mark_api_key_used
 from app.db.dependency import get_db
 from app.db.model import GameAccounts, ApiKeys
 from app.gw2.client import GW2Client
 
 router = APIRouter(prefix="/account", tags=["account"])
 
+# Built once: only the columns of GameAccountOut are loaded
+ACCOUNT_COLUMNS = load_only(GameAccounts.id, GameAccounts.account_name, GameAccounts.world_id,
+                            GameAccounts.creation_date, GameAccounts.fractal_level, GameAccounts.last_modified)
+# The key columns fill the token cache, the account is outer joined: a known key may not be linked yet
+ACCOUNT_BY_TOKEN_QUERY = (
+    select(ApiKeys.id, ApiKeys.permissions, ApiKeys.game_account_id, ApiKeys.last_time_checked, GameAccounts)
+    .options(ACCOUNT_COLUMNS)
+    .outerjoin(GameAccounts, GameAccounts.id == ApiKeys.game_account_id)
+    .filter(ApiKeys.api_key == bindparam("token"))
+)
+
 
-@router.get("/", summary="Account summary", response_description="Account details")
+@router.get("/", summary="Account summary", response_description="Account details",
+            response_model=GameAccountOut | None)
 async def account_details(
+        response: Response,
         authorization: str = Header(..., description="Authorization header: Bearer <API_KEY>"),
         db: AsyncSession = Depends(get_db)):
     try:
@@ -21,18 +41,40 @@ async def account_details(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    cached = token_cache.lookup(token)
+    if isinstance(cached, RejectedToken):
+        raise HTTPException(status_code=cached.status_code, detail=cached.detail)
+
+    # Keeps the account of an active user fresh, see AccountSyncScheduler. Skipped while the write would be a no-op
+    if cached is None or cached.marked_used_at is None \
+            or time.monotonic() - cached.marked_used_at >= LAST_USED_PRECISION.total_seconds():
+        await mark_api_key_used(db, token)
+        await db.commit()
+        if cached is not None:
+            cached.marked_used_at = time.monotonic()
+
     # First we look in the DB if we have an account associated with this token
-    result = await db.execute(
-        select(GameAccounts)
-        .join(ApiKeys, GameAccounts.id == ApiKeys.game_account_id)
-        .filter(ApiKeys.api_key == token)
-    )
-    game_account = result.scalars().first()
+    if cached is not None and cached.game_account_id is not None:
+        game_account = await db.get(GameAccounts, cached.game_account_id, options=[ACCOUNT_COLUMNS])
+    else:
+        row = (await db.execute(ACCOUNT_BY_TOKEN_QUERY, {"token": token})).first()
+        game_account = row.GameAccounts if row is not None else None
+        if row is not None:
+            entry = token_cache.store(token, row.id, row.permissions, row.game_account_id, row.last_time_checked)
+            # Marked just above
+            entry.marked_used_at = time.monotonic()
 
     # No account found in DB -> Lets check with GW2 API
     if game_account is None:
         gw2 = GW2Client(api_key=token)
-        game_account_info_from_api = await _get_account_info_from_api(gw2)
+        try:
+            game_account_info_from_api = await _get_account_info_from_api(gw2)
+        except HTTPException as e:
+            if e.status_code in (401, 403):
+                token_cache.reject(token, e.status_code, e.detail)
+            raise
+        if gw2.last_response_stale:
+            mark_stale(response)
         if game_account_info_from_api:
             # Store the valid account in the database
             new_game_account = GameAccounts(
@@ -1,16 +1,32 @@
 import httpx
 from fastapi import APIRouter, Response, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.params import Header, Depends
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.api.responses import mark_stale
+from app.api.v1.schemas import HealthOut, TokenInfoOut
+from app.core.token_cache import RejectedToken, TokenCache, token_cache
 from app.core.utils import split_bearer_token
+from app.core.warmup import warmup
 from app.db.dependency import get_db
 from app.db.model import ApiKeys
-from app.gw2.client import GW2Client
+from app.db.notifications import notify_changed
+from app.gw2.client import GW2Client, get_gw2_circuit_breakers, get_gw2_response_cache, \
+    get_gw2_token_response_cache
 
 router = APIRouter(prefix="/common", tags=["common"])
 
+# Built once: only the columns of TokenInfoOut are loaded
+TOKEN_INFO_QUERY = (
+    select(ApiKeys)
+    .options(load_only(ApiKeys.id, ApiKeys.api_key, ApiKeys.permissions, ApiKeys.game_account_id,
+                       ApiKeys.last_time_checked))
+    .filter(ApiKeys.api_key == bindparam("token"))
+)
+
 
 @router.get("/status", summary="Health Check", response_description="Service is alive")
 def status():
@@ -24,18 +40,56 @@ def status():
     return Response(content="alive", media_type="text/plain", status_code=200)
 
 
-@router.get("/tokeninfo", summary="Provides info about the API key", response_description="API Key info")
+@router.get("/ready", summary="Readiness Check", response_description="Background warm-up progress")
+def ready():
+    """
+    Readiness endpoint, unlike `/status` (liveness) it reports the background warm-up run after startup.
+    Failed warm-up steps do not block readiness: the data is served from the database and crawled again later.
+    :return:
+    - 200 OK with "ready" status once every warm-up step finished.
+    - 503 Service Unavailable with "warming_up" status and the progress of every step otherwise.
+    """
+    return JSONResponse(content=warmup.snapshot(), status_code=200 if warmup.ready else 503)
+
+
+@router.get("/health", summary="Upstream health", response_description="GW2 API circuit breakers state",
+            response_model=HealthOut)
+def health():
+    """
+    Reports the state of the GW2 API circuit breakers and the response cache counters.
+    :return:
+    - 200 OK with "ok" status when every circuit is closed.
+    - 200 OK with "degraded" status when some GW2 endpoint is failing fast or serving stale data.
+    """
+    circuit_breakers = get_gw2_circuit_breakers()
+    response_cache = get_gw2_response_cache()
+    token_response_cache = get_gw2_token_response_cache()
+    degraded = circuit_breakers is not None and circuit_breakers.any_open()
+    return {
+        "status": "degraded" if degraded else "ok",
+        "circuit_breakers": circuit_breakers.snapshot() if circuit_breakers is not None else {},
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+        "token_response_cache": token_response_cache.stats() if token_response_cache is not None else None,
+        "token_cache": token_cache.stats(),
+    }
+
+
+@router.get("/tokeninfo", summary="Provides info about the API key", response_description="API Key info",
+            response_model=TokenInfoOut | None)
 async def check_token_info(
+        response: Response,
         authorization: str = Header(..., description="Authorization header: Bearer <API_KEY>"),
         db: AsyncSession = Depends(get_db)):
     """
     Validates the provided API key and retrieves its information.
     If the key is not found in the local database, it checks with the Guild Wars 2 API.
     If valid, the key is stored in the local database for future requests.
+    Lookups are cached in memory (see TokenCache), keys rejected by the GW2 API included.
     :param authorization:
     :param db:
     :return:
-    - 200 OK with API key information if the key is valid.
+    - 200 OK with API key information if the key is valid, with a `Warning: 110` header if the GW2 API is
+      failing and its last known good answer was used.
     - 400 Bad Request if the authorization header format is invalid.
     - 401 Unauthorized if the API key is missing or invalid.
     - 403 Forbidden if the API key is unauthorized.
@@ -48,13 +102,29 @@ async def check_token_info(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    result = await db.execute(select(ApiKeys).filter(ApiKeys.api_key == token))
+    cached = token_cache.lookup(token)
+    if isinstance(cached, RejectedToken):
+        raise HTTPException(status_code=cached.status_code, detail=cached.detail)
+    if cached is not None:
+        return TokenInfoOut(id=cached.api_key_id, api_key=token, permissions=cached.permissions,
+                            game_account_id=cached.game_account_id, last_time_checked=cached.last_time_checked)
+
+    result = await db.execute(TOKEN_INFO_QUERY, {"token": token})
     token_info = result.scalars().first()
 
     # No token found in DB -> check if it's valid with GW2 API
+    stale = False
     if token_info is None:
         gw2 = GW2Client(api_key=token)
-        token_info_from_api = await _get_token_info_from_api(gw2)
+        try:
+            token_info_from_api = await _get_token_info_from_api(gw2)
+        except HTTPException as e:
+            if e.status_code in (401, 403):
+                token_cache.reject(token, e.status_code, e.detail)
+            raise
+        stale = gw2.last_response_stale
+        if stale:
+            mark_stale(response)
         if token_info_from_api and token_info_from_api["permissions"] is not None:
             # Store the valid token in the database
             new_api_key = ApiKeys(
@@ -64,10 +134,16 @@ async def check_token_info(
             )
 
             db.add(new_api_key)
+            # Other workers may still refuse this key from their negative cache
+            await notify_changed(db, TokenCache.changed_payload(token))
             await db.commit()
             await db.refresh(new_api_key)
             token_info = new_api_key
 
+    # A stale answer is not cached: the key may have been revoked since
+    if token_info is not None and not stale:
+        token_cache.store(token, token_info.id, token_info.permissions, token_info.game_account_id,
+                          token_info.last_time_checked)
     return token_info
 
 
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.params import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.schemas import CrawlCheckpointOut
+from app.db.dependency import get_db
+from app.db.model import CrawlCheckpoints
+
+router = APIRouter(prefix="/crawls", tags=["crawls"])
+
+
+@router.get("/", summary="Progress of the resumable crawls", response_description="Crawl checkpoints",
+            response_model=list[CrawlCheckpointOut])
+async def list_crawls(db: AsyncSession = Depends(get_db)):
+    """
+    Returns the checkpoint of every crawl job: status, id watermark and counts.
+    :return:
+    - 200 OK with the list of checkpoints.
+    """
+    result = await db.execute(select(CrawlCheckpoints).order_by(CrawlCheckpoints.job_name))
+    return result.scalars().all()
+
+
+@router.get("/{job_name}", summary="Progress of a crawl", response_description="Crawl checkpoint",
+            response_model=CrawlCheckpointOut)
+async def get_crawl(job_name: str, db: AsyncSession = Depends(get_db)):
+    """
+    Returns the checkpoint of a crawl job, e.g. "items".
+    :return:
+    - 200 OK with the checkpoint.
+    - 404 Not Found if the job never ran.
+    """
+    checkpoint = await db.get(CrawlCheckpoints, job_name)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail=f"No crawl named {job_name}")
+    return checkpoint
@@ -1,14 +1,214 @@
-from fastapi import APIRouter, Response
+import datetime
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.params import Depends
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.localization import get_lang, localized_name
+from app.api.v1.schemas import ItemsBatch, ItemsBatchIn, ItemsPage
+from app.core.config import settings
+from app.crawlers.items_crawler import iter_item_chunks, merge_items, upsert_items
+from app.db.dependency import get_db
+from app.db.model import ItemsCache
+from app.gw2.client import GW2Client
+from app.gw2.rate_limiter import Priority
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+# Columns selectable with `fields`. The content hash is internal
+ITEM_FIELDS = tuple(column.name for column in ItemsCache.__table__.columns if column.name != "content_hash")
+
+
+class UnknownItemIds:
+    """Bounded TTL set of the ids GW2 does not know, so repeated batches do not ask for them again."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._expires_at: OrderedDict[int, float] = OrderedDict()
+
+    def __contains__(self, item_id: int) -> bool:
+        expires_at = self._expires_at.get(item_id)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._expires_at[item_id]
+            return False
+        return expires_at is not None
+
+    def add(self, item_ids: list[int]):
+        expires_at = time.monotonic() + self.ttl
+        for item_id in item_ids:
+            self._expires_at[item_id] = expires_at
+            self._expires_at.move_to_end(item_id)
+        while len(self._expires_at) > self.max_entries:
+            self._expires_at.popitem(last=False)
+
+
+unknown_item_ids = UnknownItemIds(max_entries=settings.ITEMS_BATCH_UNKNOWN_CACHE_SIZE,
+                                  ttl=settings.ITEMS_BATCH_UNKNOWN_TTL_SECONDS)
+
+
+def parse_fields(fields: str | None, lang: str | None = None) -> list[str]:
+    """
+    Parses a comma separated `fields` parameter. The id is always returned, it is the pagination cursor.
+    With a language, the localized columns are returned as flat `name` and `description` fields by default,
+    and those can be requested too.
+    :raise ValueError: On unknown fields.
+    """
+    flat_fields = list(dict.fromkeys(localized_name(field) or field for field in ITEM_FIELDS))
+    if not fields:
+        return list(ITEM_FIELDS) if lang is None else flat_fields
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    available = set(ITEM_FIELDS) if lang is None else {*ITEM_FIELDS, *flat_fields}
+    unknown = [field for field in requested if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id", *(field for field in dict.fromkeys(requested) if field != "id")]
+
+
+def source_column(field: str, lang: str | None) -> str:
+    """The items_cache column of a field returned by parse_fields ("name" -> "name_<lang>")."""
+    return field if field in ITEM_FIELDS else f"{field}_{lang}"
+
+
+def item_columns(fields: list[str], lang: str | None) -> list:
+    # Only the requested language is read, labeled with the flat field name
+    columns = ItemsCache.__table__.c
+    return [columns[field] if field in ITEM_FIELDS else columns[source_column(field, lang)].label(field)
+            for field in fields]
+
 
-@router.get("/", summary="Returns cached items", response_description="Cached Items")
-def items_cached_list():
+@router.get("/", summary="Browse cached items", response_description="A page of cached items",
+            response_model=ItemsPage, response_model_exclude_unset=True)
+async def items_cached_list(
+        rarity_id: int | None = Query(None, description="Only items of this rarity"),
+        item_type_id: int | None = Query(None, description="Only items of this type"),
+        min_level: int | None = Query(None, ge=0, description="Minimum required level, inclusive"),
+        max_level: int | None = Query(None, ge=0, description="Maximum required level, inclusive"),
+        fields: str | None = Query(None, description="Comma separated columns to return, e.g. id,name_en,icon"),
+        cursor: int | None = Query(None, description="`next_cursor` of the previous page"),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Items per page"),
+        lang: str | None = Depends(get_lang),
+        db: AsyncSession = Depends(get_db)):
     """
-    Returns al cached items
+    Returns the cached items ordered by id, one page at a time.
+    Pages are keyset paginated (WHERE id > cursor), so a deep page costs the same as the first one,
+    and the filters match the (filter, id) indexes of items_cache.
+    With `lang` (or Accept-Language), only that language is read and returned as `name` / `description`.
     :return:
-    - 200 OK with "alive" message if the service is running.
-    - 500 Internal Server Error if the service is down.
+    - 200 OK with {"items": [...], "next_cursor": id of the last item, or null on the last page}.
+    - 400 Bad Request on unknown fields, an unsupported language or an empty level range.
     """
-    return Response(content="alive", media_type="text/plain", status_code=200)
+    try:
+        columns = parse_fields(fields, lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if min_level is not None and max_level is not None and min_level > max_level:
+        raise HTTPException(status_code=400, detail="min_level is greater than max_level")
+
+    stmt = select(*item_columns(columns, lang))
+    if rarity_id is not None:
+        stmt = stmt.where(ItemsCache.rarity_id == rarity_id)
+    if item_type_id is not None:
+        stmt = stmt.where(ItemsCache.item_type_id == item_type_id)
+    if min_level is not None:
+        stmt = stmt.where(ItemsCache.required_level >= min_level)
+    if max_level is not None:
+        stmt = stmt.where(ItemsCache.required_level <= max_level)
+    if cursor is not None:
+        stmt = stmt.where(ItemsCache.id > cursor)
+    # One extra row tells whether there is a next page, without a COUNT
+    stmt = stmt.order_by(ItemsCache.id).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    return {"items": items, "next_cursor": items[-1]["id"] if len(rows) > limit else None}
+
+
+@router.post("/batch", summary="Resolve items by id", response_description="The requested items",
+             response_model=ItemsBatch, response_model_exclude_unset=True)
+async def items_batch(
+        body: ItemsBatchIn,
+        fields: str | None = Query(None, description="Comma separated columns to return, e.g. id,name_en,icon"),
+        lang: str | None = Depends(get_lang),
+        db: AsyncSession = Depends(get_db)):
+    """
+    Returns the requested items, e.g. every item of a bank or a recipe tree, in one call.
+    Cached items are read with a single `id = ANY(:ids)` query. Up to ITEMS_BATCH_MAX_FETCH misses are fetched
+    from the GW2 API in the crawler lane (every language concurrently), written back with one upsert and merged
+    into the response. Ids GW2 does not know are remembered for ITEMS_BATCH_UNKNOWN_TTL_SECONDS.
+    `lang` (or Accept-Language) selects the returned language, like for the browse endpoint.
+    :return:
+    - 200 OK with {"items": [...], "cached": ids read from items_cache, "fetched": ids fetched from the GW2 API,
+      "missing": ids the GW2 API does not know, "deferred": misses over the fetch cap, to be requested again}.
+    - 400 Bad Request on unknown fields, an unsupported language, or no ids or more than MAX_BATCH_SIZE.
+    - 503 Service Unavailable if there is a connection failure to the Guild Wars 2 API.
+    """
+    try:
+        columns = parse_fields(fields, lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ids = list(dict.fromkeys(body.ids))
+    if not ids or len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_BATCH_SIZE} ids are accepted")
+
+    # One array parameter, whatever the number of ids: a single statement for the whole batch
+    stmt = (
+        select(*item_columns(columns, lang))
+        .where(ItemsCache.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+    )
+    found = {row["id"]: dict(row) for row in (await db.execute(stmt)).mappings().all()}
+    cached = [item_id for item_id in ids if item_id in found]
+    misses = [item_id for item_id in ids if item_id not in found and item_id not in unknown_item_ids]
+    # A batch must not spend the shared GW2 quota of the interactive traffic
+    misses, deferred = misses[:settings.ITEMS_BATCH_MAX_FETCH], misses[settings.ITEMS_BATCH_MAX_FETCH:]
+
+    fetched = []
+    if misses:
+        item_rows = await fetch_items(db, misses)
+        fetched_at = datetime.datetime.now(datetime.timezone.utc)
+        for row in item_rows:
+            row = {**row, "last_fetched": fetched_at}
+            found[row["id"]] = {column: row[source_column(column, lang)] for column in columns}
+        fetched = [item_id for item_id in misses if item_id in found]
+        unknown_item_ids.add([item_id for item_id in misses if item_id not in found])
+
+    deferred_ids = set(deferred)
+    missing = [item_id for item_id in ids if item_id not in found and item_id not in deferred_ids]
+    logging.info(f"Items batch: {len(cached)} cached, {len(fetched)} fetched, {len(missing)} missing, "
+                 f"{len(deferred)} deferred")
+    return {"items": [found[item_id] for item_id in ids if item_id in found], "cached": cached, "fetched": fetched,
+            "missing": missing, "deferred": deferred}
+
+
+async def fetch_items(db: AsyncSession, ids: list[int]) -> list[dict]:
+    """
+    Fetches items missing from items_cache and stores them, like the items crawler does.
+    :return: The stored items_cache rows. Ids unknown to the GW2 API (or of an unknown type or rarity) are absent.
+    """
+    gw2 = GW2Client(priority=Priority.CRAWLER)
+    item_rows = []
+    detail_rows = []
+    try:
+        async for pages_by_lang in iter_item_chunks(gw2, ids):
+            chunk_items, chunk_details = merge_items(pages_by_lang)
+            item_rows.extend(chunk_items)
+            detail_rows.extend(chunk_details)
+
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=503, detail=f"Conection failure: {str(e)}")
+
+    if item_rows:
+        await upsert_items(db, item_rows, detail_rows)
+        await db.commit()
+    return item_rows
@@ -0,0 +1,100 @@
+import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+# Response models of the v1 routes. They are built from the ORM objects loaded with `load_only` or from Core rows,
+# so only the listed columns are read and serialized (no relationship is ever touched).
+
+
+class ApiSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TokenInfoOut(ApiSchema):
+    id: int
+    api_key: str
+    permissions: list[str] | None = None
+    game_account_id: int | None = None
+    last_time_checked: datetime.datetime | None = None
+
+
+class GameAccountOut(ApiSchema):
+    id: int
+    account_name: str
+    world_id: int | None = None
+    creation_date: datetime.datetime
+    fractal_level: int
+    last_modified: datetime.datetime
+
+
+class WorldOut(ApiSchema):
+    # Either the name in the requested language, or the four names when no language was requested
+    id: int
+    name: str | None = None
+    name_es: str | None = None
+    name_fr: str | None = None
+    name_en: str | None = None
+    name_de: str | None = None
+
+
+class ItemOut(ApiSchema):
+    # Every field but the id is optional: the `fields` parameter selects the returned ones
+    id: int
+    name: str | None = None
+    name_es: str | None = None
+    name_fr: str | None = None
+    name_en: str | None = None
+    name_de: str | None = None
+    item_type_id: int | None = None
+    rarity_id: int | None = None
+    last_fetched: datetime.datetime | None = None
+    chat_link: str | None = None
+    icon: str | None = None
+    required_level: int | None = None
+    vendor_value: int | None = None
+    flags: list[str] | None = None
+    description: str | None = None
+    description_es: str | None = None
+    description_fr: str | None = None
+    description_en: str | None = None
+    description_de: str | None = None
+
+
+class ItemsPage(ApiSchema):
+    items: list[ItemOut]
+    next_cursor: int | None = None
+
+
+class ItemsBatchIn(BaseModel):
+    ids: list[int]
+
+
+class ItemsBatch(ApiSchema):
+    # Items in the order of the requested ids. Every id is listed once in cached, fetched, missing or deferred
+    items: list[ItemOut]
+    cached: list[int]
+    fetched: list[int]
+    missing: list[int]
+    deferred: list[int]
+
+
+class CrawlCheckpointOut(ApiSchema):
+    job_name: str
+    status: str
+    started_at: datetime.datetime
+    updated_at: datetime.datetime
+    watermark: int | None = None
+    total_ids: int
+    chunks_done: int
+    inserted: int
+    updated: int
+    unchanged: int
+    finished_at: datetime.datetime | None = None
+
+
+class HealthOut(ApiSchema):
+    status: str
+    circuit_breakers: dict[str, dict]
+    response_cache: dict | None = None
+    token_response_cache: dict | None = None
+    token_cache: dict | None = None
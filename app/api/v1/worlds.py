@@ -1,33 +1,71 @@
 import asyncio
 
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
 from fastapi.params import Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.localization import get_lang
+from app.api.response_cache import StaleContent, response_cache
+from app.api.v1.schemas import WorldOut
 from app.db.dependency import get_db
 from app.db.model import Worlds
+from app.db.notifications import notify_changed
 from app.gw2.client import GW2Client
 
 router = APIRouter(prefix="/worlds", tags=["worlds"])
 
 
-@router.get("/", summary="Provides info about worlds", response_description="Worlds info")
-async def get_worlds(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Worlds))
-    worlds_info = result.scalars().all()
+# The route returns the cached bytes as is: the model only documents them, no response_model is applied
+@router.get("/", summary="Provides info about worlds", response_class=JSONResponse,
+            responses={200: {"model": list[WorldOut], "description": "Worlds info"},
+                       304: {"description": "The client has the current version (If-None-Match)"}})
+async def get_worlds(request: Request, lang: str | None = Depends(get_lang), db: AsyncSession = Depends(get_db)):
+    """
+    Returns every world. The response is built once and cached until the worlds change (see response_cache).
+    With `lang` (or Accept-Language), every world has a single `name` in that language instead of the four names.
+    :return:
+    - 200 OK with the worlds, gzipped if accepted, and their ETag.
+    - 304 Not Modified if If-None-Match matches the current ETag. The database is not queried.
+    - Either with a `Warning: 110` header if the worlds are the last known good GW2 response, served while
+      the GW2 API is failing (not stored nor cached).
+    - 400 Bad Request on an unsupported language.
+    """
+    # One cached response per language: "worlds" (every language), "worlds:en", ...
+    name = "worlds" if lang is None else f"worlds:{lang}"
+    entry = await response_cache.get(name, lambda: load_worlds(db, lang))
+    return response_cache.respond(request, entry)
+
+
+async def load_worlds(db: AsyncSession, lang: str | None = None) -> list[dict] | StaleContent:
+    # Plain rows: the response is serialized straight from them, no ORM object is built
+    if lang is None:
+        columns = (Worlds.name_es, Worlds.name_fr, Worlds.name_en, Worlds.name_de)
+    else:
+        columns = (getattr(Worlds, f"name_{lang}").label("name"),)
+    result = await db.execute(select(Worlds.id, *columns).order_by(Worlds.id))
+    worlds_info = [dict(row) for row in result.mappings().all()]
 
     # No worlds on DB? -> check if the token is valid with GW2 API
     if worlds_info is None or not worlds_info:
         gw2 = GW2Client()
         worlds_info_from_api = await get_worlds_info_from_api(gw2)
+        if worlds_info_from_api is not None and gw2.last_response_stale:
+            if lang is not None:
+                worlds_info_from_api = [{"id": world["id"], "name": world[f"name_{lang}"]}
+                                        for world in worlds_info_from_api]
+            return StaleContent(worlds_info_from_api)
         if worlds_info_from_api is not None:
             # Store the worlds in the database
             for world in worlds_info_from_api:
                 db.add(Worlds(**world))
+            await notify_changed(db, "worlds")
             await db.commit()
             worlds_info = worlds_info_from_api
+            if lang is not None:
+                worlds_info = [{"id": world["id"], "name": world[f"name_{lang}"]} for world in worlds_info]
 
     return worlds_info
 
@@ -22,7 +22,40 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     GW2_API_KEY: str
     FRONTEND_URL: str
+    # Catalogue crawlers only run when the game build changes or their data gets older than these
     WORLDS_CRAWLER_INTERVAL_MINUTES: int = 2880  # 48 hours
+    ITEMS_CRAWLER_INTERVAL_MINUTES: int = 10080  # 7 days
+    CATALOGUE_CRAWLER_INTERVAL_MINUTES: int = 10080  # Currencies, dyes and achievements
+    BUILD_CHECK_INTERVAL_MINUTES: int = 15
+    WALLET_CRAWLER_INTERVAL_MINUTES: int = 60
+    ACCOUNT_SYNC_TICK_SECONDS: int = 60
+    ACCOUNT_SYNC_INTERVAL_MINUTES: int = 60  # Regular accounts
+    ACCOUNT_SYNC_ACTIVE_INTERVAL_MINUTES: int = 5  # Accounts whose owner used the app in the last 30 minutes
+    ACCOUNT_SYNC_DORMANT_INTERVAL_MINUTES: int = 1440  # Accounts not modified in game for a week
+    ACCOUNT_SYNC_MAX_PER_TICK: int = 50
+    WALLET_CRAWLER_CONCURRENCY: int = 8  # Wallets requested at once, the rate limiter paces them further
+    WALLET_CRAWLER_BATCH_SIZE: int = 500  # Accounts per database transaction
+    LEADER_ELECTION_INTERVAL_SECONDS: int = 30  # How often followers try to take over scheduled jobs
+    ITEMS_REVALIDATION_INTERVAL_MINUTES: int = 60
+    ITEMS_REVALIDATION_REQUEST_BUDGET: int = 200  # 50 chunks of 200 ids per run
+    ITEMS_REVALIDATION_TIME_BUDGET_SECONDS: float = 120.0
+    ITEMS_REVALIDATION_MIN_AGE_HOURS: int = 24
+    LAST_FETCHED_RESOLUTION_HOURS: int = 6  # Unchanged rows only get last_fetched rewritten once per this interval
+    ITEMS_BATCH_MAX_FETCH: int = 200  # Cache misses fetched from GW2 per /items/batch request (one chunk)
+    ITEMS_BATCH_UNKNOWN_TTL_SECONDS: int = 3600  # How long ids unknown to GW2 are not asked for again
+    ITEMS_BATCH_UNKNOWN_CACHE_SIZE: int = 50000
+    GW2_BASE_URL: str = "https://api.guildwars2.com/v2"  # Point to app.gw2.fake_server for offline runs
+    GW2_REQUESTS_PER_MINUTE: int = 300
+    GW2_RATE_LIMIT_BURST: int = 50
+    GW2_CRAWLER_MAX_CONCURRENCY: int = 8
+    GW2_RESPONSE_CACHE_SIZE: int = 512
+    GW2_TOKEN_RESPONSE_CACHE_SIZE: int = 256  # Per API key responses, kept apart from the shared ones
+    GW2_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GW2_CIRCUIT_RESET_SECONDS: float = 30.0
+    TOKEN_CACHE_SIZE: int = 10000  # API keys whose lookup is kept in memory, per process
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_NEGATIVE_TTL_SECONDS: int = 30  # How long keys rejected by the GW2 API are refused without a call
+    RESPONSE_CACHE_TTL_SECONDS: int = 600  # Fallback expiry of cached API responses, they are invalidated on change
     LOG_LEVEL: str = "INFO"
 
     model_config = SettingsConfigDict(env_file=env_file, env_file_encoding="utf-8")
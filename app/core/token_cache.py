@@ -0,0 +1,127 @@
+import datetime
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+def token_hash(token: str) -> str:
+    """Keys of the cache: tokens are never kept in memory in clear."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+@dataclass
+class ValidatedToken:
+    """An API key known to be valid, as stored in api_keys."""
+    api_key_id: int
+    permissions: list[str] | None
+    game_account_id: int | None
+    last_time_checked: datetime.datetime | None
+    expires_at: float = 0.0
+    # Last time this process recorded the key as used (see mark_api_key_used), to skip redundant writes
+    marked_used_at: float | None = None
+
+
+@dataclass
+class RejectedToken:
+    """An API key the GW2 API refused (401 or 403), answered from memory until it expires."""
+    status_code: int
+    detail: str
+    expires_at: float = 0.0
+
+
+class TokenCache:
+    """
+    Per-process TTL + LRU cache of API key lookups, keyed by the SHA-256 of the key.
+
+    Valid keys keep their permissions and account id for `ttl` seconds, sparing the api_keys query.
+    Keys rejected upstream are kept for the (short) `negative_ttl`, so a client retrying a bad key costs
+    neither a query nor a GW2 call. Entries are dropped when the api_keys row changes, in every worker,
+    through the Postgres change notifications (see `changed_payload`), and keys found revoked by the account
+    sync are rejected the same way (see `rejected_payload`).
+    """
+
+    # Prefix of the change notifications about an API key, followed by its hash
+    NOTIFICATION_PREFIX = "api_key:"
+    # Prefix of the notifications of a key rejected upstream, followed by "<status code>:<hash>"
+    REJECTION_PREFIX = "api_key_rejected:"
+    # Details answered for the keys rejected through a notification, as the routes word them
+    REJECTION_DETAILS = {401: "Missing or invalid token.", 403: "Missing or unauthorized token."}
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[str, ValidatedToken | RejectedToken] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, token: str) -> ValidatedToken | RejectedToken | None:
+        key = token_hash(token)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry.expires_at:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, token: str, api_key_id: int, permissions: list[str] | None, game_account_id: int | None,
+              last_time_checked: datetime.datetime | None = None) -> ValidatedToken:
+        entry = ValidatedToken(api_key_id, permissions, game_account_id, last_time_checked,
+                               expires_at=time.monotonic() + self.ttl)
+        self._put(token_hash(token), entry)
+        return entry
+
+    def reject(self, token: str, status_code: int, detail: str) -> RejectedToken:
+        return self._reject_hash(token_hash(token), status_code, detail)
+
+    def reject_notified(self, payload: str):
+        """Records the rejection carried by a `rejected_payload` notification."""
+        status_code, _, key = payload.removeprefix(self.REJECTION_PREFIX).partition(":")
+        self._reject_hash(key, int(status_code), self.REJECTION_DETAILS.get(int(status_code), "Rejected token."))
+
+    def _reject_hash(self, key: str, status_code: int, detail: str) -> RejectedToken:
+        entry = RejectedToken(status_code, detail, expires_at=time.monotonic() + self.negative_ttl)
+        self._put(key, entry)
+        return entry
+
+    def _put(self, key: str, entry: ValidatedToken | RejectedToken):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self.invalidate_hash(token_hash(token))
+
+    def invalidate_hash(self, key: str | None):
+        """Drops the entry of a key hash, or every entry when None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    @classmethod
+    def changed_payload(cls, token: str) -> str:
+        """Payload of the change notification telling every worker to drop the cached `token`."""
+        return cls.NOTIFICATION_PREFIX + token_hash(token)
+
+    @classmethod
+    def rejected_payload(cls, token: str, status_code: int) -> str:
+        """Payload of the notification telling every worker to refuse `token`, see `reject`."""
+        return f"{cls.REJECTION_PREFIX}{status_code}:{token_hash(token)}"
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses}
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+                         negative_ttl=settings.TOKEN_CACHE_NEGATIVE_TTL_SECONDS)
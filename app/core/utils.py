@@ -1,3 +1,7 @@
+import hashlib
+import json
+
+
 def split_bearer_token(authorization: str) -> str:
     """
     Extracts the Bearer token from an authorization header string.
@@ -18,3 +22,17 @@ def split_bearer_token(authorization: str) -> str:
         return token
     except ValueError:
         raise ValueError("Invalid authorization header format")
+
+
+def content_hash(payload) -> str:
+    """
+    Computes a stable hash of an upstream payload, used to detect whether cached entities changed.
+
+    Args:
+        payload: JSON serializable data. Key order does not affect the result.
+
+    Returns:
+        str: The hex encoded SHA-256 of the normalized payload.
+    """
+    normalized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
@@ -0,0 +1,66 @@
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+# Approximation of the process start: this module is imported while the application is being loaded
+PROCESS_STARTED = time.monotonic()
+
+
+class WarmupState:
+    """
+    Progress of the background tasks run after startup (seeding, leader election, first crawls...).
+    The application serves requests while they run; `/common/ready` reports their progress.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.steps: dict[str, dict] = {}
+        self.startup_seconds: float | None = None
+        self.first_request_seconds: float | None = None
+
+    def plan(self, *names: str):
+        self.steps = {name: {"status": self.PENDING} for name in names}
+
+    @property
+    def ready(self) -> bool:
+        """Whether startup finished and every warm-up step ended, successfully or not."""
+        return self.startup_seconds is not None and all(
+            step["status"] in (self.DONE, self.FAILED) for step in self.steps.values()
+        )
+
+    async def run(self, name: str, step: Callable[[], Awaitable]):
+        """Runs one warm-up step, recording its status and duration. Failures are logged, not raised."""
+        self.steps[name] = {"status": self.RUNNING}
+        start = time.monotonic()
+        try:
+            await step()
+        except Exception as e:
+            logging.error(f"Warm-up step {name} failed: {e}")
+            self.steps[name] = {"status": self.FAILED, "detail": str(e)}
+        else:
+            self.steps[name] = {"status": self.DONE}
+        self.steps[name]["seconds"] = round(time.monotonic() - start, 3)
+
+    def startup_finished(self):
+        self.startup_seconds = time.monotonic() - PROCESS_STARTED
+        logging.info(f"Startup finished {self.startup_seconds:.2f}s after process start")
+
+    def request_served(self):
+        if self.first_request_seconds is None:
+            self.first_request_seconds = time.monotonic() - PROCESS_STARTED
+            logging.info(f"First request served {self.first_request_seconds:.2f}s after process start")
+
+    def snapshot(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "startup_seconds": self.startup_seconds,
+            "first_request_seconds": self.first_request_seconds,
+            "steps": self.steps,
+        }
+
+
+warmup = WarmupState()
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from app.crawlers.catalogue import CRAWLERS, CrawlerSpec
+from app.crawlers.checkpoints import CrawlCheckpoint
+from app.crawlers.items_crawler import LANGUAGES
+from app.crawlers.pipeline import iter_localized_chunks, run_pipeline
+from app.db.bulk import BulkSyncResult
+from app.db.dependency import get_db
+from app.db.leader import LeaderElection
+from app.db.session import engine
+from app.gw2.client import GW2Client, shutdown_gw2_client, startup_gw2_client
+from app.gw2.rate_limiter import Priority
+
+# Standalone crawler runner, so crawls do not share the event loop and the DB pool of the API workers:
+#
+#   python -m app.crawlers items --concurrency 4 --workers 4 --batch-size 2000
+#   python -m app.crawlers all --every 1440
+#   python -m app.crawlers dyes --dry-run
+#
+# Interrupted crawls resume where they stopped, see app.crawlers.checkpoints.
+# The runner takes the scheduler leader lock for every round, so it never crawls (and moves the same checkpoints)
+# while the leader of the API workers runs its catalogue jobs, and the other way round.
+
+
+async def run_crawler(spec: CrawlerSpec, concurrency: int, workers: int, batch_size: int,
+                      dry_run: bool, restart: bool = False) -> BulkSyncResult:
+    """
+    Crawls one catalogue through the fetch -> normalize -> write pipeline and prints the throughput of every stage.
+    Progress is checkpointed with every batch, an interrupted crawl resumes after the last written chunk.
+    :param dry_run: Fetch and normalize everything, but write nothing (checkpoint included).
+    :param restart: Ignore the checkpoint of an interrupted crawl and start from the first id.
+    """
+    gw2 = GW2Client(priority=Priority.CRAWLER)
+    ids = sorted(await gw2.get_ids(spec.endpoint))
+    result = BulkSyncResult()
+
+    async for db in get_db():
+        checkpoint = CrawlCheckpoint(spec.name)
+        if not dry_run:
+            ids = await checkpoint.start(db, ids, restart=restart)
+            if checkpoint.watermark is not None:
+                print(f"{spec.name}: resuming after id {checkpoint.watermark}, {len(ids)} ids left")
+        source = iter_localized_chunks(gw2, spec.endpoint, ids, LANGUAGES, max_in_flight=concurrency, model=bytes)
+
+        async def write(records: list, completed_chunks: list[int]):
+            nonlocal result
+            if dry_run:
+                return
+            batch_result = await spec.write(db, records)
+            # Only the counts are kept, a full catalogue worth of changed keys is not needed here
+            counts = BulkSyncResult(batch_result.inserted, batch_result.updated, batch_result.unchanged)
+            result += counts
+            checkpoint.result += counts
+            for index in completed_chunks:
+                checkpoint.chunk_done(index)
+            # The checkpoint is committed along with the batch it describes
+            await checkpoint.save(db)
+            await db.commit()
+
+        start = time.monotonic()
+        stats = await run_pipeline(source, spec.normalize, write, workers=workers, batch_size=batch_size)
+        print(f"{spec.name}: {len(ids)} ids in {time.monotonic() - start:.2f}s"
+              f"{' (dry run)' if dry_run else ''}, {result.inserted} inserted, {result.updated} updated, "
+              f"{result.unchanged} unchanged")
+        for stage in stats:
+            print(f"  {stage}")
+        if not dry_run:
+            await checkpoint.complete(db)
+            await db.commit()
+        break
+
+    return result
+
+
+async def run(args):
+    await startup_gw2_client()
+    # Same lock as the API workers: whoever holds it is the only one running crawls
+    election = LeaderElection(engine)
+    try:
+        while True:
+            await election.tick()
+            if election.is_leader:
+                try:
+                    for name in (CRAWLERS if args.crawler == "all" else [args.crawler]):
+                        try:
+                            await run_crawler(CRAWLERS[name], args.concurrency, args.workers, args.batch_size,
+                                              args.dry_run, args.restart)
+                        except Exception as e:
+                            logging.error(f"Crawler {name} failed: {e}")
+                finally:
+                    # Released between rounds, the API workers can run their scheduled jobs meanwhile
+                    await election.stop()
+            elif args.every is None:
+                raise SystemExit("The scheduled jobs leader holds the crawl lock, not crawling")
+            else:
+                logging.warning("The scheduled jobs leader holds the crawl lock, skipping this round")
+            if args.every is None:
+                return
+            await asyncio.sleep(args.every * 60)
+    finally:
+        await shutdown_gw2_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.crawlers", description="Run catalogue crawlers")
+    parser.add_argument("crawler", choices=[*CRAWLERS, "all"])
+    parser.add_argument("--concurrency", type=int, default=4, help="Id chunks requested ahead, per language")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Worker processes decoding and normalizing chunks, 0 to do it in the main process")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per database write")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and normalize, but write nothing")
+    parser.add_argument("--restart", action="store_true",
+                        help="Start from the first id even if the previous crawl was interrupted")
+    parser.add_argument("--every", type=float, default=None, metavar="MINUTES",
+                        help="Keep running, crawling again every MINUTES. Runs once by default")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
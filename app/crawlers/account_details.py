@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from collections.abc import Awaitable
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.bulk import BulkSyncResult, sync_rows, sync_set
+from app.db.model import (Bank, Characters, Dyes, Emotes, GameAccounts, Genders, ItemsCache, Professions, Races,
+                          UnlockedDyes, UnlockedEmotes)
+from app.gw2.client import GW2Client
+from app.gw2.models import BankSlot, Character
+
+
+async def _fetch_section(name: str, fetch: Awaitable):
+    """
+    Fetches one section of the account details. A key without the permission of the section gets a 403:
+    the section is skipped (and left as stored) instead of failing the whole account.
+    """
+    try:
+        return await fetch
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 403:
+            logging.info(f"Skipping the {name} of the account, the API key lacks the permission")
+            return None
+        raise
+
+
+async def _ids_by_english_name(db: AsyncSession, model) -> dict[str, int]:
+    return {name: entry_id for entry_id, name in (await db.execute(select(model.id, model.name_en))).all()}
+
+
+async def _known_ids(db: AsyncSession, model, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    return set((await db.execute(select(model.id).where(model.id.in_(ids)))).scalars().all())
+
+
+async def sync_characters(db: AsyncSession, game_account_id: int, characters: list[Character]) -> BulkSyncResult:
+    races = await _ids_by_english_name(db, Races)
+    genders = await _ids_by_english_name(db, Genders)
+    professions = await _ids_by_english_name(db, Professions)
+
+    rows = []
+    for character in characters:
+        if character.race not in races or character.gender not in genders or character.profession not in professions:
+            logging.warning(f"Skipping character {character.name}: unknown race, gender or profession")
+            continue
+        rows.append({
+            "name": character.name,
+            "race_id": races[character.race],
+            "gender_id": genders[character.gender],
+            "profession_id": professions[character.profession],
+            "char_level": character.level,
+        })
+    # Character names are unique across accounts: a name freed and taken by another account moves its row over
+    return await sync_rows(db, Characters.__table__, {"game_account_id": game_account_id}, ("name",), rows,
+                           conflict_columns=("name",))
+
+
+async def sync_bank(db: AsyncSession, game_account_id: int, slots: list[BankSlot | None]) -> BulkSyncResult:
+    items = await _known_ids(db, ItemsCache, {slot.id for slot in slots if slot is not None})
+    dyes = await _known_ids(db, Dyes, {dye for slot in slots if slot is not None for dye in slot.dyes if dye})
+
+    rows = []
+    for position, slot in enumerate(slots):
+        if slot is None:
+            continue
+        # Items or dyes not crawled yet are stored as null, the slot is updated once they are known
+        slot_dyes = [dye if dye in dyes else None for dye in slot.dyes[:4]] + [None] * (4 - len(slot.dyes[:4]))
+        rows.append({
+            "slot": position,
+            "item_id": slot.id if slot.id in items else None,
+            "stack_count": slot.count,
+            "charges": slot.charges,
+            **{f"dye0{index + 1}_id": dye for index, dye in enumerate(slot_dyes)},
+        })
+    return await sync_rows(db, Bank.__table__, {"game_account_id": game_account_id}, ("slot",), rows)
+
+
+async def sync_unlocked_dyes(db: AsyncSession, game_account_id: int, dye_ids: list[int]) -> BulkSyncResult:
+    known = await _known_ids(db, Dyes, set(dye_ids))
+    return await sync_set(db, UnlockedDyes.__table__, {"game_account_id": game_account_id}, "dye_id", known)
+
+
+async def sync_unlocked_emotes(db: AsyncSession, game_account_id: int, emote_names: list[str]) -> BulkSyncResult:
+    # Emotes are not listed by the API, they are created the first time an account has them
+    if emote_names:
+        await db.execute(
+            insert(Emotes)
+            .values([{"name": name, "command": f"/{name.lower()}"} for name in sorted(set(emote_names))])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+    emote_ids = (await db.execute(select(Emotes.id).where(Emotes.name.in_(emote_names)))).scalars().all() \
+        if emote_names else []
+    return await sync_set(db, UnlockedEmotes.__table__, {"game_account_id": game_account_id}, "emote_id", emote_ids)
+
+
+async def sync_account_details(db: AsyncSession, gw2: GW2Client, game_account: GameAccounts) -> BulkSyncResult:
+    """
+    Synchronizes the characters, bank, unlocked dyes and unlocked emotes of an account by diffing the upstream
+    sets against the stored ones: only the differences are written, so a sync of an account that barely changed
+    barely writes. Runs in the transaction of the caller (one per account). Does not commit.
+    Meant as the `on_changed` hook of AccountSyncScheduler.
+    :return: The rows touched and unchanged, every table included.
+    """
+    characters, bank, dye_ids, emote_names = await asyncio.gather(
+        _fetch_section("characters", gw2.get_characters(typed=True)),
+        _fetch_section("bank", gw2.get_bank(typed=True)),
+        _fetch_section("unlocked dyes", gw2.get_unlocked_dyes()),
+        _fetch_section("unlocked emotes", gw2.get_unlocked_emotes()),
+    )
+
+    results = {}
+    if characters is not None:
+        results["characters"] = await sync_characters(db, game_account.id, characters)
+    if bank is not None:
+        results["bank"] = await sync_bank(db, game_account.id, bank)
+    if dye_ids is not None:
+        results["unlocked dyes"] = await sync_unlocked_dyes(db, game_account.id, dye_ids)
+    if emote_names is not None:
+        results["unlocked emotes"] = await sync_unlocked_emotes(db, game_account.id, emote_names)
+
+    total = BulkSyncResult()
+    for section, result in results.items():
+        logging.debug(f"Account {game_account.id} {section}: {result.inserted} inserted, {result.updated} updated, "
+                      f"{result.deleted} deleted, {result.unchanged} unchanged")
+        total += result
+    return total
@@ -0,0 +1,224 @@
+import datetime
+import heapq
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.token_cache import TokenCache
+from app.db.bulk import BulkSyncResult
+from app.db.model import ApiKeys, GameAccounts
+from app.db.notifications import notify_changed
+from app.gw2.client import GW2Client
+from app.gw2.models import Account
+from app.gw2.rate_limiter import Priority
+
+# A user request within this window makes the account "active"
+ACTIVE_WINDOW = datetime.timedelta(minutes=30)
+# An account not modified in game for this long is "dormant"
+DORMANT_AFTER = datetime.timedelta(days=7)
+# last_used is only written when older than this, so user requests rarely write
+LAST_USED_PRECISION = datetime.timedelta(minutes=5)
+
+# Called for accounts whose last_modified moved, to sync their details. Does not commit.
+# Returns the rows it touched and left unchanged (see app.crawlers.account_details).
+AccountChangedHook = Callable[[AsyncSession, GW2Client, GameAccounts], Awaitable[BulkSyncResult]]
+
+
+async def mark_api_key_used(db: AsyncSession, api_key: str):
+    """
+    Records user activity on a key, which makes the account sync scheduler refresh its account more often.
+    Writes at most once every LAST_USED_PRECISION per key. Does not commit.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    await db.execute(
+        update(ApiKeys)
+        .where(ApiKeys.api_key == api_key,
+               or_(ApiKeys.last_used.is_(None), ApiKeys.last_used < now - LAST_USED_PRECISION))
+        .values(last_used=now)
+    )
+
+
+@dataclass
+class SyncCandidate:
+    api_key_id: int
+    last_time_checked: datetime.datetime | None
+    last_used: datetime.datetime | None
+    last_modified: datetime.datetime | None
+
+
+@dataclass
+class AccountSyncResult:
+    due: int = 0
+    checked: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    # Failed keys rejected by the GW2 API (401 / 403), then rejected by the token caches of every worker
+    revoked: int = 0
+    # Detail rows of the changed accounts
+    rows: BulkSyncResult = field(default_factory=BulkSyncResult)
+
+
+class AccountSyncScheduler:
+    """
+    Keeps the accounts linked through API keys fresh without refetching all of them every time.
+
+    Every key gets a refresh interval: short while its owner is using the app, long when the account has not
+    been modified in game for a while, regular otherwise. Keys are due once their interval elapsed since
+    `last_time_checked`, and are popped from a priority queue ordered by how overdue they are.
+
+    The number of accounts refreshed per tick is the expected steady state rate (the sum of tick / interval over
+    every key), so upstream load stays flat as accounts are linked and a backlog (e.g. after a downtime)
+    is absorbed gradually instead of in a burst.
+    """
+
+    def __init__(
+            self,
+            tick: datetime.timedelta,
+            interval: datetime.timedelta,
+            active_interval: datetime.timedelta,
+            dormant_interval: datetime.timedelta,
+            max_per_tick: int,
+            on_changed: AccountChangedHook | None = None,
+    ):
+        """
+        :param tick: Time between two `tick` calls.
+        :param interval: Refresh interval of regular accounts.
+        :param active_interval: Refresh interval of accounts whose owner used the app recently.
+        :param dormant_interval: Refresh interval of accounts not modified in game for a while.
+        :param max_per_tick: Upper bound of accounts refreshed per tick.
+        :param on_changed: Called for every account whose last_modified moved.
+        """
+        self.tick_length = tick
+        self.interval = interval
+        self.active_interval = active_interval
+        self.dormant_interval = dormant_interval
+        self.max_per_tick = max_per_tick
+        self.on_changed = on_changed
+
+    def interval_for(self, candidate: SyncCandidate, now: datetime.datetime) -> datetime.timedelta:
+        if candidate.last_used is not None and now - candidate.last_used <= ACTIVE_WINDOW:
+            return self.active_interval
+        if candidate.last_modified is not None and now - candidate.last_modified >= DORMANT_AFTER:
+            return self.dormant_interval
+        return self.interval
+
+    def plan(self, candidates: list[SyncCandidate], now: datetime.datetime) -> list[int]:
+        """
+        Picks the keys to refresh in this tick.
+        :return: Ids of the due keys, most overdue first, never more than the per tick budget.
+        """
+        queue = []
+        expected_per_tick = 0.0
+        for candidate in candidates:
+            interval = self.interval_for(candidate, now)
+            expected_per_tick += self.tick_length / interval
+            if candidate.last_time_checked is None:
+                # Never synced: ahead of everything else
+                heapq.heappush(queue, (-math.inf, candidate.api_key_id))
+                continue
+            overdue = (now - candidate.last_time_checked - interval) / interval
+            if overdue >= 0:
+                heapq.heappush(queue, (-overdue, candidate.api_key_id))
+
+        budget = min(self.max_per_tick, max(1, math.ceil(expected_per_tick)))
+        return [api_key_id for _, api_key_id in heapq.nsmallest(budget, queue)]
+
+    async def load_candidates(self, db: AsyncSession) -> list[SyncCandidate]:
+        stmt = (
+            select(ApiKeys.id, ApiKeys.last_time_checked, ApiKeys.last_used, GameAccounts.last_modified)
+            .outerjoin(GameAccounts, ApiKeys.game_account_id == GameAccounts.id)
+        )
+        return [SyncCandidate(*row) for row in (await db.execute(stmt)).all()]
+
+    async def tick(self, db: AsyncSession) -> AccountSyncResult:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        due = self.plan(await self.load_candidates(db), now)
+        result = AccountSyncResult(due=len(due))
+
+        for api_key_id in due:
+            token = None
+            try:
+                api_key = await db.get(ApiKeys, api_key_id)
+                # Read before the sync, the key is expired by a rollback
+                token = api_key.api_key
+                changed, rows = await self.sync_account(db, api_key, now)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logging.warning(f"Account sync failed for API key {api_key_id}: {e}")
+                result.failed += 1
+                # Still counts as checked, so a revoked key does not stay at the top of the queue
+                await db.execute(update(ApiKeys).where(ApiKeys.id == api_key_id).values(last_time_checked=now))
+                status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                if status_code in (401, 403) and token:
+                    result.revoked += 1
+                    # The token caches of the workers would keep serving the key as valid until their TTL
+                    await notify_changed(db, TokenCache.rejected_payload(token, status_code))
+                await db.commit()
+                continue
+
+            result.checked += 1
+            if changed:
+                result.changed += 1
+                result.rows += rows
+            else:
+                result.unchanged += 1
+
+        if due:
+            logging.info(f"Account sync: {result.checked} accounts checked, {result.changed} changed, "
+                         f"{result.unchanged} unchanged, {result.failed} failed ({result.revoked} revoked), "
+                         f"{result.rows.touched} detail rows touched, {result.rows.unchanged} unchanged")
+        return result
+
+    async def sync_account(self, db: AsyncSession, api_key: ApiKeys,
+                           now: datetime.datetime) -> tuple[bool, BulkSyncResult]:
+        """
+        Refreshes the game account of a key, linking it first if needed, and marks the key as checked.
+        Does not commit.
+        :return: Whether the account changed since the last sync (according to its last_modified),
+            and the detail rows written by the `on_changed` hook.
+        """
+        gw2 = GW2Client(api_key=api_key.api_key, priority=Priority.CRAWLER)
+        account: Account = await gw2.get_account(typed=True)
+        api_key.last_time_checked = now
+
+        game_account = None
+        if api_key.game_account_id is not None:
+            game_account = await db.get(GameAccounts, api_key.game_account_id)
+        if game_account is None:
+            game_account = (await db.execute(
+                select(GameAccounts).where(GameAccounts.account_name == account.name)
+            )).scalars().first()
+
+        if game_account is None:
+            game_account = GameAccounts(account_name=account.name, creation_date=account.created,
+                                        last_modified=account.last_modified or now)
+            db.add(game_account)
+        elif account.last_modified is not None and game_account.last_modified == account.last_modified:
+            await self._link(db, api_key, game_account.id)
+            return False, BulkSyncResult()
+
+        game_account.world_id = account.world
+        if account.fractal_level is not None:
+            game_account.fractal_level = account.fractal_level
+        if account.last_modified is not None:
+            game_account.last_modified = account.last_modified
+        await db.flush()
+        await self._link(db, api_key, game_account.id)
+        if self.on_changed is None:
+            return True, BulkSyncResult()
+        return True, await self.on_changed(db, gw2, game_account)
+
+    @staticmethod
+    async def _link(db: AsyncSession, api_key: ApiKeys, game_account_id: int):
+        if api_key.game_account_id == game_account_id:
+            return
+        api_key.game_account_id = game_account_id
+        # The token caches of the workers still hold the key without (or with the old) account
+        await notify_changed(db, TokenCache.changed_payload(api_key.api_key))
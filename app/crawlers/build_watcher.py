@@ -0,0 +1,112 @@
+import datetime
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import partial
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crawlers.catalogue import CRAWLERS, update_catalogue
+from app.crawlers.items_crawler import update_items_catalogue
+from app.crawlers.worlds_crawler import update_worlds_incremental
+from app.db.model import BuildChecks
+from app.gw2.client import GW2Client, count_requests
+from app.gw2.rate_limiter import Priority
+
+
+@dataclass
+class CatalogueJob:
+    """
+    A crawler of static game data, which only changes on game patches.
+    :param name: Key of the job in BuildChecks.triggered_jobs.
+    :param run: The crawler, called with a database session.
+    :param max_age: The crawler runs again after this long even if the build did not change.
+    """
+    name: str
+    run: Callable[[AsyncSession], Awaitable]
+    max_age: datetime.timedelta
+
+
+def catalogue_jobs() -> list[CatalogueJob]:
+    catalogue_max_age = datetime.timedelta(minutes=settings.CATALOGUE_CRAWLER_INTERVAL_MINUTES)
+    return [
+        CatalogueJob("worlds", update_worlds_incremental,
+                     datetime.timedelta(minutes=settings.WORLDS_CRAWLER_INTERVAL_MINUTES)),
+        CatalogueJob("items", update_items_catalogue,
+                     datetime.timedelta(minutes=settings.ITEMS_CRAWLER_INTERVAL_MINUTES)),
+        # The wallet crawler only keeps the currencies known here
+        *(CatalogueJob(name, partial(update_catalogue, spec=CRAWLERS[name]), catalogue_max_age)
+          for name in ("currencies", "dyes", "achievements")),
+    ]
+
+
+async def last_triggered_check(db: AsyncSession, job_name: str) -> BuildChecks | None:
+    """Returns the last check which successfully ran the given job."""
+    stmt = (
+        select(BuildChecks)
+        .where(BuildChecks.triggered_jobs.has_key(job_name))
+        .order_by(BuildChecks.checked_at.desc())
+        .limit(1)
+    )
+    return (await db.execute(stmt)).scalars().first()
+
+
+def trigger_reason(last: BuildChecks | None, build_id: int, max_age: datetime.timedelta,
+                   now: datetime.datetime) -> str | None:
+    """
+    Decides whether a catalogue job has to run.
+    :return: Why the job has to run ("first_run", "build_changed" or "max_age"), None when it can be skipped.
+    """
+    if last is None:
+        return "first_run"
+    if last.build_id != build_id:
+        return "build_changed"
+    if now - last.checked_at >= max_age:
+        return "max_age"
+    return None
+
+
+async def check_build(db: AsyncSession, jobs: list[CatalogueJob] | None = None) -> BuildChecks:
+    """
+    Polls /v2/build (a single cheap request) and runs the catalogue crawlers whose data may be outdated:
+    the ones that never ran, ran on a previous build, or ran longer than their max age ago.
+    Every check is recorded in BuildChecks with the requests it made and an estimate of the requests it saved,
+    taken from the last run of every skipped job.
+    A failed crawler is not recorded as triggered, so the next check retries it.
+    """
+    jobs = catalogue_jobs() if jobs is None else jobs
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    with count_requests() as total:
+        build_id = await GW2Client(priority=Priority.CRAWLER).get_build()
+
+        triggered_jobs = {}
+        skipped_requests = 0
+        for job in jobs:
+            last = await last_triggered_check(db, job.name)
+            reason = trigger_reason(last, build_id, job.max_age, now)
+            if reason is None:
+                skipped_requests += last.triggered_jobs[job.name].get("requests", 0)
+                continue
+
+            logging.info(f"Build {build_id}: running {job.name} crawler ({reason})")
+            with count_requests() as job_requests:
+                try:
+                    await job.run(db)
+                except Exception as e:
+                    await db.rollback()
+                    logging.error(f"Build {build_id}: {job.name} crawler failed: {e}")
+                    continue
+            triggered_jobs[job.name] = {"reason": reason, "requests": job_requests.requests}
+
+    # The outer counter does not see the requests of the nested blocks
+    upstream_requests = total.requests + sum(job["requests"] for job in triggered_jobs.values())
+    check = BuildChecks(build_id=build_id, checked_at=now, triggered_jobs=triggered_jobs,
+                        upstream_requests=upstream_requests, skipped_requests=skipped_requests)
+    db.add(check)
+    await db.commit()
+    logging.info(f"Build {build_id} checked: ran {sorted(triggered_jobs) or 'nothing'}, "
+                 f"{upstream_requests} requests made, ~{skipped_requests} skipped")
+    return check
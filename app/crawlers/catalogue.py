@@ -0,0 +1,167 @@
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import msgspec
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import content_hash
+from app.crawlers.checkpoints import CrawlCheckpoint
+from app.crawlers.items_crawler import LANGUAGES, merge_items, touch_last_fetched, upsert_items
+from app.crawlers.pipeline import iter_localized_chunks
+from app.db.bulk import BulkSyncResult, bulk_upsert
+from app.db.model import Achievements, Currencies, Dyes, Worlds
+from app.db.notifications import notify_changed
+from app.gw2.client import GW2Client
+from app.gw2.models import Achievement, Currency, Dye, Item, World
+from app.gw2.rate_limiter import Priority
+
+# Normalizers of the standalone crawler pipeline (see app.crawlers.pipeline).
+# They run in worker processes: every one takes {lang: raw JSON array of one id chunk} and returns picklable records.
+
+
+def _decode(raw_by_lang: dict[str, bytes], model: type) -> dict[str, list]:
+    return {lang: msgspec.json.decode(raw, type=list[model]) for lang, raw in raw_by_lang.items()}
+
+
+def _localized(decoded: dict[str, list]) -> tuple[list, dict[str, dict]]:
+    # English entries drive the merge, missing translations fall back to them
+    by_lang = {lang: {entry.id: entry for entry in entries} for lang, entries in decoded.items()}
+    return decoded["en"], by_lang
+
+
+def normalize_worlds(raw_by_lang: dict[str, bytes]) -> list[dict]:
+    entries, by_lang = _localized(_decode(raw_by_lang, World))
+    return [
+        {"id": world.id, **{f"name_{lang}": by_lang.get(lang, {}).get(world.id, world).name for lang in LANGUAGES}}
+        for world in entries
+    ]
+
+
+def normalize_items(raw_by_lang: dict[str, bytes]) -> list[tuple[dict, dict | None]]:
+    item_rows, detail_rows = merge_items(_decode(raw_by_lang, Item))
+    details = {row["item_id"]: row for row in detail_rows}
+    return [(row, details.get(row["id"])) for row in item_rows]
+
+
+def normalize_currencies(raw_by_lang: dict[str, bytes]) -> list[dict]:
+    entries, by_lang = _localized(_decode(raw_by_lang, Currency))
+    rows = []
+    for currency in entries:
+        row = {"id": currency.id, "icon_url": currency.icon}
+        for lang in LANGUAGES:
+            translated = by_lang.get(lang, {}).get(currency.id, currency)
+            row[f"name_{lang}"] = translated.name
+            row[f"description_{lang}"] = translated.description
+        rows.append(row)
+    return rows
+
+
+def normalize_dyes(raw_by_lang: dict[str, bytes]) -> list[dict]:
+    entries, by_lang = _localized(_decode(raw_by_lang, Dye))
+    return [
+        {
+            "id": dye.id,
+            "color": "[" + ",".join(str(channel) for channel in dye.base_rgb) + "]",
+            **{f"name_{lang}": by_lang.get(lang, {}).get(dye.id, dye).name for lang in LANGUAGES},
+        }
+        for dye in entries
+        if len(dye.base_rgb) == 3
+    ]
+
+
+def normalize_achievements(raw_by_lang: dict[str, bytes]) -> list[dict]:
+    entries, by_lang = _localized(_decode(raw_by_lang, Achievement))
+    rows = []
+    for achievement in entries:
+        row = {
+            "id": achievement.id,
+            "achievement_type": achievement.type,
+            "icon": achievement.icon,
+            "flags": achievement.flags,
+        }
+        for lang in LANGUAGES:
+            translated = by_lang.get(lang, {}).get(achievement.id, achievement)
+            row[f"name_{lang}"] = translated.name
+            row[f"description_{lang}"] = translated.description
+        row["content_hash"] = content_hash(row)
+        rows.append(row)
+    return rows
+
+
+async def write_items(db: AsyncSession, records: list[tuple[dict, dict | None]]) -> BulkSyncResult:
+    return await upsert_items(db, [row for row, _ in records], [details for _, details in records if details])
+
+
+async def write_achievements(db: AsyncSession, rows: list[dict]) -> BulkSyncResult:
+    # Same change detection as the items: only the hash is compared, unchanged rows only get last_fetched touched
+    result = await bulk_upsert(db, Achievements.__table__, rows, extra_set={"last_fetched": func.now()},
+                               compare_columns=("content_hash",))
+    changed = set(result.changed_keys)
+    await touch_last_fetched(db, Achievements, [row["id"] for row in rows if row["id"] not in changed])
+    return result
+
+
+async def write_worlds(db: AsyncSession, rows: list[dict]) -> BulkSyncResult:
+    result = await bulk_upsert(db, Worlds.__table__, rows)
+    if result.changed:
+        # The API workers drop their cached /worlds response once the batch commits
+        await notify_changed(db, "worlds")
+    return result
+
+
+def _upsert_into(model) -> Callable[[AsyncSession, list[dict]], Awaitable[BulkSyncResult]]:
+    async def write(db: AsyncSession, rows: list[dict]) -> BulkSyncResult:
+        return await bulk_upsert(db, model.__table__, rows)
+
+    return write
+
+
+@dataclass
+class CrawlerSpec:
+    """
+    A catalogue crawler runnable by `python -m app.crawlers`.
+    :param endpoint: Id-keyed GW2 endpoint listing and serving the entries.
+    :param normalize: Module level function turning one fetched chunk into records, run in a worker process.
+    :param write: Persists a batch of records, without committing.
+    """
+    name: str
+    endpoint: str
+    normalize: Callable[[dict[str, bytes]], list]
+    write: Callable[[AsyncSession, list], Awaitable[BulkSyncResult]]
+
+
+CRAWLERS = {
+    spec.name: spec
+    for spec in (
+        CrawlerSpec("worlds", "/worlds", normalize_worlds, write_worlds),
+        CrawlerSpec("items", "/items", normalize_items, write_items),
+        CrawlerSpec("currencies", "/currencies", normalize_currencies, _upsert_into(Currencies)),
+        CrawlerSpec("dyes", "/colors", normalize_dyes, _upsert_into(Dyes)),
+        CrawlerSpec("achievements", "/achievements", normalize_achievements, write_achievements),
+    )
+}
+
+
+async def update_catalogue(db: AsyncSession, spec: CrawlerSpec, max_in_flight: int = 4) -> BulkSyncResult:
+    """
+    Crawls one catalogue in the calling process, for the scheduled jobs (see app.crawlers.build_watcher):
+    chunk by chunk like update_items_catalogue, normalized in the event loop, one checkpointed commit per chunk.
+    :return: BulkSyncResult with the counts of the whole crawl, resumed parts included.
+    """
+    gw2 = GW2Client(priority=Priority.CRAWLER)
+    checkpoint = CrawlCheckpoint(spec.name)
+    ids = await checkpoint.start(db, sorted(await gw2.get_ids(spec.endpoint)))
+
+    index = 0
+    async for raw_by_lang in iter_localized_chunks(gw2, spec.endpoint, ids, LANGUAGES, max_in_flight, model=bytes):
+        chunk_result = await spec.write(db, spec.normalize(raw_by_lang))
+        # Only the counts are kept, see run_crawler
+        checkpoint.chunk_done(index, BulkSyncResult(chunk_result.inserted, chunk_result.updated,
+                                                    chunk_result.unchanged))
+        await checkpoint.save(db)
+        await db.commit()
+        index += 1
+    await checkpoint.complete(db)
+    await db.commit()
+    return checkpoint.result
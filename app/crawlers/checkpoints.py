@@ -0,0 +1,86 @@
+import datetime
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.bulk import BulkSyncResult, bulk_upsert
+from app.db.model import CrawlCheckpoints
+from app.gw2.client import MAX_IDS_PER_REQUEST
+
+
+class CrawlCheckpoint:
+    """
+    Progress of a crawl walking an id list in ascending order, persisted in crawl_checkpoints.
+
+    The checkpoint is saved in the same transaction as the batch it describes, so after a restart the
+    crawl resumes right after the last committed chunk. Chunks may complete out of order (e.g. in the
+    crawler pipeline): the watermark only moves over contiguous completed chunks, so a resumed crawl
+    may redo a few chunks but never skips one.
+    """
+
+    def __init__(self, job_name: str, chunk_size: int = MAX_IDS_PER_REQUEST):
+        self.job_name = job_name
+        self.chunk_size = chunk_size
+        self.ids: list[int] = []
+        self.started_at: datetime.datetime | None = None
+        self.watermark: int | None = None
+        self.total_ids = 0
+        self.chunks_done = 0
+        self.result = BulkSyncResult()
+        self._completed: set[int] = set()
+        self._next_chunk = 0
+
+    async def start(self, db: AsyncSession, ids: list[int], restart: bool = False) -> list[int]:
+        """
+        Resumes the unfinished crawl of this job, or starts a new one, and commits the checkpoint.
+        :param ids: Every id to crawl.
+        :param restart: Start from zero even if the previous crawl did not finish.
+        :return: The ids left to crawl, in ascending order. Chunk N of the crawl is `ids[N * chunk_size:]`.
+        """
+        previous = await db.get(CrawlCheckpoints, self.job_name)
+        ids = sorted(ids)
+        if previous is not None and previous.status == "running" and not restart:
+            self.started_at = previous.started_at
+            self.watermark = previous.watermark
+            self.chunks_done = previous.chunks_done
+            self.result = BulkSyncResult(previous.inserted, previous.updated, previous.unchanged)
+        else:
+            self.started_at = datetime.datetime.now(datetime.timezone.utc)
+
+        self.ids = [entry_id for entry_id in ids if self.watermark is None or entry_id > self.watermark]
+        self.total_ids = len(ids)
+        await self.save(db)
+        await db.commit()
+        return self.ids
+
+    def chunk_done(self, index: int, result: BulkSyncResult | None = None):
+        """Records chunk `index` (of the ids returned by `start`) as written, with its counts."""
+        self._completed.add(index)
+        self.chunks_done += 1
+        if result is not None:
+            self.result += BulkSyncResult(result.inserted, result.updated, result.unchanged)
+        while self._next_chunk in self._completed:
+            self._completed.remove(self._next_chunk)
+            chunk = self.ids[self._next_chunk * self.chunk_size:(self._next_chunk + 1) * self.chunk_size]
+            if chunk:
+                self.watermark = chunk[-1]
+            self._next_chunk += 1
+
+    async def save(self, db: AsyncSession, status: str = "running"):
+        """Writes the checkpoint. Does not commit: it belongs to the transaction of the batch."""
+        await bulk_upsert(db, CrawlCheckpoints.__table__, [{
+            "job_name": self.job_name,
+            "status": status,
+            "started_at": self.started_at,
+            "watermark": self.watermark,
+            "total_ids": self.total_ids,
+            "chunks_done": self.chunks_done,
+            "inserted": self.result.inserted,
+            "updated": self.result.updated,
+            "unchanged": self.result.unchanged,
+            "finished_at": datetime.datetime.now(datetime.timezone.utc) if status == "completed" else None,
+        }], key_columns=("job_name",), extra_set={"updated_at": func.now()})
+
+    async def complete(self, db: AsyncSession):
+        """Marks the crawl as finished, so the next one starts from zero. Does not commit."""
+        await self.save(db, status="completed")
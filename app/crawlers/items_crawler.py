@@ -0,0 +1,153 @@
+import datetime
+import logging
+import time
+
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils import content_hash
+from app.crawlers.checkpoints import CrawlCheckpoint
+from app.crawlers.pipeline import iter_localized_chunks
+from app.db.bulk import BulkSyncResult, bulk_upsert
+from app.db.data.item_types_data import ITEM_TYPE_IDS
+from app.db.data.rarities_data import RARITY_IDS
+from app.db.model import ItemsCache, ItemDetails
+from app.gw2.client import GW2Client
+from app.gw2.models import Item
+from app.gw2.rate_limiter import Priority
+
+LANGUAGES = ("en", "es", "de", "fr")
+
+
+def merge_items(pages_by_lang: dict[str, list[Item]]) -> tuple[list[dict], list[dict]]:
+    """
+    Merges the same chunk of items fetched in every language into items_cache and item_details rows,
+    the same way get_worlds_info_from_api merges worlds.
+    Language independent attributes come from the english payload. Items with an unknown type or rarity are skipped.
+    Every row carries the content hash of everything stored for the item, details included.
+    :return: (items_cache rows, item_details rows)
+    """
+    localized = {lang: {item.id: item for item in items} for lang, items in pages_by_lang.items()}
+    item_rows = []
+    detail_rows = []
+    for item in pages_by_lang["en"]:
+        item_type_id = ITEM_TYPE_IDS.get(item.type)
+        rarity_id = RARITY_IDS.get(item.rarity)
+        if item_type_id is None or rarity_id is None:
+            logging.warning(f"Skipping item {item.id}: unknown type {item.type} or rarity {item.rarity}")
+            continue
+
+        row = {
+            "id": item.id,
+            "item_type_id": item_type_id,
+            "rarity_id": rarity_id,
+            "chat_link": item.chat_link,
+            "icon": item.icon,
+            "required_level": item.level,
+            "vendor_value": item.vendor_value,
+            "flags": item.flags,
+        }
+        for lang in LANGUAGES:
+            translated = localized.get(lang, {}).get(item.id, item)
+            row[f"name_{lang}"] = translated.name
+            row[f"description_{lang}"] = translated.description
+        row["content_hash"] = content_hash({**row, "details": item.details})
+        item_rows.append(row)
+
+        if item.details is not None:
+            detail_rows.append({"item_id": item.id, "details": item.details})
+
+    return item_rows, detail_rows
+
+
+async def upsert_items(db: AsyncSession, item_rows: list[dict], detail_rows: list[dict]) -> BulkSyncResult:
+    """
+    Writes a batch of merged items with one INSERT ... ON CONFLICT statement per table.
+    Only items whose content hash changed are rewritten (and get their details rewritten).
+    Unchanged items just get their last_fetched touched (see touch_last_fetched), so the revalidation planner
+    sees them as fresh.
+    :return: The items_cache counts.
+    """
+    result = await bulk_upsert(db, ItemsCache.__table__, item_rows, extra_set={"last_fetched": func.now()},
+                               compare_columns=("content_hash",))
+    changed = set(result.changed_keys)
+    await bulk_upsert(db, ItemDetails.__table__, [row for row in detail_rows if row["item_id"] in changed],
+                      key_columns=("item_id",))
+
+    await touch_items(db, [row["id"] for row in item_rows if row["id"] not in changed])
+    return result
+
+
+async def touch_items(db: AsyncSession, ids: list[int]):
+    """Marks items as fetched now without rewriting anything else."""
+    await touch_last_fetched(db, ItemsCache, ids)
+
+
+async def touch_last_fetched(db: AsyncSession, model, ids: list[int]):
+    """
+    Sets last_fetched to now, only on the rows fetched more than LAST_FETCHED_RESOLUTION_HOURS ago.
+    Every UPDATE writes a new row version, so re-fetching an unchanged row does not rewrite it each time.
+    The stored date may thus lag by up to that resolution, far below the revalidation min age.
+    :param model: Cached entity with `id` and `last_fetched` columns, e.g. ItemsCache or Achievements.
+    """
+    if ids:
+        resolution = datetime.timedelta(hours=settings.LAST_FETCHED_RESOLUTION_HOURS)
+        await db.execute(update(model)
+                         .where(model.id.in_(ids), model.last_fetched < func.now() - resolution)
+                         .values(last_fetched=func.now()))
+
+
+async def iter_item_chunks(gw2: GW2Client, ids: list[int],
+                           max_in_flight: int = 4) -> AsyncIterator[dict[str, list[Item]]]:
+    """
+    Fetches the given ids in chunks, every chunk in the four languages concurrently.
+    :param max_in_flight: Chunks requested ahead of the consumer, per language.
+    :return: Async iterator of {lang: items} for every chunk.
+    """
+    # Closed with this iterator, so the chunks requested ahead are cancelled as soon as the consumer stops
+    async with aclosing(iter_localized_chunks(gw2, "/items", ids, LANGUAGES, max_in_flight, model=Item)) as chunks:
+        async for pages_by_lang in chunks:
+            yield pages_by_lang
+
+
+async def update_items_catalogue(db: AsyncSession, max_in_flight: int = 4, restart: bool = False) -> BulkSyncResult:
+    """
+    Crawls the full item catalogue: every id chunk is fetched in the four languages concurrently,
+    merged and written with bulk upserts, one commit per chunk so memory stays bounded.
+    Progress is checkpointed with every commit: an interrupted crawl resumes after the last written chunk.
+    :param max_in_flight: Chunks requested ahead of the writer, per language.
+    :param restart: Ignore the checkpoint of an interrupted crawl and start from the first id.
+    :return: BulkSyncResult with the items_cache counts of the whole crawl, resumed parts included.
+    """
+    gw2 = GW2Client(priority=Priority.CRAWLER)
+    logging.info("Start updating items catalogue")
+    start = time.monotonic()
+
+    checkpoint = CrawlCheckpoint("items")
+    ids = await checkpoint.start(db, await gw2.get_ids("/items"), restart=restart)
+    if checkpoint.watermark is not None:
+        logging.info(f"Resuming items catalogue after id {checkpoint.watermark}, {len(ids)} ids left")
+
+    result = BulkSyncResult()
+    index = 0
+    async for pages_by_lang in iter_item_chunks(gw2, ids, max_in_flight):
+        item_rows, detail_rows = merge_items(pages_by_lang)
+        chunk_result = await upsert_items(db, item_rows, detail_rows)
+        result += chunk_result
+        checkpoint.chunk_done(index, chunk_result)
+        await checkpoint.save(db)
+        await db.commit()
+        index += 1
+    await checkpoint.complete(db)
+    await db.commit()
+
+    elapsed = time.monotonic() - start
+    processed = result.changed + result.unchanged
+    logging.info(f"End updating items catalogue: {processed} items in {elapsed:.1f}s "
+                 f"({processed / elapsed if elapsed else 0:.0f} items/s), {result.inserted} inserted, "
+                 f"{result.updated} updated, {result.unchanged} unchanged")
+    return checkpoint.result
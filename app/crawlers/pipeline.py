@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from app.gw2.client import GW2Client, MAX_IDS_PER_REQUEST
+
+# Marks the end of a queue
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """
+    Throughput counters of one pipeline stage.
+    :param name: Name of the stage.
+    :param count: Units processed: chunks for the fetch stage, records for the other ones.
+    :param started: Monotonic time the stage got its first unit.
+    :param finished: Monotonic time the stage processed its last unit.
+    """
+    name: str
+    count: int = 0
+    started: float | None = None
+    finished: float | None = None
+
+    def start(self):
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def finish(self):
+        self.start()
+        self.finished = time.monotonic()
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.name:<10} {self.count:>8} in {self.seconds:>7.2f}s  ({self.throughput:,.0f}/s)"
+
+
+async def iter_localized_chunks(
+        gw2: GW2Client,
+        endpoint: str,
+        ids: list[int],
+        languages: Sequence[str | None],
+        max_in_flight: int = 4,
+        model: type | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Fetches the given ids in chunks, every chunk in every language concurrently.
+    The walks advance in lockstep: chunk N of every language is yielded together.
+    :param languages: Languages to fetch. Use (None,) for endpoints which are not localized.
+    :param max_in_flight: Chunks requested ahead of the consumer, per language.
+    :return: Async iterator of {lang: items} for every chunk.
+    """
+    walks = [
+        gw2.iter_id_chunks(endpoint, ids, chunk_size=MAX_IDS_PER_REQUEST, max_in_flight=max_in_flight,
+                           lang=lang, model=model)
+        for lang in languages
+    ]
+    try:
+        while True:
+            pages = await asyncio.gather(*(anext(walk, None) for walk in walks))
+            if pages[0] is None:
+                return
+            yield {lang: page.items for lang, page in zip(languages, pages)}
+    finally:
+        for walk in walks:
+            await walk.aclose()
+
+
+async def run_pipeline(
+        source: AsyncIterator,
+        normalize: Callable[[object], list],
+        write: Callable[[list, list[int]], Awaitable],
+        workers: int = 4,
+        batch_size: int = 1000,
+        queue_size: int = 8,
+) -> list[StageStats]:
+    """
+    Runs a three stage crawl pipeline, the stages being connected by bounded queues so a slow stage
+    applies back pressure to the previous one instead of buffering the whole catalogue:
+
+        fetch (async, `source`) -> normalize (process pool) -> write (async, batched)
+
+    :param source: Async iterator of raw fetched units, e.g. undecoded response bodies.
+    :param normalize: Turns one raw unit into a list of records. Runs in a worker process, so it must be
+        a picklable module level function, and so must be its input and output.
+    :param write: Persists a batch of records. Also receives the (0 based) positions in `source` of the units
+        whose records are now all written, so the caller can checkpoint them in the same transaction.
+    :param workers: Worker processes of the normalize stage. 0 normalizes in the event loop process.
+    :param batch_size: Records per `write` call. The last batch may be smaller.
+    :param queue_size: Capacity of each queue between stages.
+    :return: The stats of every stage.
+    """
+    fetched = asyncio.Queue(queue_size)
+    normalized = asyncio.Queue(queue_size)
+    fetch_stats, normalize_stats, write_stats = StageStats("fetch"), StageStats("normalize"), StageStats("write")
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    normalizers = max(1, workers)
+
+    async def fetch_stage():
+        fetch_stats.start()
+        async for raw in source:
+            await fetched.put((fetch_stats.count, raw))
+            fetch_stats.count += 1
+        fetch_stats.finish()
+        for _ in range(normalizers):
+            await fetched.put(_DONE)
+
+    async def normalize_worker():
+        while (unit := await fetched.get()) is not _DONE:
+            position, raw = unit
+            normalize_stats.start()
+            if executor is None:
+                records = normalize(raw)
+            else:
+                records = await loop.run_in_executor(executor, normalize, raw)
+            normalize_stats.count += len(records)
+            await normalized.put((position, records))
+
+    async def normalize_stage():
+        await asyncio.gather(*(normalize_worker() for _ in range(normalizers)))
+        normalize_stats.finish()
+        await normalized.put(_DONE)
+
+    pending = []
+    # Units with records in `pending`, in arrival order: [position, records not written yet]
+    owners = deque()
+    completed = []
+
+    async def write_batch(size: int):
+        nonlocal pending, completed
+        batch, pending = pending[:size], pending[size:]
+        left = size
+        while left and owners:
+            written = min(owners[0][1], left)
+            left -= written
+            owners[0][1] -= written
+            if owners[0][1] == 0:
+                completed.append(owners.popleft()[0])
+        batch_completed, completed = completed, []
+        write_stats.start()
+        await write(batch, batch_completed)
+        write_stats.count += len(batch)
+
+    async def write_stage():
+        while (unit := await normalized.get()) is not _DONE:
+            position, records = unit
+            if records:
+                pending.extend(records)
+                owners.append([position, len(records)])
+            else:
+                completed.append(position)
+            while len(pending) >= batch_size:
+                await write_batch(batch_size)
+        if pending or completed:
+            await write_batch(len(pending))
+        write_stats.finish()
+
+    try:
+        # A failing stage cancels the other ones
+        async with asyncio.TaskGroup() as stages:
+            stages.create_task(fetch_stage())
+            stages.create_task(normalize_stage())
+            stages.create_task(write_stage())
+    except ExceptionGroup as e:
+        raise e.exceptions[0]
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return [fetch_stats, normalize_stats, write_stats]
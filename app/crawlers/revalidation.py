@@ -0,0 +1,77 @@
+import datetime
+import logging
+import time
+from contextlib import aclosing
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crawlers.items_crawler import LANGUAGES, iter_item_chunks, merge_items, touch_items, upsert_items
+from app.db.bulk import BulkSyncResult
+from app.db.model import ItemsCache
+from app.gw2.client import GW2Client, MAX_IDS_PER_REQUEST
+from app.gw2.rate_limiter import Priority
+
+
+async def plan_stalest(db: AsyncSession, model, limit: int, min_age: datetime.timedelta) -> list[int]:
+    """
+    Picks the ids of the `limit` rows fetched the longest time ago.
+    Rows fetched more recently than `min_age` are left alone, so a small catalogue is not refetched in a loop.
+    :param model: Cached entity with `id` and `last_fetched` columns, e.g. ItemsCache or Achievements.
+    :return: Ids ordered from the stalest to the freshest.
+    """
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - min_age
+    stmt = (
+        select(model.id)
+        .where(model.last_fetched < cutoff)
+        .order_by(model.last_fetched, model.id)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def revalidate_items(
+        db: AsyncSession,
+        request_budget: int,
+        time_budget_seconds: float,
+        min_age: datetime.timedelta,
+        max_in_flight: int = 2,
+) -> BulkSyncResult:
+    """
+    Refreshes the stalest slice of the items catalogue within a request and time budget.
+    Run periodically, every item is refetched once per catalogue rotation instead of in a full sweep.
+    Items whose content hash did not change are not rewritten, only their last_fetched is touched.
+    :param request_budget: Maximum number of GW2 requests of the run. Every chunk costs one request per language.
+    :param time_budget_seconds: No new chunk is written once this time has elapsed.
+    :param min_age: Items fetched more recently than this are never revalidated.
+    :param max_in_flight: Chunks requested ahead of the writer, per language.
+    :return: BulkSyncResult with the items_cache counts.
+    """
+    chunks = request_budget // len(LANGUAGES)
+    ids = await plan_stalest(db, ItemsCache, chunks * MAX_IDS_PER_REQUEST, min_age)
+    result = BulkSyncResult()
+    if not ids:
+        logging.info("No stale items to revalidate")
+        return result
+
+    gw2 = GW2Client(priority=Priority.CRAWLER)
+    start = time.monotonic()
+    chunk_start = 0
+    # Closing the chunks on exit cancels the look-ahead requests right away when the time budget runs out
+    async with aclosing(iter_item_chunks(gw2, ids, max_in_flight)) as chunks:
+        async for pages_by_lang in chunks:
+            item_rows, detail_rows = merge_items(pages_by_lang)
+            result += await upsert_items(db, item_rows, detail_rows)
+            # Ids gone from the API (or skipped by merge_items) would otherwise stay the stalest forever
+            returned = {row["id"] for row in item_rows}
+            chunk_ids = ids[chunk_start:chunk_start + MAX_IDS_PER_REQUEST]
+            chunk_start += MAX_IDS_PER_REQUEST
+            await touch_items(db, [item_id for item_id in chunk_ids if item_id not in returned])
+            await db.commit()
+            if time.monotonic() - start >= time_budget_seconds:
+                logging.info("Items revalidation time budget exhausted")
+                break
+
+    logging.info(f"Revalidated {result.changed + result.unchanged} of {len(ids)} planned items in "
+                 f"{time.monotonic() - start:.1f}s: {result.changed} changed, {result.unchanged} unchanged")
+    return result
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.bulk import bulk_upsert, copy_rows
+from app.db.model import ApiKeys, Currencies, Wallet, WalletHistory
+from app.gw2.client import GW2Client
+from app.gw2.models import WalletEntry
+from app.gw2.rate_limiter import Priority
+
+HISTORY_COLUMNS = ("game_account_id", "currency_id", "snapshot_time", "amount")
+
+
+@dataclass
+class WalletCrawlResult:
+    accounts: int = 0
+    failed: int = 0
+    balances_changed: int = 0
+    balances_unchanged: int = 0
+    history_rows: int = 0
+
+
+async def select_wallet_keys(db: AsyncSession) -> list[tuple[int, str]]:
+    """
+    Returns one API key with the "wallet" permission for every linked game account.
+    :return: (game_account_id, api_key) pairs ordered by account.
+    """
+    stmt = (
+        select(ApiKeys.game_account_id, ApiKeys.api_key)
+        .where(ApiKeys.game_account_id.is_not(None), ApiKeys.permissions.contains(["wallet"]))
+        .distinct(ApiKeys.game_account_id)
+        .order_by(ApiKeys.game_account_id, ApiKeys.id)
+    )
+    return [(game_account_id, api_key) for game_account_id, api_key in (await db.execute(stmt)).all()]
+
+
+async def fetch_wallets(keys: list[tuple[int, str]], concurrency: int) -> dict[int, list[WalletEntry]]:
+    """
+    Fetches the wallet of every account, at most `concurrency` at once through the shared (rate limited) client.
+    Accounts whose key was revoked or whose request failed are left out and logged.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(game_account_id: int, api_key: str):
+        gw2 = GW2Client(api_key=api_key, priority=Priority.CRAWLER)
+        async with semaphore:
+            try:
+                return game_account_id, await gw2.get_wallet(typed=True)
+            except (httpx.HTTPError, RuntimeError) as e:
+                logging.warning(f"Could not fetch the wallet of game account {game_account_id}: {e}")
+                return game_account_id, None
+
+    results = await asyncio.gather(*(fetch(game_account_id, api_key) for game_account_id, api_key in keys))
+    return {game_account_id: wallet for game_account_id, wallet in results if wallet is not None}
+
+
+async def write_wallets(db: AsyncSession, wallets: dict[int, list[WalletEntry]], known_currencies: set[int],
+                        snapshot_time: datetime.datetime) -> tuple[int, int, int]:
+    """
+    Upserts the current balances in one statement and appends a wallet_history row, with COPY,
+    for every balance that is new or changed. Does not commit.
+    :return: (changed balances, unchanged balances, history rows)
+    """
+    # New currencies are only known after the next currencies crawl, their balances are picked up then
+    rows = [
+        {"currency_id": entry.id, "game_account_id": game_account_id, "amount": entry.value}
+        for game_account_id, wallet in wallets.items()
+        for entry in wallet
+        if entry.id in known_currencies
+    ]
+    result = await bulk_upsert(db, Wallet.__table__, rows, key_columns=("currency_id", "game_account_id"))
+
+    amounts = {(row["currency_id"], row["game_account_id"]): row["amount"] for row in rows}
+    history = [
+        (game_account_id, currency_id, snapshot_time, amounts[(currency_id, game_account_id)])
+        for currency_id, game_account_id in result.changed_keys
+    ]
+    history_rows = await copy_rows(db, WalletHistory.__table__, HISTORY_COLUMNS, history) if history else 0
+    return result.changed, result.unchanged, history_rows
+
+
+async def update_wallets(db: AsyncSession, concurrency: int = 8, batch_size: int = 500) -> WalletCrawlResult:
+    """
+    Snapshots the wallet of every account with a wallet enabled API key.
+    Accounts are processed in batches of `batch_size`, one transaction per batch.
+    """
+    start = time.monotonic()
+    keys = await select_wallet_keys(db)
+    known_currencies = set((await db.execute(select(Currencies.id))).scalars().all())
+    logging.info(f"Start updating wallets of {len(keys)} accounts")
+
+    result = WalletCrawlResult()
+    for batch_start in range(0, len(keys), batch_size):
+        batch = keys[batch_start:batch_start + batch_size]
+        wallets = await fetch_wallets(batch, concurrency)
+        changed, unchanged, history_rows = await write_wallets(
+            db, wallets, known_currencies, datetime.datetime.now(datetime.timezone.utc)
+        )
+        await db.commit()
+
+        result.accounts += len(wallets)
+        result.failed += len(batch) - len(wallets)
+        result.balances_changed += changed
+        result.balances_unchanged += unchanged
+        result.history_rows += history_rows
+
+    elapsed = time.monotonic() - start
+    logging.info(f"End updating wallets: {result.accounts} accounts in {elapsed:.1f}s "
+                 f"({result.accounts / elapsed if elapsed else 0:.1f} accounts/s), {result.failed} failed, "
+                 f"{result.balances_changed} balances written, {result.balances_unchanged} unchanged, "
+                 f"{result.history_rows} history rows")
+    return result
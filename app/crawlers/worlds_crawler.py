@@ -1,46 +1,41 @@
-from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.response_cache import response_cache
 from app.api.v1.worlds import get_worlds_info_from_api
+from app.db.bulk import BulkSyncResult, bulk_upsert
 from app.db.model import Worlds
+from app.db.notifications import notify_changed
 from app.gw2.client import GW2Client
+from app.gw2.rate_limiter import Priority
 
 
-async def update_worlds_incremental(db: AsyncSession):
-    gw2 = GW2Client()
+async def update_worlds_incremental(db: AsyncSession) -> BulkSyncResult | None:
+    gw2 = GW2Client(priority=Priority.CRAWLER)
     print("Start updating worlds incremental")
 
     # Query worlds from GW2 API
     worlds_info_from_api = await get_worlds_info_from_api(gw2)
     if not worlds_info_from_api:
-        return
+        return None
 
-    # Check existing worlds in DB
-    result = await db.execute(select(Worlds))
-    worlds_db = {w.id: w for w in result.scalars().all()}
-
-    # Update or insert worlds as necessary
-    for world in worlds_info_from_api:
-        world_id = world["id"]
-        names = {
+    # Insert new worlds and update the ones whose names changed, in a single statement
+    rows = [
+        {
+            "id": world["id"],
             "name_es": world.get("name_es", ""),
             "name_fr": world.get("name_fr", ""),
             "name_en": world.get("name_en", ""),
             "name_de": world.get("name_de", "")
         }
-        if world_id in worlds_db:
-            db_world = worlds_db[world_id]
-            # If any name has changed, update the record
-            if any(getattr(db_world, k) != v for k, v in names.items()):
-                print(f"Updating world: {world_id}")
-                await db.execute(
-                    update(Worlds)
-                    .where(Worlds.id == world_id)
-                    .values(**names)
-                )
-        else:
-            # Insert new world
-            print(f"inserting new world: {world_id}")
-            db.add(Worlds(id=world_id, **names))
+        for world in worlds_info_from_api
+    ]
+    result = await bulk_upsert(db, Worlds.__table__, rows)
+    if result.changed:
+        # Every worker drops its cached /worlds response once this commits
+        await notify_changed(db, "worlds")
     await db.commit()
-    print("End updating worlds incremental")
+    if result.changed:
+        response_cache.invalidate("worlds")
+    print(f"End updating worlds incremental: {result.inserted} inserted, {result.updated} updated, "
+          f"{result.unchanged} unchanged")
+    return result
@@ -0,0 +1,216 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+from sqlalchemy import Table, and_, delete, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# PostgreSQL accepts at most 65535 bind parameters per statement
+MAX_BIND_PARAMETERS = 65535
+
+
+@dataclass
+class BulkSyncResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # Keys of the inserted or updated rows. Scalars for single column keys, tuples otherwise
+    changed_keys: list = field(default_factory=list)
+    # Only set by the set difference syncs (sync_set, sync_rows)
+    deleted: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def touched(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def __add__(self, other: "BulkSyncResult") -> "BulkSyncResult":
+        return BulkSyncResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+            changed_keys=self.changed_keys + other.changed_keys,
+            deleted=self.deleted + other.deleted,
+        )
+
+
+def _dedupe(rows: Iterable[dict], key_columns: Sequence[str]) -> list[dict]:
+    # ON CONFLICT cannot touch the same row twice in one statement: the last occurrence wins
+    unique = {}
+    for row in rows:
+        unique[tuple(row[column] for column in key_columns)] = row
+    return list(unique.values())
+
+
+async def bulk_upsert(
+        db: AsyncSession,
+        table: Table,
+        rows: Iterable[dict],
+        key_columns: Sequence[str] = ("id",),
+        update_columns: Sequence[str] | None = None,
+        extra_set: dict | None = None,
+        compare_columns: Sequence[str] | None = None,
+) -> BulkSyncResult:
+    """
+    Synchronizes a batch of incoming rows into a table with set-based statements:
+
+        INSERT ... ON CONFLICT (key) DO UPDATE SET ... WHERE (row) IS DISTINCT FROM (excluded)
+        RETURNING key, (xmax = 0)
+
+    Rows identical to the stored ones are neither rewritten nor returned, which gives the
+    inserted / updated / unchanged counts without reading the table first.
+    Rows are split in as many statements as needed to stay under the bind parameter limit.
+    Does not commit.
+
+    :param db: The session to execute the statements in.
+    :param table: Target table, e.g. `Worlds.__table__`.
+    :param rows: Incoming rows. All of them must have the same keys.
+    :param key_columns: Columns of the unique constraint used as conflict target.
+    :param update_columns: Columns compared and updated on conflict. Defaults to every non key column of the rows.
+    :param extra_set: Additional SET clauses applied to changed rows only, e.g. {"last_fetched": func.now()}.
+    :param compare_columns: Columns compared to decide whether a stored row changed. Defaults to `update_columns`.
+        Pass a content hash column to compare a single value instead of the whole row.
+    :return: BulkSyncResult with the number of inserted, updated and unchanged rows and the changed keys.
+    """
+    rows = _dedupe(rows, key_columns)
+    result = BulkSyncResult()
+    if not rows:
+        return result
+
+    if update_columns is None:
+        update_columns = [column for column in rows[0] if column not in key_columns]
+    if compare_columns is None:
+        compare_columns = update_columns
+    batch_size = max(1, MAX_BIND_PARAMETERS // len(rows[0]))
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        stmt = insert(table).values(batch)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key_columns),
+                set_={**{column: stmt.excluded[column] for column in update_columns}, **(extra_set or {})},
+                where=tuple_(*(table.c[column] for column in compare_columns)).is_distinct_from(
+                    tuple_(*(stmt.excluded[column] for column in compare_columns))
+                ),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        stmt = stmt.returning(*(table.c[column] for column in key_columns),
+                              literal_column("xmax = 0").label("inserted"))
+
+        written = (await db.execute(stmt)).all()
+        inserted = sum(1 for row in written if row[-1])
+        for row in written:
+            result.changed_keys.append(row[0] if len(key_columns) == 1 else tuple(row[:-1]))
+        result.inserted += inserted
+        result.updated += len(written) - inserted
+        result.unchanged += len(batch) - len(written)
+
+    return result
+
+
+def _scope_clause(table: Table, scope: dict):
+    return and_(*(table.c[column] == value for column, value in scope.items()))
+
+
+async def sync_set(db: AsyncSession, table: Table, scope: dict, column: str, values: Iterable) -> BulkSyncResult:
+    """
+    Makes the values of `column` stored under `scope` equal to `values`, e.g. the dyes unlocked by one account:
+
+        DELETE ... WHERE scope AND column IN (stored - values)
+        INSERT ... VALUES (values - stored)
+
+    Values present on both sides are not touched. Does not commit.
+
+    :param db: The session to execute the statements in.
+    :param table: Target table, e.g. `UnlockedDyes.__table__`.
+    :param scope: Column values owning the set, e.g. {"game_account_id": 42}.
+    :param column: Column holding the set members.
+    :param values: Every member the set must contain.
+    :return: BulkSyncResult with the number of inserted, deleted and unchanged members.
+    """
+    values = set(values)
+    stored = set((await db.execute(select(table.c[column]).where(_scope_clause(table, scope)))).scalars().all())
+    added = sorted(values - stored)
+    removed = sorted(stored - values)
+
+    if removed:
+        await db.execute(delete(table).where(_scope_clause(table, scope), table.c[column].in_(removed)))
+    batch_size = MAX_BIND_PARAMETERS // (len(scope) + 1)
+    for start in range(0, len(added), batch_size):
+        await db.execute(insert(table).values([{**scope, column: value} for value in added[start:start + batch_size]]))
+    return BulkSyncResult(inserted=len(added), unchanged=len(values & stored), deleted=len(removed))
+
+
+async def sync_rows(
+        db: AsyncSession,
+        table: Table,
+        scope: dict,
+        key_columns: Sequence[str],
+        rows: Iterable[dict],
+        conflict_columns: Sequence[str] | None = None,
+) -> BulkSyncResult:
+    """
+    Makes the rows stored under `scope` equal to `rows`, e.g. the characters of one account.
+    The stored rows are read once and diffed in memory: rows missing upstream are deleted, and only the new
+    or changed ones are written, with `bulk_upsert`. Unchanged rows are not touched. Does not commit.
+
+    :param db: The session to execute the statements in.
+    :param table: Target table, e.g. `Characters.__table__`.
+    :param scope: Column values owning the rows, e.g. {"game_account_id": 42}. Added to every row.
+    :param key_columns: Columns identifying a row within the scope, e.g. ("slot",).
+    :param rows: Every row the scope must contain. All of them must have the same keys.
+    :param conflict_columns: Unique constraint used to upsert. Defaults to the scope and key columns.
+    :return: BulkSyncResult with the number of inserted, updated, deleted and unchanged rows.
+    """
+    rows = [{**row, **scope} for row in rows]
+    columns = list(rows[0]) if rows else [*scope, *key_columns]
+    key_indexes = [columns.index(column) for column in key_columns]
+
+    stored = {}
+    for values in (await db.execute(select(*(table.c[column] for column in columns))
+                                    .where(_scope_clause(table, scope)))).all():
+        stored[tuple(values[index] for index in key_indexes)] = tuple(values)
+
+    upstream = {tuple(row[column] for column in key_columns): row for row in rows}
+    changed = [row for key, row in upstream.items() if stored.get(key) != tuple(row[column] for column in columns)]
+    removed = [key for key in stored if key not in upstream]
+
+    if removed:
+        key_clause = (table.c[key_columns[0]].in_([key[0] for key in removed]) if len(key_columns) == 1
+                      else tuple_(*(table.c[column] for column in key_columns)).in_(removed))
+        await db.execute(delete(table).where(_scope_clause(table, scope), key_clause))
+    result = await bulk_upsert(db, table, changed, key_columns=conflict_columns or (*scope, *key_columns))
+    result.unchanged += len(upstream) - len(changed)
+    result.deleted = len(removed)
+    return result
+
+
+async def copy_rows(db: AsyncSession, table: Table, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """
+    Appends rows to a table with COPY ... FROM STDIN, much cheaper than INSERT for large append-only batches
+    (no statement per row, no bind parameter limit).
+    Runs on the connection of the session, so the rows belong to its current transaction. Does not commit.
+
+    :param db: The session whose connection is used.
+    :param table: Target table, e.g. `WalletHistory.__table__`.
+    :param columns: Columns of the rows, in order.
+    :param rows: Tuples of values.
+    :return: The number of rows copied.
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    target = f"{table.schema}.{table.name}" if table.schema else table.name
+    statement = f"COPY {target} ({', '.join(columns)}) FROM STDIN"
+
+    copied = 0
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(statement) as copy:
+            for row in rows:
+                await copy.write_row(row)
+                copied += 1
+    return copied
@@ -0,0 +1,46 @@
+ITEM_TYPES_DATA = [
+    {"id": 0, "name_en": "Armor", "name_es": "Armadura", "name_de": "Rüstung", "name_fr": "Armure"},
+    {"id": 1, "name_en": "Back item", "name_es": "Accesorio para espalda", "name_de": "Rücken-Gegenstand", "name_fr": "Objet de dos"},
+    {"id": 2, "name_en": "Bag", "name_es": "Bolsa", "name_de": "Tasche", "name_fr": "Sac"},
+    {"id": 3, "name_en": "Consumable", "name_es": "Consumible", "name_de": "Verbrauchsgegenstand", "name_fr": "Consommable"},
+    {"id": 4, "name_en": "Container", "name_es": "Contenedor", "name_de": "Behälter", "name_fr": "Conteneur"},
+    {"id": 5, "name_en": "Crafting material", "name_es": "Material de artesanía", "name_de": "Handwerksmaterial", "name_fr": "Matériau d'artisanat"},
+    {"id": 6, "name_en": "Gathering tool", "name_es": "Herramienta de recolección", "name_de": "Sammelwerkzeug", "name_fr": "Outil de récolte"},
+    {"id": 7, "name_en": "Gizmo", "name_es": "Artilugio", "name_de": "Apparat", "name_fr": "Gadget"},
+    {"id": 8, "name_en": "Jade Bot module", "name_es": "Módulo de robot de jade", "name_de": "Jade-Bot-Modul", "name_fr": "Module de drone de jade"},
+    {"id": 9, "name_en": "Key", "name_es": "Llave", "name_de": "Schlüssel", "name_fr": "Clé"},
+    {"id": 10, "name_en": "Miniature", "name_es": "Miniatura", "name_de": "Miniatur", "name_fr": "Miniature"},
+    {"id": 11, "name_en": "Power core", "name_es": "Núcleo de energía", "name_de": "Energiekern", "name_fr": "Noyau d'énergie"},
+    {"id": 12, "name_en": "Relic", "name_es": "Reliquia", "name_de": "Relikt", "name_fr": "Relique"},
+    {"id": 13, "name_en": "Salvage kit", "name_es": "Kit de reciclaje", "name_de": "Wiederverwertungskit", "name_fr": "Kit de recyclage"},
+    {"id": 14, "name_en": "Trait guide", "name_es": "Guía de rasgos", "name_de": "Eigenschaftsleitfaden", "name_fr": "Guide d'aptitudes"},
+    {"id": 15, "name_en": "Trinket", "name_es": "Abalorio", "name_de": "Schmuck", "name_fr": "Colifichet"},
+    {"id": 16, "name_en": "Trophy", "name_es": "Trofeo", "name_de": "Trophäe", "name_fr": "Trophée"},
+    {"id": 17, "name_en": "Upgrade component", "name_es": "Componente de mejora", "name_de": "Aufwertungskomponente", "name_fr": "Composant d'amélioration"},
+    {"id": 18, "name_en": "Weapon", "name_es": "Arma", "name_de": "Waffe", "name_fr": "Arme"},
+    {"id": 19, "name_en": "Mount certificate", "name_es": "Certificado de montura", "name_de": "Reittier-Zertifikat", "name_fr": "Certificat de monture"},
+]
+
+# Item types as returned by the GW2 API -> item type id
+ITEM_TYPE_IDS = {
+    "Armor": 0,
+    "Back": 1,
+    "Bag": 2,
+    "Consumable": 3,
+    "Container": 4,
+    "CraftingMaterial": 5,
+    "Gathering": 6,
+    "Gizmo": 7,
+    "JadeTechModule": 8,
+    "Key": 9,
+    "MiniPet": 10,
+    "PowerCore": 11,
+    "Relic": 12,
+    "Tool": 13,
+    "Trait": 14,
+    "Trinket": 15,
+    "Trophy": 16,
+    "UpgradeComponent": 17,
+    "Weapon": 18,
+    "MountCertificate": 19,
+}
@@ -0,0 +1,13 @@
+RARITIES_DATA = [
+    {"id": 0, "name_en": "Junk", "name_es": "Basura", "name_de": "Schrott", "name_fr": "Déchet", "color": "[170,170,170]"},
+    {"id": 1, "name_en": "Basic", "name_es": "Básico", "name_de": "Einfach", "name_fr": "Simple", "color": "[255,255,255]"},
+    {"id": 2, "name_en": "Fine", "name_es": "Fino", "name_de": "Edel", "name_fr": "Raffiné", "color": "[98,164,218]"},
+    {"id": 3, "name_en": "Masterwork", "name_es": "Obra maestra", "name_de": "Meisterwerk", "name_fr": "Chef-d'œuvre", "color": "[26,147,6]"},
+    {"id": 4, "name_en": "Rare", "name_es": "Excepcional", "name_de": "Selten", "name_fr": "Rare", "color": "[252,208,11]"},
+    {"id": 5, "name_en": "Exotic", "name_es": "Exótico", "name_de": "Exotisch", "name_fr": "Exotique", "color": "[255,164,5]"},
+    {"id": 6, "name_en": "Ascended", "name_es": "Ascendido", "name_de": "Aufgestiegen", "name_fr": "Élevé", "color": "[251,62,141]"},
+    {"id": 7, "name_en": "Legendary", "name_es": "Legendario", "name_de": "Legendär", "name_fr": "Légendaire", "color": "[76,19,157]"},
+]
+
+# Rarity names as returned by the GW2 API -> rarity id
+RARITY_IDS = {rarity["name_en"]: rarity["id"] for rarity in RARITIES_DATA}
@@ -4,14 +4,16 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.data.genders_data import GENDERS_DATA
+from app.db.data.item_types_data import ITEM_TYPES_DATA
 from app.db.data.professions_data import PROFESSIONS_DATA
 from app.db.data.races_data import RACES_DATA
-from app.db.model import Genders, Races, Professions
+from app.db.data.rarities_data import RARITIES_DATA
+from app.db.model import Genders, Races, Professions, Rarities, ItemTypes
 
 
 async def seed_data(db: AsyncSession):
     """
-    Seeds the database with initial data for Genders, Races and Professions.
+    Seeds the database with initial data for Genders, Races, Professions, Rarities and Item Types.
     Updates existing entries if they differ from the seed data.
     """
     # Seed Genders
@@ -59,4 +61,35 @@ async def seed_data(db: AsyncSession):
             # Insert if not exists
             db.add(Professions(**prof_data))
 
+    # Seed Rarities
+    logging.info("Seeding Rarities...")
+    for rarity_data in RARITIES_DATA:
+        result = await db.execute(select(Rarities).filter_by(id=rarity_data["id"]))
+        rarity = result.scalar_one_or_none()
+        if rarity:
+            # Update if exists
+            rarity.name_en = rarity_data["name_en"]
+            rarity.name_es = rarity_data["name_es"]
+            rarity.name_de = rarity_data["name_de"]
+            rarity.name_fr = rarity_data["name_fr"]
+            rarity.color = rarity_data["color"]
+        else:
+            # Insert if not exists
+            db.add(Rarities(**rarity_data))
+
+    # Seed Item Types
+    logging.info("Seeding Item Types...")
+    for item_type_data in ITEM_TYPES_DATA:
+        result = await db.execute(select(ItemTypes).filter_by(id=item_type_data["id"]))
+        item_type = result.scalar_one_or_none()
+        if item_type:
+            # Update if exists
+            item_type.name_en = item_type_data["name_en"]
+            item_type.name_es = item_type_data["name_es"]
+            item_type.name_de = item_type_data["name_de"]
+            item_type.name_fr = item_type_data["name_fr"]
+        else:
+            # Insert if not exists
+            db.add(ItemTypes(**item_type_data))
+
     await db.commit()
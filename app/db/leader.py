@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import func, insert, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.db.dependency import get_db
+from app.db.model import CrawlRuns
+
+# Identifies this process in crawl_runs
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def advisory_lock_key(name: str) -> int:
+    """Maps a lock name to the signed 64 bit key expected by pg_advisory_lock."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class LeaderElection:
+    """
+    Elects one process among every worker / pod sharing the database to run the scheduled jobs.
+
+    The leader is whoever holds a session level Postgres advisory lock. The lock lives on a dedicated
+    connection kept open while leading, so it is released by Postgres as soon as the leader process dies
+    or loses its connection. Followers try to take the lock every `interval` seconds, and the leader uses
+    the same tick to check its connection is still alive.
+    """
+
+    def __init__(self, engine: AsyncEngine, lock_name: str = "tyriavault-scheduler", interval: float = 30):
+        """
+        :param engine: Engine the lock connection is taken from.
+        :param lock_name: Name of the advisory lock. Instances with the same name compete for leadership.
+        :param interval: Seconds between two leadership checks.
+        """
+        self.engine = engine
+        self.lock_key = advisory_lock_key(lock_name)
+        self.interval = interval
+        self._connection: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None
+
+    async def start(self):
+        """Runs a first election right away, then keeps checking in the background."""
+        await self.tick()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops checking and gives up leadership, so another instance can take over without waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None:
+            try:
+                await self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            except DBAPIError:
+                pass
+            await self._release()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logging.error(f"Leader election failed: {e}")
+
+    async def tick(self):
+        if self._connection is not None:
+            # The lock is only as alive as the connection holding it
+            try:
+                await self._connection.execute(text("SELECT 1"))
+            except DBAPIError as e:
+                logging.warning(f"Lost the leader connection, stepping down: {e}")
+                await self._release()
+            return
+
+        connection = await (await self.engine.connect()).execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = (await connection.execute(text("SELECT pg_try_advisory_lock(:key)"),
+                                                 {"key": self.lock_key})).scalar()
+        except BaseException:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return
+
+        self._connection = connection
+        logging.info(f"{OWNER} is now the leader for scheduled jobs")
+        # Runs still marked as running belong to a previous leader which died mid run
+        await connection.execute(
+            update(CrawlRuns)
+            .where(CrawlRuns.status == "running")
+            .values(status="abandoned", finished_at=func.now())
+        )
+
+    async def _release(self):
+        connection, self._connection = self._connection, None
+        try:
+            await connection.close()
+        except DBAPIError:
+            pass
+
+
+async def run_as_leader(election: LeaderElection, job_name: str, job: Callable[[AsyncSession], Awaitable]):
+    """
+    Runs a scheduled job only on the leader instance, recording the run in crawl_runs.
+    The run is committed as "running" before the job starts, so crashes are visible.
+    :return: The job result, None when this instance is not the leader or the job failed.
+    """
+    if not election.is_leader:
+        logging.debug(f"Skipping {job_name}: {OWNER} is not the leader")
+        return None
+
+    async for db in get_db():
+        run_id = (await db.execute(
+            insert(CrawlRuns).values(job_name=job_name, owner=OWNER, status="running").returning(CrawlRuns.id)
+        )).scalar_one()
+        await db.commit()
+
+        status, detail, result = "succeeded", None, None
+        try:
+            result = await job(db)
+        except Exception as e:
+            await db.rollback()
+            logging.error(f"Job {job_name} failed: {e}")
+            status, detail = "failed", str(e)
+
+        await db.execute(
+            update(CrawlRuns).where(CrawlRuns.id == run_id).values(status=status, finished_at=func.now(),
+                                                                   detail=detail)
+        )
+        await db.commit()
+        return result
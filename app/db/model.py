@@ -26,6 +26,8 @@ class Achievements(Base):
     achievement_type: Mapped[str] = mapped_column(String(60), nullable=False)
     last_fetched: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
                                                             server_default=text('CURRENT_TIMESTAMP'))
+    content_hash: Mapped[Optional[str]] = mapped_column(CHAR(64),
+                                                        comment='SHA-256 of the normalized upstream payload')
     description_es: Mapped[Optional[str]] = mapped_column(Text)
     description_fr: Mapped[Optional[str]] = mapped_column(Text)
     description_en: Mapped[Optional[str]] = mapped_column(Text)
@@ -34,6 +36,78 @@ class Achievements(Base):
     icon: Mapped[Optional[str]] = mapped_column(Text)
 
 
+class BuildChecks(Base):
+    __tablename__ = 'build_checks'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='pk_build_checks'),
+        Index('idx_build_checks', 'checked_at'),
+        {'comment': 'Every poll of the GW2 /v2/build endpoint and the catalogue crawls it triggered',
+         'schema': 'schema_tyriavault'}
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(start=0, increment=1, minvalue=0,
+                                                         maxvalue=9223372036854775807, cycle=False, cache=1),
+                                    primary_key=True)
+    build_id: Mapped[int] = mapped_column(Integer, nullable=False, comment='Game build id reported by the API')
+    checked_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
+                                                          server_default=text('CURRENT_TIMESTAMP'))
+    triggered_jobs: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default=text("'{}'::jsonb"),
+                                                 comment='Crawlers run by this check: {"job": {"reason": ..., '
+                                                         '"requests": ...}}')
+    upstream_requests: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'),
+                                                   comment='GW2 requests made by this check, crawls included')
+    skipped_requests: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'),
+                                                  comment='Estimated GW2 requests saved by not running the '
+                                                          'skipped crawlers')
+
+
+class CrawlCheckpoints(Base):
+    __tablename__ = 'crawl_checkpoints'
+    __table_args__ = (
+        PrimaryKeyConstraint('job_name', name='pk_crawl_checkpoints'),
+        {'comment': 'Progress of the resumable crawls, written in the same transaction as every batch',
+         'schema': 'schema_tyriavault'}
+    )
+
+    job_name: Mapped[str] = mapped_column(String(60), primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, comment='running or completed')
+    started_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
+                                                          server_default=text('CURRENT_TIMESTAMP'))
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
+                                                          server_default=text('CURRENT_TIMESTAMP'))
+    watermark: Mapped[Optional[int]] = mapped_column(BigInteger,
+                                                     comment='Every id up to this one is crawled. Ids are crawled '
+                                                             'in ascending order')
+    total_ids: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    chunks_done: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    inserted: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    updated: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    unchanged: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    finished_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(True))
+
+
+class CrawlRuns(Base):
+    __tablename__ = 'crawl_runs'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='pk_crawl_runs'),
+        Index('idx_crawl_runs', 'job_name', 'started_at'),
+        {'comment': 'Every run of a scheduled job, executed by the elected leader instance',
+         'schema': 'schema_tyriavault'}
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(start=0, increment=1, minvalue=0,
+                                                         maxvalue=9223372036854775807, cycle=False, cache=1),
+                                    primary_key=True)
+    job_name: Mapped[str] = mapped_column(String(60), nullable=False)
+    owner: Mapped[str] = mapped_column(String(120), nullable=False, comment='Instance running the job, as host:pid')
+    started_at: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
+                                                          server_default=text('CURRENT_TIMESTAMP'))
+    status: Mapped[str] = mapped_column(String(20), nullable=False,
+                                        comment='running, succeeded, failed or abandoned (owner died mid run)')
+    finished_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(True))
+    detail: Mapped[Optional[str]] = mapped_column(Text, comment='Error message of failed runs')
+
+
 class Currencies(Base):
     __tablename__ = 'currencies'
     __table_args__ = (
@@ -227,8 +301,11 @@ class ItemsCache(Base):
         ForeignKeyConstraint(['rarity_id'], ['schema_tyriavault.rarities.id'], ondelete='CASCADE', onupdate='CASCADE',
                              name='fk_items_cache_rarities'),
         PrimaryKeyConstraint('id', name='pk_items_cache'),
-        Index('idx_items_cache_0', 'item_type_id'),
-        Index('idx_items_cache_1', 'rarity_id'),
+        # Filter column(s) then id: the keyset pagination of /items walks them in order, without sorting
+        Index('idx_items_cache_0', 'item_type_id', 'id'),
+        Index('idx_items_cache_1', 'rarity_id', 'id'),
+        Index('idx_items_cache_2', 'item_type_id', 'rarity_id', 'id'),
+        Index('idx_items_cache_3', 'required_level', 'id'),
         {'schema': 'schema_tyriavault'}
     )
 
@@ -242,6 +319,8 @@ class ItemsCache(Base):
     last_fetched: Mapped[datetime.datetime] = mapped_column(DateTime(True), nullable=False,
                                                             server_default=text('CURRENT_TIMESTAMP'),
                                                             comment='Last time the data of this item was fetched from the API')
+    content_hash: Mapped[Optional[str]] = mapped_column(CHAR(64),
+                                                        comment='SHA-256 of the normalized upstream payload')
     chat_link: Mapped[str] = mapped_column(String, nullable=False, comment='String with the ingame chat link')
     icon: Mapped[Optional[str]] = mapped_column(Text, comment='Icon URL')
     required_level: Mapped[Optional[int]] = mapped_column(Integer,
@@ -278,7 +357,12 @@ class ApiKeys(Base):
     api_key: Mapped[str] = mapped_column(String(80), nullable=False)
     permissions: Mapped[Optional[dict]] = mapped_column(JSONB)
     game_account_id: Mapped[Optional[int]] = mapped_column(Integer)
-    last_time_checked: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(True))
+    last_time_checked: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(True),
+                                                                           comment='Last sync of the account of '
+                                                                                   'this key with the GW2 API')
+    last_used: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(True),
+                                                                   comment='Last request of a user with this key, '
+                                                                           'with a few minutes precision')
 
     game_account: Mapped[Optional['GameAccounts']] = relationship('GameAccounts', back_populates='api_keys')
 
@@ -290,15 +374,19 @@ class Bank(Base):
         ForeignKeyConstraint(['dye02_id'], ['schema_tyriavault.dyes.id'], name='fk_bank_dyes_0'),
         ForeignKeyConstraint(['dye03_id'], ['schema_tyriavault.dyes.id'], name='fk_bank_dyes_1'),
         ForeignKeyConstraint(['dye04_id'], ['schema_tyriavault.dyes.id'], name='fk_bank_dyes_2'),
+        ForeignKeyConstraint(['game_account_id'], ['schema_tyriavault.game_accounts.id'], ondelete='CASCADE',
+                             onupdate='CASCADE', name='fk_bank_game_accounts'),
         ForeignKeyConstraint(['item_id'], ['schema_tyriavault.items_cache.id'], ondelete='SET NULL', onupdate='CASCADE',
                              name='fk_bank_items_cache'),
         PrimaryKeyConstraint('id', name='pk_bank'),
-        UniqueConstraint('game_account_id', name='unq_bank_game_account_id'),
-        {'schema': 'schema_tyriavault'}
+        UniqueConstraint('game_account_id', 'slot', name='unq_bank_slot'),
+        {'comment': 'Non empty bank slots of a given game account', 'schema': 'schema_tyriavault'}
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(BigInteger, Identity(start=0, increment=1, minvalue=0, maxvalue=9223372036854775807,
+                                                         cycle=False, cache=1), primary_key=True)
     game_account_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    slot: Mapped[int] = mapped_column(Integer, nullable=False, comment='Position of the slot in the bank, from 0')
     item_id: Mapped[Optional[int]] = mapped_column(BigInteger)
     dye01_id: Mapped[Optional[int]] = mapped_column(Integer)
     dye02_id: Mapped[Optional[int]] = mapped_column(Integer)
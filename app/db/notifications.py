@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# Channel of the "this data changed" notifications, payload is the name of the data set (e.g. "worlds")
+CHANGES_CHANNEL = "tyriavault_changes"
+
+
+async def notify_changed(db: AsyncSession, name: str):
+    """
+    Tells every process listening on CHANGES_CHANNEL that the data set `name` changed.
+    Postgres delivers the notification when the transaction commits, and drops it on rollback,
+    so listeners never see a change that did not happen. Does not commit.
+    """
+    await db.execute(select(func.pg_notify(CHANGES_CHANNEL, name)))
+
+
+class NotificationListener:
+    """
+    Listens to a Postgres notification channel on a dedicated connection and calls `on_notify` with the
+    payload of every notification.
+
+    Notifications sent while the listener was disconnected are lost: after every (re)connection
+    `on_notify(None)` is called, meaning "anything may have changed".
+    """
+
+    def __init__(self, engine: AsyncEngine, on_notify: Callable[[str | None], None],
+                 channel: str = CHANGES_CHANNEL, retry_interval: float = 30):
+        """
+        :param engine: Engine the listening connection is taken from.
+        :param on_notify: Called with the payload of every notification, or None after a (re)connection.
+        :param channel: Channel to LISTEN on.
+        :param retry_interval: Seconds between two connection attempts.
+        """
+        self.engine = engine
+        self.on_notify = on_notify
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Lost the {self.channel} notification channel, reconnecting in "
+                                f"{self.retry_interval}s: {e}")
+            await asyncio.sleep(self.retry_interval)
+
+    async def listen(self):
+        async with self.engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.exec_driver_sql(f"LISTEN {self.channel}")
+            raw_connection = await connection.get_raw_connection()
+            self.on_notify(None)
+            async for notification in raw_connection.driver_connection.notifies():
+                self.on_notify(notification.payload)
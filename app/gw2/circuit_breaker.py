@@ -0,0 +1,114 @@
+import logging
+import re
+import time
+from enum import Enum
+
+import httpx
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.RequestError):
+    """
+    Raised instead of calling the GW2 API while the circuit of an endpoint is open.
+    It is an httpx.RequestError, so callers already handling connection failures treat it the same way.
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks upstream failures (5xx and network errors) of one endpoint.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests fail fast.
+    Once `reset_timeout` seconds have passed, up to `half_open_max_calls` probe requests are let through:
+    a successful probe closes the circuit again, a failed one re-opens it for another `reset_timeout`.
+    A rate limited probe (429) says nothing about the endpoint health: its slot is released for the next probe.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._half_open_calls = 0
+
+    def allow_request(self) -> bool:
+        if self.state is CircuitState.CLOSED:
+            return True
+
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            logging.info(f"Circuit for {self.name} half-open, probing GW2 API")
+
+        if self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        return False
+
+    def release_probe(self):
+        """Settles a request that neither succeeded nor failed (e.g. a 429), freeing its half-open probe slot."""
+        if self.state is CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self):
+        if self.state is not CircuitState.CLOSED:
+            logging.info(f"Circuit for {self.name} closed")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state is CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                logging.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures")
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.opened_at else None,
+        }
+
+
+class CircuitBreakerRegistry:
+    """One CircuitBreaker per endpoint, ids and query strings stripped ("/items/123?lang=en" -> "/items")."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def endpoint_name(endpoint: str) -> str:
+        path = endpoint.split("?", 1)[0]
+        segments = [segment for segment in path.split("/") if segment and not re.fullmatch(r"[\d,-]+", segment)]
+        return "/" + "/".join(segments)
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        name = self.endpoint_name(endpoint)
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+            self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self) -> dict[str, dict]:
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+    def any_open(self) -> bool:
+        return any(breaker.state is not CircuitState.CLOSED for breaker in self._breakers.values())
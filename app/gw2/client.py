@@ -1,11 +1,70 @@
 import asyncio
+import datetime
+import email.utils
 import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 
 import httpx
+import msgspec
+
+from app.core.config import settings
+from app.gw2.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+from app.gw2.models import Account, BankSlot, Character, Currency, Dye, Item, TokenInfo, WalletEntry, World
+from app.gw2.rate_limiter import Priority, RateLimiter
+from app.gw2.response_cache import ResponseCache
+from app.gw2.single_flight import SingleFlight
 
 BASE_URL = "https://api.guildwars2.com/v2"
 
+# Upstream hard limit for the number of ids accepted by a single "?ids=" request
+MAX_IDS_PER_REQUEST = 200
+
+# How long single-id lookups wait for company before being flushed as one bulk request
+BATCH_WINDOW_SECONDS = 0.01
+
+# Marker added to the response headers when stale data is served because the endpoint circuit is open
+STALE_HEADER = "X-TyriaVault-Stale"
+
 _gw2_http_client: httpx.AsyncClient | None = None
+_gw2_rate_limiter: RateLimiter | None = None
+_gw2_response_cache: ResponseCache | None = None
+_gw2_token_response_cache: ResponseCache | None = None
+_gw2_circuit_breakers: CircuitBreakerRegistry | None = None
+# Loaders of the public (no API key) endpoints, shared by every client so lookups from different requests coalesce
+_batch_loaders: dict[tuple, "_BatchLoader"] = {}
+_single_flight = SingleFlight()
+
+
+@dataclass
+class RequestCounter:
+    """Number of upstream requests sent within a `count_requests` block."""
+    requests: int = 0
+
+
+# Tasks inherit the context they are created in, so requests sent by tasks spawned inside the block are counted too
+_request_counter: ContextVar[RequestCounter | None] = ContextVar("gw2_request_counter", default=None)
+
+
+@contextmanager
+def count_requests() -> Iterator[RequestCounter]:
+    """
+    Counts the GW2 requests actually sent (cache hits and coalesced calls excluded) by the enclosed code:
+
+        with count_requests() as counter:
+            await update_worlds_incremental(db)
+        print(counter.requests)
+    """
+    counter = RequestCounter()
+    token = _request_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_counter.reset(token)
 
 
 def get_gw2_http_client() -> httpx.AsyncClient:
@@ -18,53 +77,298 @@ def get_gw2_http_client() -> httpx.AsyncClient:
     return _gw2_http_client
 
 
+def get_gw2_rate_limiter() -> RateLimiter | None:
+    """
+    Returns the shared RateLimiter instance, or None if the client is not initialized.
+    """
+    return _gw2_rate_limiter
+
+
+def get_gw2_response_cache() -> ResponseCache | None:
+    """
+    Returns the shared ResponseCache instance, or None if the client is not initialized.
+    Its `stats()` expose hit / miss / revalidation counters.
+    """
+    return _gw2_response_cache
+
+
+def get_gw2_token_response_cache() -> ResponseCache | None:
+    """
+    Returns the ResponseCache of the per API key responses, or None if the client is not initialized.
+    Kept apart so per-key entries (account, wallet...) never evict the shared ones.
+    """
+    return _gw2_token_response_cache
+
+
+def get_gw2_circuit_breakers() -> CircuitBreakerRegistry | None:
+    """
+    Returns the shared per-endpoint circuit breakers, or None if the client is not initialized.
+    """
+    return _gw2_circuit_breakers
+
+
 async def startup_gw2_client():
     """To be called during application startup."""
-    global _gw2_http_client
-    _gw2_http_client = httpx.AsyncClient(base_url=BASE_URL, timeout=10.0)
+    global _gw2_http_client, _gw2_rate_limiter, _gw2_response_cache, _gw2_token_response_cache, \
+        _gw2_circuit_breakers
+    _gw2_http_client = httpx.AsyncClient(base_url=settings.GW2_BASE_URL, timeout=10.0)
+    _gw2_rate_limiter = RateLimiter(
+        requests_per_minute=settings.GW2_REQUESTS_PER_MINUTE,
+        burst=settings.GW2_RATE_LIMIT_BURST,
+        crawler_max_concurrency=settings.GW2_CRAWLER_MAX_CONCURRENCY,
+    )
+    _gw2_response_cache = ResponseCache(max_entries=settings.GW2_RESPONSE_CACHE_SIZE)
+    _gw2_token_response_cache = ResponseCache(max_entries=settings.GW2_TOKEN_RESPONSE_CACHE_SIZE)
+    _gw2_circuit_breakers = CircuitBreakerRegistry(
+        failure_threshold=settings.GW2_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.GW2_CIRCUIT_RESET_SECONDS,
+    )
 
 
 async def shutdown_gw2_client():
     """To be called during application shutdown."""
-    global _gw2_http_client
+    global _gw2_http_client, _gw2_rate_limiter, _gw2_response_cache, _gw2_token_response_cache, \
+        _gw2_circuit_breakers
+    _batch_loaders.clear()
+    _gw2_rate_limiter = None
+    _gw2_response_cache = None
+    _gw2_token_response_cache = None
+    _gw2_circuit_breakers = None
     if _gw2_http_client:
         await _gw2_http_client.aclose()
         _gw2_http_client = None
 
 
+@dataclass
+class Page:
+    """
+    One page of a paginated collection.
+    :param index: Page number (or id chunk number when walking an id list).
+    :param items: Parsed entries of the page.
+    :param page_total: Total number of pages of the walk.
+    :param result_total: Total number of entries of the collection.
+    """
+    index: int
+    items: list
+    page_total: int
+    result_total: int
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header, either delay seconds ("120") or an HTTP-date.
+    :return: The delay in seconds, None when missing or unparsable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def _normalize_id(entry_id: int | str) -> int | str:
+    """Numeric ids given as strings ("123") are matched as the integers the API returns."""
+    return int(entry_id) if isinstance(entry_id, str) and entry_id.isdigit() else entry_id
+
+
+@dataclass
+class BulkResult:
+    """
+    Result of a bulk id lookup.
+    :param found: Entries returned by the API, keyed by their id.
+    :param missing: Requested ids the API did not return (unknown or invalid ids).
+    """
+    found: dict[int | str, dict] = field(default_factory=dict)
+    missing: list[int | str] = field(default_factory=list)
+
+
+class _BatchLoader:
+    """
+    Dataloader-style coalescer: single-id lookups issued by different coroutines within
+    BATCH_WINDOW_SECONDS are merged into one bulk request against an id-keyed endpoint.
+    """
+
+    def __init__(self, fetch: Callable[[list], Awaitable[BulkResult]], window: float = BATCH_WINDOW_SECONDS):
+        self._fetch = fetch
+        self._window = window
+        self._pending: dict[int | str, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, entry_id: int | str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(entry_id, []).append(future)
+        if len(self._pending) >= MAX_IDS_PER_REQUEST:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._dispatch)
+        return future
+
+    def _dispatch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._resolve(batch))
+            # Keep a strong reference until the batch is resolved
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @property
+    def idle(self) -> bool:
+        """Nothing pending nor in flight: the loader can be dropped."""
+        return not self._pending and all(task.done() for task in self._tasks)
+
+    async def _resolve(self, batch: dict[int | str, list[asyncio.Future]]):
+        try:
+            result = await self._fetch(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for entry_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(result.found.get(entry_id))
+
+
 class GW2Client:
     def __init__(
             self,
             api_key: str | None = None,
             max_retries: int = 3,
             backoff_factor: float = 1.5,
+            priority: Priority = Priority.INTERACTIVE,
     ):
         """
         :param api_key: Optional API key for authenticated requests.
         :param max_retries: Maximum number of retries for failed requests.
         :param backoff_factor: Multiplier for calculating wait time between retries.
+        :param priority: Rate limiter lane used by this client. Background jobs must use Priority.CRAWLER.
         """
         self.api_key = api_key
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
+        self.priority = priority
         self.client = get_gw2_http_client()
+        self.rate_limiter = get_gw2_rate_limiter()
+        # Crawler responses are written to the database: caching them would only hold the catalogue in memory
+        if priority is Priority.CRAWLER:
+            self.response_cache = None
+        elif api_key:
+            self.response_cache = get_gw2_token_response_cache()
+        else:
+            self.response_cache = get_gw2_response_cache()
+        self.circuit_breakers = get_gw2_circuit_breakers()
+        # Whether the last `_get` answer was stale data served while the endpoint circuit was open
+        self.last_response_stale = False
+        # Loaders of the endpoints requiring this client's API key, see load_one
+        self._batch_loaders: dict[tuple, _BatchLoader] = {}
 
     def _headers(self):
         if self.api_key:
             return {"Authorization": f"Bearer {self.api_key}"}
         return {}
 
-    async def _get(self, endpoint: str, params: dict | None = None, require_token: bool = False):
+    async def _send(self, endpoint: str, params: dict | None = None, headers: dict | None = None) -> httpx.Response:
+        """Sends a single GET request through the shared rate limiter."""
+        headers = {**self._headers(), **(headers or {})}
+        counter = _request_counter.get()
+        if counter is not None:
+            counter.requests += 1
+        if self.rate_limiter is None:
+            return await self.client.get(endpoint, params=params, headers=headers)
+
+        async with self.rate_limiter.slot(self.priority):
+            start = time.monotonic()
+            try:
+                response = await self.client.get(endpoint, params=params, headers=headers)
+            except httpx.RequestError:
+                self.rate_limiter.observe(None, time.monotonic() - start)
+                raise
+            retry_after = response.headers.get("Retry-After") if response.status_code == 429 else None
+            self.rate_limiter.observe(
+                response.status_code,
+                time.monotonic() - start,
+                retry_after=parse_retry_after(retry_after),
+            )
+            return response
+
+    async def _get(self, endpoint: str, params: dict | None = None, require_token: bool = False,
+                   model: type | None = None):
+        """
+        :param model: Optional type (e.g. `list[Item]`) the response is decoded into, see app.gw2.models.
+            Without it the response is returned as parsed JSON (dicts and lists).
+            `bytes` returns the raw body, for callers decoding it elsewhere (e.g. in a process pool).
+        """
+        data, headers = await self._get_with_headers(endpoint, params=params, require_token=require_token,
+                                                     model=model)
+        self.last_response_stale = STALE_HEADER in headers
+        return data
+
+    async def _get_with_headers(
+            self,
+            endpoint: str,
+            params: dict | None = None,
+            require_token: bool = False,
+            model: type | None = None,
+    ) -> tuple[object, dict[str, str]]:
+        """
+        Like `_get`, but also returns the pagination headers (see ResponseCache.KEPT_HEADERS) of the response.
+        """
         if require_token and not self.api_key:
             raise ValueError(f"This endpoint requires an API key to work: {endpoint}")
 
+        # Identical concurrent requests (same endpoint, params, credential and lane) share one upstream call.
+        # The lane is part of the key, so interactive callers never wait on a throttled crawler request
+        request_key = ResponseCache.key(endpoint, params, self.api_key, model)
+        return await _single_flight.do((request_key, self.priority),
+                                       lambda: self._fetch(endpoint, params, request_key, model))
+
+    async def _fetch(self, endpoint: str, params: dict | None, cache_key: tuple,
+                     model: type | None = None) -> tuple[object, dict[str, str]]:
+        cached = self.response_cache.lookup(cache_key) if self.response_cache is not None else None
+        if cached is not None and cached.is_fresh():
+            return cached.data, cached.headers
+        conditional_headers = cached.conditional_headers() if cached is not None else None
+        breaker = self.circuit_breakers.get(endpoint) if self.circuit_breakers is not None else None
+
         retries = 0
         while True:
+            # Checked before every attempt, so an outage detected mid-retry stops the backoff sequence too
+            if breaker is not None and not breaker.allow_request():
+                return self._serve_stale(cache_key, breaker)
+
             try:
-                response = await self.client.get(endpoint, params=params, headers=self._headers())
+                response = await self._send(endpoint, params=params, headers=conditional_headers)
+
+                if breaker is not None:
+                    if response.status_code == 429:
+                        breaker.release_probe()
+                    elif response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+
+                if response.status_code == 304 and cached is not None:
+                    self.response_cache.mark_not_modified(cached, response.headers)
+                    return cached.data, cached.headers
 
                 if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 1))
+                    retry_after = parse_retry_after(response.headers.get("Retry-After", "1"))
                     wait_time = retry_after or self.backoff_factor * (2 ** retries)
                     logging.warn(f"Rate limit reached. Retrying in {wait_time:.1f}s...")
                     await asyncio.sleep(wait_time)
@@ -83,9 +387,22 @@ class GW2Client:
                     continue
 
                 response.raise_for_status()
-                return response.json()
+                if model is bytes:
+                    data = response.content
+                elif model is None:
+                    data = response.json()
+                else:
+                    data = msgspec.json.decode(response.content, type=model)
+                if self.response_cache is not None:
+                    self.response_cache.store(cache_key, data, response.headers)
+                kept_headers = {
+                    name: response.headers[name] for name in ResponseCache.KEPT_HEADERS if name in response.headers
+                }
+                return data, kept_headers
 
             except httpx.RequestError as e:
+                if breaker is not None:
+                    breaker.record_failure()
                 retries += 1
                 if retries > self.max_retries:
                     raise RuntimeError(f"Conection error after {self.max_retries} attemps: {e}")
@@ -93,21 +410,230 @@ class GW2Client:
                 logging.warn(f"Network error: {e}. Retrying in {wait_time:.1f}s...")
                 await asyncio.sleep(wait_time)
 
-        response = await self.client.get(endpoint, params=params, headers=self._headers())
-        response.raise_for_status()
-        return response.json()
+    def _serve_stale(self, cache_key: tuple, breaker: CircuitBreaker) -> tuple[object, dict[str, str]]:
+        """
+        Serves the last known good response while the circuit of the endpoint is open.
+        Raises CircuitOpenError when there is nothing to fall back to.
+        """
+        entry = self.response_cache.peek(cache_key) if self.response_cache is not None else None
+        if entry is None:
+            raise CircuitOpenError(f"GW2 API unavailable for {breaker.name} (circuit {breaker.state.value})")
+        logging.warning(f"Circuit for {breaker.name} is {breaker.state.value}, serving stale response")
+        return entry.data, {**entry.headers, STALE_HEADER: "true"}
+
+    async def token_info(self, typed: bool = False):
+        return await self._get("/tokeninfo", require_token=True, model=TokenInfo if typed else None)
+
+    async def get_account(self, typed: bool = False):
+        return await self._get("/account", require_token=True, model=Account if typed else None)
+
+    async def get_wallet(self, typed: bool = False):
+        return await self._get("/account/wallet", require_token=True, model=list[WalletEntry] if typed else None)
+
+    async def get_characters(self, typed: bool = False):
+        return await self._get("/characters?ids=all", require_token=True, model=list[Character] if typed else None)
+
+    async def get_bank(self, typed: bool = False):
+        return await self._get("/account/bank", require_token=True, model=list[BankSlot | None] if typed else None)
+
+    async def get_unlocked_dyes(self) -> list[int]:
+        return await self._get("/account/dyes", require_token=True, model=list[int])
+
+    async def get_unlocked_emotes(self) -> list[str]:
+        return await self._get("/account/emotes", require_token=True, model=list[str])
+
+    async def get_worlds(self, lang: str = "en", typed: bool = False):
+        return await self._get(f"/worlds?lang={lang}&ids=all", require_token=False,
+                               model=list[World] if typed else None)
+
+    async def get_many(
+            self,
+            endpoint: str,
+            ids: Iterable[int | str],
+            lang: str | None = None,
+            require_token: bool = False,
+            model: type | None = None,
+    ) -> BulkResult:
+        """
+        Fetches the given ids from an id-keyed endpoint using "?ids=" bulk requests.
+        Ids are deduplicated and split in chunks of MAX_IDS_PER_REQUEST, which are requested concurrently.
+        :param endpoint: Id-keyed endpoint, e.g. "/items".
+        :param ids: Ids to fetch.
+        :param lang: Optional language of the localized fields.
+        :param require_token: Whether the endpoint requires an API key.
+        :param model: Optional struct type each entry is decoded into, e.g. `Item`.
+        :return: BulkResult with the entries found and the ids the API did not return.
+        """
+        unique_ids = list(dict.fromkeys(_normalize_id(entry_id) for entry_id in ids))
+        chunks = [unique_ids[i:i + MAX_IDS_PER_REQUEST] for i in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)]
+        responses = await asyncio.gather(
+            *(self._get_chunk(endpoint, chunk, lang, require_token, model) for chunk in chunks)
+        )
+
+        result = BulkResult()
+        for entries in responses:
+            for entry in entries:
+                result.found[entry["id"] if model is None else entry.id] = entry
+        result.missing = [entry_id for entry_id in unique_ids if entry_id not in result.found]
+        return result
+
+    async def _get_chunk(self, endpoint: str, ids: list, lang: str | None, require_token: bool,
+                         model: type | None = None):
+        params = {"ids": ",".join(str(entry_id) for entry_id in ids)}
+        if lang:
+            params["lang"] = lang
+        try:
+            return await self._get(endpoint, params=params, require_token=require_token,
+                                   model=list[model] if model not in (None, bytes) else model)
+        except httpx.HTTPStatusError as e:
+            # The API answers 404 when none of the requested ids exist
+            if e.response.status_code == 404:
+                return b"[]" if model is bytes else []
+            raise
+
+    async def get_ids(self, endpoint: str, require_token: bool = False) -> list[int | str]:
+        """Returns every id of an id-keyed collection, e.g. "/items"."""
+        return await self._get(endpoint, require_token=require_token)
+
+    async def iter_pages(
+            self,
+            endpoint: str,
+            page_size: int = MAX_IDS_PER_REQUEST,
+            start_page: int = 0,
+            max_in_flight: int = 4,
+            lang: str | None = None,
+            require_token: bool = False,
+            model: type | None = None,
+    ) -> AsyncIterator[Page]:
+        """
+        Walks a paginated collection using page / page_size, keeping at most `max_in_flight` pages
+        requested ahead of the consumer. Pages are yielded in order, so the caller can persist
+        `page.index` and resume later through `start_page`.
+        The first page is fetched alone to read X-Page-Total / X-Result-Total and plan the rest of the walk.
+        """
+        base_params = {"page_size": page_size}
+        if lang:
+            base_params["lang"] = lang
+
+        async def fetch_page(index: int) -> Page:
+            items, headers = await self._get_with_headers(
+                endpoint, params={**base_params, "page": index}, require_token=require_token,
+                model=list[model] if model is not None else None,
+            )
+            return Page(
+                index=index,
+                items=items,
+                page_total=int(headers.get("X-Page-Total", index + 1)),
+                result_total=int(headers.get("X-Result-Total", len(items))),
+            )
+
+        try:
+            first_page = await fetch_page(start_page)
+        except httpx.HTTPStatusError as e:
+            # Resuming past the last page: the API answers 400 "page out of range"
+            if start_page > 0 and e.response.status_code == 400:
+                return
+            raise
+        yield first_page
+
+        async for page in self._iter_window(
+                (fetch_page(index) for index in range(start_page + 1, first_page.page_total)), max_in_flight):
+            yield page
+
+    async def iter_id_chunks(
+            self,
+            endpoint: str,
+            ids: list[int | str],
+            chunk_size: int = MAX_IDS_PER_REQUEST,
+            start_chunk: int = 0,
+            max_in_flight: int = 4,
+            lang: str | None = None,
+            require_token: bool = False,
+            model: type | None = None,
+    ) -> AsyncIterator[Page]:
+        """
+        Walks an id list in "?ids=" chunks, keeping at most `max_in_flight` chunks requested ahead of the consumer.
+        Chunks are yielded in order; `page.index` is the chunk number, usable as `start_chunk` to resume.
+        With `model=bytes`, `page.items` is the raw JSON array of the chunk.
+        """
+        chunk_size = min(chunk_size, MAX_IDS_PER_REQUEST)
+        chunk_total = (len(ids) + chunk_size - 1) // chunk_size
+
+        async def fetch_chunk(index: int) -> Page:
+            chunk = ids[index * chunk_size:(index + 1) * chunk_size]
+            items = await self._get_chunk(endpoint, chunk, lang, require_token, model)
+            return Page(index=index, items=items, page_total=chunk_total, result_total=len(ids))
+
+        async for page in self._iter_window(
+                (fetch_chunk(index) for index in range(start_chunk, chunk_total)), max_in_flight):
+            yield page
+
+    @staticmethod
+    async def _iter_window(fetches: Iterable[Awaitable[Page]], max_in_flight: int) -> AsyncIterator[Page]:
+        """Runs the fetches with a bounded look-ahead window and yields their results in order."""
+        pending = iter(fetches)
+        window: deque[asyncio.Task] = deque()
+        try:
+            while True:
+                while len(window) < max(1, max_in_flight):
+                    fetch = next(pending, None)
+                    if fetch is None:
+                        break
+                    window.append(asyncio.ensure_future(fetch))
+                if not window:
+                    return
+                yield await window.popleft()
+        finally:
+            for task in window:
+                task.cancel()
+
+    async def load_one(self, endpoint: str, entry_id: int | str, lang: str | None = None, model: type | None = None):
+        """
+        Fetches a single entry of an id-keyed endpoint. Concurrent calls for the same endpoint
+        and language are coalesced into one bulk request: across every client of the same lane for public
+        endpoints, within this client when it has an API key. Loaders are dropped once idle.
+        :return: The entry, or None if the API does not know the id.
+        """
+        if self.api_key:
+            loaders, key = self._batch_loaders, (endpoint, lang, model)
+        else:
+            loaders, key = _batch_loaders, (endpoint, lang, model, self.priority)
+        loader = loaders.get(key)
+        if loader is None:
+            # Shared loaders resolve with a client of their lane, not with whichever client created them
+            owner = self if self.api_key else None
+            priority = self.priority
+
+            async def fetch(ids: list) -> BulkResult:
+                client = owner or GW2Client(priority=priority)
+                return await client.get_many(endpoint, ids, lang=lang, model=model)
+
+            loader = _BatchLoader(fetch)
+            loaders[key] = loader
+        try:
+            return await loader.load(_normalize_id(entry_id))
+        finally:
+            if loader.idle and loaders.get(key) is loader:
+                del loaders[key]
+
+    async def get_item(self, item_id: int, lang: str = "en", typed: bool = False):
+        return await self.load_one("/items", item_id, lang=lang, model=Item if typed else None)
+
+    async def get_items(self, ids: Iterable[int], lang: str = "en", typed: bool = False) -> BulkResult:
+        return await self.get_many("/items", ids, lang=lang, model=Item if typed else None)
 
-    async def token_info(self):
-        return await self._get("/tokeninfo", require_token=True)
+    async def get_currencies(self, ids: Iterable[int], lang: str = "en", typed: bool = False) -> BulkResult:
+        return await self.get_many("/currencies", ids, lang=lang, model=Currency if typed else None)
 
-    async def get_account(self):
-        return await self._get("/account", require_token=True)
+    async def get_dyes(self, ids: Iterable[int], lang: str = "en", typed: bool = False) -> BulkResult:
+        return await self.get_many("/colors", ids, lang=lang, model=Dye if typed else None)
 
-    async def get_worlds(self, lang: str = "en"):
-        return await self._get(f"/worlds?lang={lang}&ids=all", require_token=False)
+    async def get_achievements(self, ids: Iterable[int], lang: str = "en") -> BulkResult:
+        return await self.get_many("/achievements", ids, lang=lang)
 
-    async def get_item(self, item_id: int):
-        return await self._get(f"/items/{item_id}")
+    async def get_build(self) -> int:
+        """Returns the id of the current game build."""
+        return (await self._get("/build"))["id"]
 
     async def get_exchange_rates(self):
         return await self._get("/commerce/exchange/coins")
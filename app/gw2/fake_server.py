@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.gw2.client import BASE_URL, MAX_IDS_PER_REQUEST
+
+# Local stand-in of the GW2 API replaying recorded fixtures, for load tests, benchmarks and offline crawls.
+#
+#   uvicorn app.gw2.fake_server:app --port 8081
+#   GW2_BASE_URL=http://localhost:8081/v2 uvicorn app.main:api
+#
+# Faults are injected deterministically (seeded) through environment variables:
+#   FAKE_GW2_LATENCY_MS, FAKE_GW2_JITTER_MS, FAKE_GW2_RATE_LIMIT_RATIO, FAKE_GW2_RETRY_AFTER,
+#   FAKE_GW2_SERVER_ERROR_RATIO, FAKE_GW2_SEED, FAKE_GW2_FIXTURES_DIR
+#
+# Fixtures are recorded from the live API with:
+#   python -m app.gw2.fake_server record --api-key <KEY>
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Id-keyed collections: endpoint -> fixture name. Localized ones are stored as <name>.<lang>.json
+COLLECTIONS = {
+    "worlds": "worlds",
+    "items": "items",
+    "currencies": "currencies",
+    "colors": "colors",
+    "achievements": "achievements",
+    "commerce/prices": "commerce_prices",
+}
+LOCALIZED_COLLECTIONS = {"worlds", "items", "currencies", "colors", "achievements"}
+
+# Single documents: endpoint -> (fixture name, requires an API key)
+DOCUMENTS = {
+    "build": ("build", False),
+    "commerce/exchange/coins": ("commerce_exchange_coins", False),
+    "commerce/exchange/gems": ("commerce_exchange_gems", False),
+    "tokeninfo": ("tokeninfo", True),
+    "account": ("account", True),
+    "account/wallet": ("account_wallet", True),
+    "account/bank": ("account_bank", True),
+    "account/dyes": ("account_dyes", True),
+    "account/emotes": ("account_emotes", True),
+    "characters": ("characters", True),
+}
+
+# API keys the fake server answers 401 for
+INVALID_API_KEYS = {"invalid"}
+
+
+class FaultConfig:
+    """
+    Failure profile of the fake server.
+    :param latency_ms: Fixed latency added to every response.
+    :param jitter_ms: Random extra latency, uniformly distributed in [0, jitter_ms].
+    :param rate_limit_ratio: Fraction of requests answered 429 with a Retry-After header.
+    :param retry_after: Value of the Retry-After header, in seconds.
+    :param server_error_ratio: Fraction of requests answered with a 5xx error.
+    :param seed: Seed of the random generator, so runs are reproducible.
+    """
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, rate_limit_ratio: float = 0,
+                 retry_after: int = 1, server_error_ratio: float = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.server_error_ratio = server_error_ratio
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "FaultConfig":
+        return cls(
+            latency_ms=float(os.getenv("FAKE_GW2_LATENCY_MS", 0)),
+            jitter_ms=float(os.getenv("FAKE_GW2_JITTER_MS", 0)),
+            rate_limit_ratio=float(os.getenv("FAKE_GW2_RATE_LIMIT_RATIO", 0)),
+            retry_after=int(os.getenv("FAKE_GW2_RETRY_AFTER", 1)),
+            server_error_ratio=float(os.getenv("FAKE_GW2_SERVER_ERROR_RATIO", 0)),
+            seed=int(os.getenv("FAKE_GW2_SEED", 0)),
+        )
+
+
+def _load_fixture(fixtures_dir: Path, name: str, lang: str | None = None):
+    # Localized fixtures fall back to english when the language was not recorded
+    candidates = [f"{name}.{lang}.json", f"{name}.en.json"] if lang else [f"{name}.json"]
+    for candidate in candidates:
+        path = fixtures_dir / candidate
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    return None
+
+
+def _text(status_code: int, text: str, headers: dict | None = None) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"text": text}, headers=headers)
+
+
+def create_fake_gw2_app(fixtures_dir: Path = FIXTURES_DIR, faults: FaultConfig | None = None) -> FastAPI:
+    """Builds the fake GW2 API application. Every route lives under /v2, like the real one."""
+    faults = faults or FaultConfig()
+    fake = FastAPI(title="Fake GW2 API")
+    fake.state.request_count = 0
+
+    async def inject_faults() -> JSONResponse | None:
+        fake.state.request_count += 1
+        delay = faults.latency_ms + faults.random.uniform(0, faults.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        roll = faults.random.random()
+        if roll < faults.rate_limit_ratio:
+            return _text(429, "too many requests", headers={"Retry-After": str(faults.retry_after)})
+        if roll < faults.rate_limit_ratio + faults.server_error_ratio:
+            return _text(faults.random.choice([500, 502, 503]), "ErrBadGateway")
+        return None
+
+    def check_api_key(request: Request) -> JSONResponse | None:
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return _text(401, "Invalid access token")
+        if token in INVALID_API_KEYS:
+            return _text(401, "Invalid access token")
+        return None
+
+    def collection_response(entries: list, request: Request) -> JSONResponse:
+        params = request.query_params
+        by_id = {str(entry["id"]): entry for entry in entries}
+
+        if "ids" in params:
+            if params["ids"] == "all":
+                return JSONResponse(entries)
+            requested = [entry_id for entry_id in params["ids"].split(",") if entry_id]
+            if len(requested) > MAX_IDS_PER_REQUEST:
+                return _text(400, f"id list too long; this endpoint is limited to {MAX_IDS_PER_REQUEST} ids at once")
+            found = [by_id[entry_id] for entry_id in requested if entry_id in by_id]
+            if not found:
+                return _text(404, "all ids provided are invalid")
+            return JSONResponse(found, status_code=206 if len(found) < len(requested) else 200)
+
+        if "page" in params or "page_size" in params:
+            page = int(params.get("page", 0))
+            page_size = min(int(params.get("page_size", 50)), MAX_IDS_PER_REQUEST)
+            page_total = max(1, (len(entries) + page_size - 1) // page_size)
+            if page >= page_total:
+                return _text(400, f"page out of range. Use page values 0 - {page_total - 1}.")
+            page_entries = entries[page * page_size:(page + 1) * page_size]
+            return JSONResponse(page_entries, headers={
+                "X-Page-Total": str(page_total),
+                "X-Page-Size": str(page_size),
+                "X-Result-Total": str(len(entries)),
+                "X-Result-Count": str(len(page_entries)),
+            })
+
+        return JSONResponse([entry["id"] for entry in entries], headers={"X-Result-Total": str(len(entries))})
+
+    @fake.get("/v2/{path:path}")
+    async def replay(path: str, request: Request):
+        path = path.strip("/")
+        fault = await inject_faults()
+        if fault is not None:
+            return fault
+
+        if path in DOCUMENTS:
+            name, require_token = DOCUMENTS[path]
+            if require_token and (error := check_api_key(request)) is not None:
+                return error
+            return JSONResponse(_load_fixture(fixtures_dir, name))
+
+        collection, _, entry_id = path.rpartition("/") if path not in COLLECTIONS else (path, "", "")
+        if collection in COLLECTIONS:
+            lang = request.query_params.get("lang", "en") if collection in LOCALIZED_COLLECTIONS else None
+            entries = _load_fixture(fixtures_dir, COLLECTIONS[collection], lang) or []
+            if entry_id:
+                entry = next((entry for entry in entries if str(entry["id"]) == entry_id), None)
+                return JSONResponse(entry) if entry is not None else _text(404, "no such id")
+            return collection_response(entries, request)
+
+        return _text(404, "not found")
+
+    return fake
+
+
+app = create_fake_gw2_app(Path(os.getenv("FAKE_GW2_FIXTURES_DIR", FIXTURES_DIR)), FaultConfig.from_env())
+
+
+async def record_fixtures(out_dir: Path, api_key: str | None = None, sample_size: int = 50,
+                          languages: tuple[str, ...] = ("en", "es", "de", "fr")):
+    """
+    Records fixtures from the live GW2 API. Only the first `sample_size` ids of every large collection are kept.
+    Authenticated documents are only recorded when an API key is given.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def dump(name: str, data):
+        (out_dir / f"{name}.json").write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30.0, headers=headers) as client:
+        for endpoint, name in COLLECTIONS.items():
+            ids = (await client.get(f"/{endpoint}")).json()[:sample_size]
+            for lang in (languages if endpoint in LOCALIZED_COLLECTIONS else (None,)):
+                params = {"ids": ",".join(str(entry_id) for entry_id in ids)}
+                if lang:
+                    params["lang"] = lang
+                response = await client.get(f"/{endpoint}", params=params)
+                dump(f"{name}.{lang}" if lang else name, response.json())
+
+        for endpoint, (name, require_token) in DOCUMENTS.items():
+            if require_token and not api_key:
+                continue
+            dump(name, (await client.get(f"/{endpoint}")).json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake GW2 API fixtures")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="Record fixtures from the live GW2 API")
+    record.add_argument("--api-key", default=None)
+    record.add_argument("--out", type=Path, default=FIXTURES_DIR)
+    record.add_argument("--sample-size", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record_fixtures(args.out, api_key=args.api_key, sample_size=args.sample_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Typed representations of the GW2 API payloads we consume.
+# They are msgspec Structs: decoding goes straight from the response bytes to slot-based objects, without
+# building intermediate dicts, and any field not declared here is dropped at decode time.
+import datetime
+
+import msgspec
+
+
+class TokenInfo(msgspec.Struct):
+    id: str
+    name: str
+    permissions: list[str] = []
+    type: str | None = None
+
+
+class Account(msgspec.Struct):
+    id: str
+    name: str
+    world: int
+    created: datetime.datetime
+    age: int = 0
+    access: list[str] = []
+    guilds: list[str] = []
+    commander: bool = False
+    fractal_level: int | None = None
+    last_modified: datetime.datetime | None = None
+
+
+class Character(msgspec.Struct):
+    # Only the core fields, the equipment, bags, etc. of /v2/characters are dropped at decode time
+    name: str
+    race: str
+    gender: str
+    profession: str
+    level: int = 1
+
+
+class BankSlot(msgspec.Struct):
+    # "id" is the item id. Empty slots are null in the /v2/account/bank array
+    id: int
+    count: int = 1
+    charges: int | None = None
+    dyes: list[int | None] = []
+
+
+class World(msgspec.Struct):
+    id: int
+    name: str
+    population: str | None = None
+
+
+class Item(msgspec.Struct):
+    id: int
+    name: str
+    type: str
+    rarity: str
+    chat_link: str
+    level: int = 0
+    vendor_value: int = 0
+    icon: str | None = None
+    description: str | None = None
+    flags: list[str] = []
+    # Type specific attributes, stored as is in item_details
+    details: dict | None = None
+
+
+class WalletEntry(msgspec.Struct):
+    # "id" is the currency id
+    id: int
+    value: int
+
+
+class Currency(msgspec.Struct):
+    id: int
+    name: str
+    description: str | None = None
+    icon: str | None = None
+    order: int = 0
+
+
+class Dye(msgspec.Struct):
+    id: int
+    name: str
+    base_rgb: list[int] = []
+    item: int | None = None
+    categories: list[str] = []
+
+
+class Achievement(msgspec.Struct):
+    id: int
+    name: str
+    type: str
+    description: str | None = None
+    requirement: str | None = None
+    icon: str | None = None
+    flags: list[str] = []
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Traffic lanes sharing the GW2 API quota. Lower value means higher priority."""
+    INTERACTIVE = 0
+    CRAWLER = 1
+
+
+class RateLimiter:
+    """
+    Process-wide token bucket for GW2 API traffic.
+
+    Every request takes one token. Tokens refill at `requests_per_minute / 60` per second up to `burst`.
+    Interactive requests (user facing routes) always go first: crawler requests only take a token when
+    no interactive request is waiting for one.
+
+    Crawler concurrency is additionally bounded by an AIMD window: it grows by one slot per "round" of
+    fast successful responses and is halved when the API answers 429 (or shrunk when latency degrades),
+    so background traffic settles just under the upstream quota instead of bouncing off it.
+    """
+
+    def __init__(
+            self,
+            requests_per_minute: int,
+            burst: int,
+            crawler_max_concurrency: int,
+            latency_target: float = 1.0,
+    ):
+        """
+        :param requests_per_minute: Sustained request budget.
+        :param burst: Maximum number of tokens that can be accumulated.
+        :param crawler_max_concurrency: Upper bound of the crawler concurrency window.
+        :param latency_target: Latency (seconds) above which the crawler window starts shrinking.
+        """
+        self.rate = requests_per_minute / 60
+        self.burst = max(1, burst)
+        self.crawler_max_concurrency = max(1, crawler_max_concurrency)
+        self.latency_target = latency_target
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = {priority: 0 for priority in Priority}
+
+        self.crawler_limit = float(self.crawler_max_concurrency)
+        self._crawler_in_flight = 0
+        self._crawler_slot_freed = asyncio.Condition()
+        self._last_decrease = 0.0
+
+    @property
+    def crawler_in_flight(self) -> int:
+        return self._crawler_in_flight
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def _take_token(self, priority: Priority):
+        self._waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                interactive_waiting = self._waiting[Priority.INTERACTIVE] > 0
+                if self._tokens >= 1 and (priority is Priority.INTERACTIVE or not interactive_waiting):
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep(max((1 - self._tokens) / self.rate, 0.01))
+        finally:
+            self._waiting[priority] -= 1
+
+    async def _acquire_crawler_slot(self):
+        async with self._crawler_slot_freed:
+            await self._crawler_slot_freed.wait_for(lambda: self._crawler_in_flight < int(self.crawler_limit))
+            self._crawler_in_flight += 1
+
+    async def _release_crawler_slot(self):
+        async with self._crawler_slot_freed:
+            self._crawler_in_flight -= 1
+            self._crawler_slot_freed.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority):
+        """
+        Waits for permission to send one request in the given lane.
+        The caller must report the outcome through `observe` before leaving the context.
+        """
+        if priority is Priority.CRAWLER:
+            await self._acquire_crawler_slot()
+        try:
+            await self._take_token(priority)
+            yield
+        finally:
+            if priority is Priority.CRAWLER:
+                await self._release_crawler_slot()
+
+    def observe(self, status_code: int | None, latency: float, retry_after: float | None = None):
+        """
+        Feeds the outcome of a request back into the limiter.
+        :param status_code: HTTP status of the response, None for network errors.
+        :param latency: Seconds spent waiting for the response.
+        :param retry_after: Value of the Retry-After header on 429 responses.
+        """
+        now = time.monotonic()
+        if status_code == 429:
+            # Everybody backs off: the quota is per IP, not per lane
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + (1 if retry_after is None else retry_after))
+            self._decrease(now, 0.5)
+        elif status_code is None or status_code >= 500 or latency > self.latency_target:
+            self._decrease(now, 0.75)
+        else:
+            self.crawler_limit = min(self.crawler_max_concurrency, self.crawler_limit + 1 / self.crawler_limit)
+
+    def _decrease(self, now: float, factor: float):
+        # A burst of errors from the same window should only shrink the limit once
+        if now - self._last_decrease < self.latency_target:
+            return
+        self._last_decrease = now
+        self.crawler_limit = max(1.0, self.crawler_limit * factor)
+        logging.info(f"Crawler concurrency reduced to {int(self.crawler_limit)}")
@@ -0,0 +1,141 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class CacheEntry:
+    """A parsed GW2 API response together with the validators needed to revalidate it."""
+    data: object
+    etag: str | None = None
+    last_modified: str | None = None
+    expires_at: float = 0.0
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _max_age(response_headers: httpx.Headers) -> tuple[int, bool]:
+    """
+    Parses the Cache-Control header.
+    :return: (max-age in seconds, whether the response may be stored at all)
+    """
+    max_age = 0
+    storable = True
+    for directive in response_headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        name = name.lower()
+        # "private" responses are fine: entries are scoped by API key (and kept in a per-key cache)
+        if name == "no-store":
+            storable = False
+        elif name == "no-cache":
+            max_age = 0
+        elif name == "max-age" and value.isdigit():
+            max_age = int(value)
+    return max_age, storable
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of parsed GW2 API responses, keyed by endpoint, params and a hash of the API key.
+
+    Fresh entries (within Cache-Control max-age) are served without any request. Stale entries are
+    revalidated with If-None-Match / If-Modified-Since: a 304 answer refreshes the entry and returns the
+    already parsed object, saving both the download and the JSON decoding.
+    Only responses with a validator (ETag / Last-Modified) or a positive max-age are stored, the others could
+    never be served nor revalidated. Entries are also the last known good data served while the endpoint
+    circuit breaker is open.
+    """
+
+    # Response headers kept alongside the data, e.g. for pagination
+    KEPT_HEADERS = ("X-Page-Total", "X-Page-Size", "X-Result-Total", "X-Result-Count")
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def key(endpoint: str, params: dict | None, api_key: str | None, *extra) -> tuple:
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+        return endpoint, tuple(sorted((params or {}).items())), key_hash, *extra
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key: tuple) -> CacheEntry | None:
+        """
+        Returns the entry for the key, if any, and updates the hit / miss counters.
+        A returned entry that is not fresh must be revalidated before being used.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if entry.is_fresh():
+            self.hits += 1
+        elif entry.etag or entry.last_modified:
+            self.revalidations += 1
+        else:
+            # Expired and nothing to revalidate with: a full request is needed
+            self.misses += 1
+        return entry
+
+    def peek(self, key: tuple) -> CacheEntry | None:
+        """Returns the entry for the key without touching counters or LRU order."""
+        return self._entries.get(key)
+
+    def store(self, key: tuple, data: object, response_headers: httpx.Headers) -> CacheEntry | None:
+        max_age, storable = _max_age(response_headers)
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not storable or not (etag or last_modified or max_age > 0):
+            return None
+
+        entry = CacheEntry(
+            data=data,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=time.monotonic() + max_age,
+            headers={name: response_headers[name] for name in self.KEPT_HEADERS if name in response_headers},
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def mark_not_modified(self, entry: CacheEntry, response_headers: httpx.Headers):
+        """Refreshes an entry after the API confirmed it with a 304 Not Modified."""
+        self.not_modified += 1
+        max_age, _ = _max_age(response_headers)
+        entry.expires_at = time.monotonic() + max_age
+        entry.etag = response_headers.get("ETag", entry.etag)
+        entry.last_modified = response_headers.get("Last-Modified", entry.last_modified)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,33 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls: while a call for a key is in flight, later callers
+    with the same key await the same task instead of starting a new one.
+
+    The shared task is shielded, so a cancelled caller never cancels the work other callers are waiting
+    for. Results and errors are delivered to every caller.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
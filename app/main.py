@@ -1,18 +1,30 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.response_cache import response_cache
+from app.api.responses import MsgspecJSONResponse
 from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.token_cache import TokenCache, token_cache
+from app.core.warmup import warmup
+from app.crawlers.account_details import sync_account_details
+from app.crawlers.account_sync import AccountSyncScheduler
+from app.crawlers.build_watcher import check_build
+from app.crawlers.revalidation import revalidate_items
+from app.crawlers.wallet_crawler import update_wallets
 from app.crawlers.worlds_crawler import update_worlds_incremental
 from app.db.data.seeding import seed_data
 from app.db.dependency import get_db
+from app.db.leader import LeaderElection, run_as_leader
 from app.db.model import Base
+from app.db.notifications import NotificationListener
 from app.db.session import engine
 from app.gw2.client import startup_gw2_client, shutdown_gw2_client
 
@@ -20,57 +32,117 @@ log_filename = f"tyriavault_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 log_filepath = os.path.join(os.path.dirname(__file__), log_filename)
 
 
-async def run_worlds_crawler_job():
-    print("Running worlds crawler job")
+# Every worker runs the lifespan, only the elected leader runs the scheduled jobs
+leader = LeaderElection(engine, interval=settings.LEADER_ELECTION_INTERVAL_SECONDS)
+account_sync = AccountSyncScheduler(
+    tick=timedelta(seconds=settings.ACCOUNT_SYNC_TICK_SECONDS),
+    interval=timedelta(minutes=settings.ACCOUNT_SYNC_INTERVAL_MINUTES),
+    active_interval=timedelta(minutes=settings.ACCOUNT_SYNC_ACTIVE_INTERVAL_MINUTES),
+    dormant_interval=timedelta(minutes=settings.ACCOUNT_SYNC_DORMANT_INTERVAL_MINUTES),
+    max_per_tick=settings.ACCOUNT_SYNC_MAX_PER_TICK,
+    on_changed=sync_account_details,
+)
+
+
+def on_data_changed(name: str | None):
+    """Drops what the caches of this worker hold about data changed by any process (None: anything)."""
+    if name is None:
+        response_cache.invalidate()
+        token_cache.invalidate_hash(None)
+    elif name.startswith(TokenCache.NOTIFICATION_PREFIX):
+        token_cache.invalidate_hash(name.removeprefix(TokenCache.NOTIFICATION_PREFIX))
+    elif name.startswith(TokenCache.REJECTION_PREFIX):
+        token_cache.reject_notified(name)
+    else:
+        response_cache.invalidate(name)
+
+
+# Keeps the in-process caches of every worker in sync with the changes made by the leader, the crawler runner
+# or the other workers
+changes_listener = NotificationListener(engine, on_notify=on_data_changed)
+
+
+async def run_build_check_job():
+    print("Running build check job")
+    await run_as_leader(leader, "build_check", check_build)
+
+
+async def run_items_revalidation_job():
+    print("Running items revalidation job")
+    await run_as_leader(leader, "items_revalidation", lambda db: revalidate_items(
+        db,
+        request_budget=settings.ITEMS_REVALIDATION_REQUEST_BUDGET,
+        time_budget_seconds=settings.ITEMS_REVALIDATION_TIME_BUDGET_SECONDS,
+        min_age=timedelta(hours=settings.ITEMS_REVALIDATION_MIN_AGE_HOURS),
+    ))
+
+
+async def run_seed_data():
+    # Seed almost invariable data
     async for db in get_db():
-        await update_worlds_incremental(db)
+        await seed_data(db)
         break
 
 
+async def run_warmup():
+    """Everything not needed to serve the first request, run in the background after startup."""
+    warmup.plan("seed_data", "leader_election", "worlds_crawler")
+    await warmup.run("seed_data", run_seed_data)
+    await warmup.run("leader_election", leader.start)
+    # execute the worlds crawler once at startup
+    await warmup.run("worlds_crawler", lambda: run_as_leader(leader, "worlds_startup", update_worlds_incremental))
+
+
+async def run_wallet_crawler_job():
+    print("Running wallet crawler job")
+    await run_as_leader(leader, "wallet_crawler", lambda db: update_wallets(
+        db,
+        concurrency=settings.WALLET_CRAWLER_CONCURRENCY,
+        batch_size=settings.WALLET_CRAWLER_BATCH_SIZE,
+    ))
+
+
+async def run_account_sync_job():
+    await run_as_leader(leader, "account_sync", account_sync.tick)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: only wait for the database to be reachable, GW2 traffic happens in the background
     logger.info("Turn On")
     logger.debug(settings.DATABASE_URL)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Seed almost invariable data
-    async for db in get_db():
-        await seed_data(db)
-        break
-
     await startup_gw2_client()
+    await changes_listener.start()
+    warmup_task = asyncio.create_task(run_warmup())
 
-    # execute the worlds crawler once at startup
-    await run_worlds_crawler_startup()
-
-    # Schedule the worlds crawler to run cada 2880 minutos (48h)
+    # Catalogue crawlers only run when the game build changes (or their data gets too old)
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(run_worlds_crawler_job, 'interval', minutes=2880)
+    scheduler.add_job(run_build_check_job, 'interval', minutes=settings.BUILD_CHECK_INTERVAL_MINUTES)
+    scheduler.add_job(run_items_revalidation_job, 'interval', minutes=settings.ITEMS_REVALIDATION_INTERVAL_MINUTES)
+    scheduler.add_job(run_wallet_crawler_job, 'interval', minutes=settings.WALLET_CRAWLER_INTERVAL_MINUTES)
+    scheduler.add_job(run_account_sync_job, 'interval', seconds=settings.ACCOUNT_SYNC_TICK_SECONDS)
     scheduler.start()
+    warmup.startup_finished()
 
     yield
     # Shutdown
     logger.info("Turn Off")
-    await shutdown_gw2_client()
+    warmup_task.cancel()
     scheduler.shutdown()
-
-
-def run_worlds_crawler_startup():
-    async def _run():
-        async for db in get_db():
-            await update_worlds_incremental(db)
-            break
-
-    return _run()
+    await leader.stop()
+    await changes_listener.stop()
+    await shutdown_gw2_client()
 
 
 # Setting up FastApi and our services
 api = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=MsgspecJSONResponse,
 )
 
 origins = [settings.FRONTEND_URL]
@@ -83,4 +155,12 @@ api.add_middleware(
     allow_headers=["*"]
 )
 
+
+@api.middleware("http")
+async def measure_first_request(request: Request, call_next):
+    response = await call_next(request)
+    warmup.request_served()
+    return response
+
+
 api.include_router(api_router, prefix="/api/v1")
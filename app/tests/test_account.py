@@ -0,0 +1,29 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.account import account_details
+from app.core.token_cache import TokenCache
+
+
+@pytest.mark.asyncio
+async def test_account_details_flags_stale_gw2_data():
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.first.return_value = None
+    mock_db.execute.return_value = mock_result
+    mock_db.add = MagicMock()
+    response = Response()
+    account = {"name": "Jade.1234", "created": "2015-01-01T00:00:00Z", "fractal_level": 100,
+               "last_modified": "2025-01-01T00:00:00Z"}
+
+    with patch("app.api.v1.account.token_cache", TokenCache(max_entries=10, ttl=300, negative_ttl=30)), \
+            patch("app.api.v1.account.GW2Client") as mock_client:
+        mock_client.return_value.get_account = AsyncMock(return_value=account)
+        mock_client.return_value.last_response_stale = True
+        await account_details(response=response, authorization="Bearer key", db=mock_db)
+
+    assert response.headers["Warning"] == '110 - "Response is Stale"'
+    assert response.headers["X-TyriaVault-Stale"] == "true"
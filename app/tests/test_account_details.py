@@ -0,0 +1,66 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.crawlers.account_details import sync_account_details, sync_bank, sync_characters
+from app.db.bulk import BulkSyncResult
+from app.gw2.models import BankSlot, Character
+
+
+@pytest.mark.asyncio
+async def test_sync_bank_keeps_slot_positions_and_nulls_unknown_references():
+    slots = [BankSlot(id=1, count=250), None, BankSlot(id=999, count=1, dyes=[10, 404])]
+
+    with patch("app.crawlers.account_details._known_ids", new=AsyncMock(side_effect=[{1}, {10}])), \
+            patch("app.crawlers.account_details.sync_rows", new=AsyncMock(return_value=BulkSyncResult())) as mock_sync:
+        await sync_bank(AsyncMock(), 7, slots)
+
+    _, table, scope, key_columns, rows = mock_sync.await_args.args
+    assert (table.name, scope, key_columns) == ("bank", {"game_account_id": 7}, ("slot",))
+    assert rows == [
+        {"slot": 0, "item_id": 1, "stack_count": 250, "charges": None,
+         "dye01_id": None, "dye02_id": None, "dye03_id": None, "dye04_id": None},
+        {"slot": 2, "item_id": None, "stack_count": 1, "charges": None,
+         "dye01_id": 10, "dye02_id": None, "dye03_id": None, "dye04_id": None},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_characters_maps_lookups_and_skips_unknown_ones():
+    characters = [Character("Alpha", "Human", "Female", "Guardian", 80),
+                  Character("Beta", "Tengu", "Male", "Warrior", 2)]
+    lookups = [{"Human": 3}, {"Male": 1, "Female": 2}, {"Guardian": 0, "Warrior": 1}]
+
+    with patch("app.crawlers.account_details._ids_by_english_name", new=AsyncMock(side_effect=lookups)), \
+            patch("app.crawlers.account_details.sync_rows", new=AsyncMock(return_value=BulkSyncResult())) as mock_sync:
+        await sync_characters(AsyncMock(), 7, characters)
+
+    assert mock_sync.await_args.args[4] == [
+        {"name": "Alpha", "race_id": 3, "gender_id": 2, "profession_id": 0, "char_level": 80},
+    ]
+    assert mock_sync.await_args.kwargs["conflict_columns"] == ("name",)
+
+
+@pytest.mark.asyncio
+async def test_sync_account_details_skips_sections_without_permission():
+    request = httpx.Request("GET", "https://gw2.test/v2/account/bank")
+    forbidden = httpx.HTTPStatusError("403", request=request, response=httpx.Response(403, request=request))
+    gw2 = MagicMock(
+        get_characters=AsyncMock(return_value=[]),
+        get_bank=AsyncMock(side_effect=forbidden),
+        get_unlocked_dyes=AsyncMock(return_value=[1, 2]),
+        get_unlocked_emotes=AsyncMock(return_value=["bless"]),
+    )
+
+    with patch("app.crawlers.account_details.sync_characters",
+               new=AsyncMock(return_value=BulkSyncResult(deleted=1))), \
+            patch("app.crawlers.account_details.sync_bank", new=AsyncMock()) as mock_sync_bank, \
+            patch("app.crawlers.account_details.sync_unlocked_dyes",
+                  new=AsyncMock(return_value=BulkSyncResult(inserted=1, unchanged=1))), \
+            patch("app.crawlers.account_details.sync_unlocked_emotes",
+                  new=AsyncMock(return_value=BulkSyncResult(unchanged=1))):
+        result = await sync_account_details(AsyncMock(), gw2, MagicMock(id=7))
+
+    mock_sync_bank.assert_not_awaited()
+    assert (result.touched, result.unchanged) == (2, 2)
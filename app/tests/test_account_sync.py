@@ -0,0 +1,148 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.token_cache import TokenCache
+from app.crawlers.account_sync import AccountSyncScheduler, SyncCandidate
+from app.db.bulk import BulkSyncResult
+from app.db.model import ApiKeys, GameAccounts
+from app.gw2.models import Account
+
+NOW = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+MINUTE = datetime.timedelta(minutes=1)
+
+
+def make_scheduler(max_per_tick: int = 50, on_changed=None, tick=MINUTE) -> AccountSyncScheduler:
+    return AccountSyncScheduler(tick=tick, interval=60 * MINUTE, active_interval=5 * MINUTE,
+                                dormant_interval=1440 * MINUTE, max_per_tick=max_per_tick, on_changed=on_changed)
+
+
+def candidate(api_key_id: int, checked_ago=None, used_ago=None, modified_ago=datetime.timedelta(hours=1)):
+    return SyncCandidate(
+        api_key_id,
+        None if checked_ago is None else NOW - checked_ago,
+        None if used_ago is None else NOW - used_ago,
+        None if modified_ago is None else NOW - modified_ago,
+    )
+
+
+def test_interval_depends_on_activity_and_dormancy():
+    scheduler = make_scheduler()
+
+    assert scheduler.interval_for(candidate(1, used_ago=10 * MINUTE), NOW) == 5 * MINUTE
+    assert scheduler.interval_for(candidate(1, modified_ago=datetime.timedelta(days=30)), NOW) == 1440 * MINUTE
+    # Activity wins over dormancy
+    assert scheduler.interval_for(candidate(1, used_ago=MINUTE, modified_ago=datetime.timedelta(days=30)),
+                                  NOW) == 5 * MINUTE
+    assert scheduler.interval_for(candidate(1), NOW) == 60 * MINUTE
+
+
+def test_plan_orders_by_overdue_ratio_and_skips_fresh_keys():
+    # Long ticks, so the budget is not the limit here
+    scheduler = make_scheduler(tick=60 * MINUTE)
+    candidates = [
+        candidate(1, checked_ago=90 * MINUTE),                    # regular, 0.5 overdue
+        candidate(2, checked_ago=30 * MINUTE),                    # regular, not due
+        candidate(3, checked_ago=15 * MINUTE, used_ago=MINUTE),   # active, 2 overdue
+        candidate(4),                                             # never checked
+    ]
+
+    assert scheduler.plan(candidates, NOW) == [4, 3, 1]
+
+
+def test_plan_spreads_a_backlog_over_several_ticks():
+    scheduler = make_scheduler()
+    # 120 regular keys, all overdue: steady state is 120 / 60 = 2 accounts per tick
+    candidates = [candidate(api_key_id, checked_ago=(120 + api_key_id) * MINUTE) for api_key_id in range(120)]
+
+    assert scheduler.plan(candidates, NOW) == [119, 118]
+    assert len(make_scheduler(max_per_tick=1).plan(candidates, NOW)) == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_account_skips_unchanged_accounts():
+    on_changed = AsyncMock(return_value=BulkSyncResult(inserted=3, unchanged=10))
+    scheduler = make_scheduler(on_changed=on_changed)
+    game_account = GameAccounts(id=7, account_name="Test.1234", last_modified=NOW)
+    api_key = ApiKeys(id=1, api_key="key", game_account_id=7)
+    account = Account(id="abc", name="Test.1234", world=1001, created=NOW, last_modified=NOW)
+    db = MagicMock(get=AsyncMock(return_value=game_account), flush=AsyncMock())
+
+    with patch("app.crawlers.account_sync.GW2Client") as mock_client:
+        mock_client.return_value.get_account = AsyncMock(return_value=account)
+        assert await scheduler.sync_account(db, api_key, NOW) == (False, BulkSyncResult())
+
+    on_changed.assert_not_awaited()
+    assert api_key.last_time_checked == NOW
+
+    account.last_modified = NOW + MINUTE
+    account.fractal_level = 42
+    with patch("app.crawlers.account_sync.GW2Client") as mock_client:
+        mock_client.return_value.get_account = AsyncMock(return_value=account)
+        assert await scheduler.sync_account(db, api_key, NOW) == (True, BulkSyncResult(inserted=3, unchanged=10))
+
+    assert (game_account.world_id, game_account.fractal_level, game_account.last_modified) == (1001, 42, NOW + MINUTE)
+    on_changed.assert_awaited_once()
+    # Already linked: the token caches are left alone
+    db.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sync_account_notifies_when_linking_a_key():
+    game_account = GameAccounts(id=7, account_name="Test.1234", last_modified=NOW)
+    api_key = ApiKeys(id=1, api_key="key", game_account_id=None)
+    account = Account(id="abc", name="Test.1234", world=1001, created=NOW, last_modified=NOW)
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = game_account
+    db = AsyncMock()
+    db.execute.side_effect = [result, None]
+
+    with patch("app.crawlers.account_sync.GW2Client") as mock_client:
+        mock_client.return_value.get_account = AsyncMock(return_value=account)
+        assert await make_scheduler().sync_account(db, api_key, NOW) == (False, BulkSyncResult())
+
+    assert api_key.game_account_id == 7
+    notification = db.execute.await_args.args[0].compile().params
+    assert TokenCache.changed_payload("key") in notification.values()
+
+
+@pytest.mark.asyncio
+async def test_tick_marks_failed_keys_as_checked():
+    scheduler = make_scheduler(tick=60 * MINUTE)
+    request = httpx.Request("GET", "https://gw2.test/v2/account")
+    revoked = httpx.HTTPStatusError("401", request=request, response=httpx.Response(401, request=request))
+    db = AsyncMock()
+    db.get.side_effect = lambda model, api_key_id: ApiKeys(id=api_key_id, api_key=f"key-{api_key_id}")
+    candidates = [SyncCandidate(api_key_id, None, None, None) for api_key_id in (1, 2)]
+
+    with patch.object(scheduler, "load_candidates", new=AsyncMock(return_value=candidates)), \
+            patch.object(scheduler, "sync_account", new=AsyncMock(side_effect=[revoked, (True, BulkSyncResult(deleted=2))])):
+        result = await scheduler.tick(db)
+
+    assert (result.due, result.checked, result.changed, result.failed, result.revoked) == (2, 1, 1, 1, 1)
+    assert result.rows.touched == 2
+    db.rollback.assert_awaited_once()
+    # The failed key still gets its last_time_checked, outside the rolled back transaction
+    checked, notification = (call.args[0].compile().params for call in db.execute.await_args_list)
+    assert "last_time_checked" in str(checked)
+    # And the revoked key is rejected by the token caches of every worker
+    assert TokenCache.rejected_payload("key-1", 401) in notification.values()
+    assert db.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_tick_keeps_keys_cached_after_transient_failures():
+    scheduler = make_scheduler(tick=60 * MINUTE)
+    db = AsyncMock()
+    db.get.side_effect = lambda model, api_key_id: ApiKeys(id=api_key_id, api_key="key")
+    candidates = [SyncCandidate(1, None, None, None)]
+
+    with patch.object(scheduler, "load_candidates", new=AsyncMock(return_value=candidates)), \
+            patch.object(scheduler, "sync_account", new=AsyncMock(side_effect=httpx.ConnectError("down"))):
+        result = await scheduler.tick(db)
+
+    assert (result.failed, result.revoked) == (1, 0)
+    # Only the last_time_checked update, no token cache notification
+    assert db.execute.await_count == 1
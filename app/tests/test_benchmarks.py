@@ -0,0 +1,20 @@
+import argparse
+from unittest.mock import patch
+
+import pytest
+
+from app.api.response_cache import PrecomputedResponseCache
+from app.core.token_cache import TokenCache
+from benchmarks import api_serialization
+
+
+@pytest.mark.asyncio
+async def test_api_serialization_benchmark_runs(capsys):
+    # Smoke test: the fake session must keep answering the statements of the benchmarked routes
+    token_cache = TokenCache(max_entries=10, ttl=300, negative_ttl=30)
+    with patch("app.api.v1.account.token_cache", token_cache), \
+            patch("app.api.v1.common.token_cache", token_cache), \
+            patch("app.api.v1.worlds.response_cache", PrecomputedResponseCache(ttl=600)):
+        await api_serialization.run(argparse.Namespace(requests=2, worlds=3))
+
+    assert "/api/v1/account/" in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.crawlers.build_watcher import CatalogueJob, catalogue_jobs, check_build, trigger_reason
+from app.db.model import BuildChecks
+
+NOW = datetime.datetime(2025, 1, 10, tzinfo=datetime.timezone.utc)
+DAY = datetime.timedelta(days=1)
+
+
+def _check(build_id, checked_at, triggered_jobs=None):
+    return BuildChecks(build_id=build_id, checked_at=checked_at, triggered_jobs=triggered_jobs or {})
+
+
+def test_trigger_reason():
+    assert trigger_reason(None, 100, DAY, NOW) == "first_run"
+    assert trigger_reason(_check(99, NOW), 100, DAY, NOW) == "build_changed"
+    assert trigger_reason(_check(100, NOW - 2 * DAY), 100, DAY, NOW) == "max_age"
+    assert trigger_reason(_check(100, NOW - DAY / 2), 100, DAY, NOW) is None
+
+
+@pytest.mark.asyncio
+async def test_check_build_runs_only_outdated_jobs():
+    mock_db = AsyncMock()
+    mock_db.add = MagicMock()
+    fresh = _check(100, datetime.datetime.now(datetime.timezone.utc), {"worlds": {"reason": "first_run",
+                                                                                  "requests": 4}})
+    worlds, items = AsyncMock(), AsyncMock()
+    jobs = [CatalogueJob("worlds", worlds, DAY), CatalogueJob("items", items, DAY)]
+
+    gw2 = MagicMock()
+    gw2.get_build = AsyncMock(return_value=100)
+    with patch("app.crawlers.build_watcher.GW2Client", return_value=gw2), \
+            patch("app.crawlers.build_watcher.last_triggered_check", new=AsyncMock(side_effect=[fresh, None])):
+        check = await check_build(mock_db, jobs)
+
+    worlds.assert_not_awaited()
+    items.assert_awaited_once_with(mock_db)
+    assert check.build_id == 100
+    assert check.triggered_jobs == {"items": {"reason": "first_run", "requests": 0}}
+    assert check.skipped_requests == 4
+    mock_db.add.assert_called_once_with(check)
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_check_build_does_not_record_failed_jobs():
+    mock_db = AsyncMock()
+    mock_db.add = MagicMock()
+    jobs = [CatalogueJob("items", AsyncMock(side_effect=RuntimeError("boom")), DAY)]
+
+    gw2 = MagicMock()
+    gw2.get_build = AsyncMock(return_value=101)
+    with patch("app.crawlers.build_watcher.GW2Client", return_value=gw2), \
+            patch("app.crawlers.build_watcher.last_triggered_check", new=AsyncMock(return_value=None)):
+        check = await check_build(mock_db, jobs)
+
+    assert check.triggered_jobs == {}
+    mock_db.rollback.assert_awaited_once()
+
+
+
+def test_every_catalogue_is_scheduled():
+    assert [job.name for job in catalogue_jobs()] == ["worlds", "items", "currencies", "dyes", "achievements"]
@@ -0,0 +1,147 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.bulk import BulkSyncResult, bulk_upsert, copy_rows, sync_rows, sync_set
+from app.db.model import Bank, UnlockedDyes, WalletHistory, Worlds
+
+
+def _rows(count):
+    return [{"id": i, "name_es": "es", "name_fr": "fr", "name_en": "en", "name_de": "de"} for i in range(count)]
+
+
+def _db_returning(*batches):
+    # Each batch is the list of (id, inserted) rows returned by one statement
+    db = AsyncMock()
+    results = []
+    for returned_rows in batches:
+        result = MagicMock()
+        result.all.return_value = returned_rows
+        results.append(result)
+    db.execute.side_effect = results
+    return db
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_counts_inserted_updated_and_unchanged():
+    # 2 rows inserted, 1 updated, 2 left untouched by the IS DISTINCT FROM guard
+    db = _db_returning([(0, True), (1, True), (3, False)])
+
+    result = await bulk_upsert(db, Worlds.__table__, _rows(5))
+
+    assert result == BulkSyncResult(inserted=2, updated=1, unchanged=2, changed_keys=[0, 1, 3])
+    statement = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (id) DO UPDATE" in statement
+    assert "IS DISTINCT FROM" in statement
+    assert "RETURNING schema_tyriavault.worlds.id, xmax = 0" in statement
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_compares_only_the_given_columns():
+    db = _db_returning([])
+
+    result = await bulk_upsert(db, Worlds.__table__, _rows(2), compare_columns=("name_en",))
+
+    assert result == BulkSyncResult(unchanged=2)
+    statement = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    where = statement.split("WHERE", 1)[1]
+    assert "name_en" in where and "name_es" not in where
+    assert "name_es = excluded.name_es" in statement
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_splits_batches_under_bind_parameter_limit():
+    db = _db_returning([(i, True) for i in range(13107)], [(13107, True), (13108, True)])
+
+    result = await bulk_upsert(db, Worlds.__table__, _rows(13109))
+
+    assert db.execute.await_count == 2
+    assert result.inserted == 13109
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_deduplicates_keys_and_skips_empty_batches():
+    db = _db_returning([(0, True)])
+    rows = _rows(1) + [{**_rows(1)[0], "name_en": "latest"}]
+
+    await bulk_upsert(db, Worlds.__table__, rows)
+    assert db.execute.call_args.args[0].compile().params["name_en_m0"] == "latest"
+
+    db.execute.reset_mock()
+    assert await bulk_upsert(db, Worlds.__table__, []) == BulkSyncResult()
+    db.execute.assert_not_called()
+
+
+def _select_result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    result.scalars.return_value.all.return_value = rows
+    return result
+
+
+@pytest.mark.asyncio
+async def test_sync_set_only_writes_the_difference():
+    db = AsyncMock()
+    db.execute.side_effect = [_select_result([1, 2, 3]), MagicMock(), MagicMock()]
+
+    result = await sync_set(db, UnlockedDyes.__table__, {"game_account_id": 7}, "dye_id", [2, 3, 4, 5])
+
+    assert result == BulkSyncResult(inserted=2, unchanged=2, deleted=1)
+    delete, insert = (call.args[0] for call in db.execute.await_args_list[1:])
+    assert delete.compile().params == {"game_account_id_1": 7, "dye_id_1": [1]}
+    assert [params for name, params in insert.compile().params.items() if name.startswith("dye_id")] == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_sync_set_without_changes_only_reads():
+    db = AsyncMock()
+    db.execute.side_effect = [_select_result([1, 2])]
+
+    assert await sync_set(db, UnlockedDyes.__table__, {"game_account_id": 7}, "dye_id", [2, 1]) == \
+        BulkSyncResult(unchanged=2)
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_rows_upserts_changed_rows_and_deletes_missing_ones():
+    def slot(position, count):
+        return {"slot": position, "item_id": 100 + position, "stack_count": count}
+
+    db = AsyncMock()
+    # Stored: slot 0 unchanged, slot 1 with another count, slot 2 emptied since
+    db.execute.side_effect = [
+        _select_result([(0, 100, 1, 7), (1, 101, 5, 7), (2, 102, 1, 7)]),
+        MagicMock(),
+        _select_result([(7, 1, False), (7, 3, True)]),
+    ]
+
+    result = await sync_rows(db, Bank.__table__, {"game_account_id": 7}, ("slot",),
+                             [slot(0, 1), slot(1, 250), slot(3, 1)])
+
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (1, 1, 1, 1)
+    delete, upsert = (call.args[0] for call in db.execute.await_args_list[1:])
+    assert delete.compile().params["slot_1"] == [2]
+    statement = str(upsert.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (game_account_id, slot) DO UPDATE" in statement
+    assert {value for name, value in upsert.compile().params.items() if name.startswith("slot")} == {1, 3}
+
+
+@pytest.mark.asyncio
+async def test_copy_rows_streams_rows_on_the_session_connection():
+    copy = AsyncMock()
+    cursor = MagicMock()
+    cursor.__aenter__.return_value = cursor
+    cursor.copy.return_value.__aenter__.return_value = copy
+    raw_connection = MagicMock()
+    raw_connection.driver_connection.cursor.return_value = cursor
+    connection = AsyncMock()
+    connection.get_raw_connection.return_value = raw_connection
+    db = AsyncMock()
+    db.connection.return_value = connection
+
+    copied = await copy_rows(db, WalletHistory.__table__, ("currency_id", "amount"), [(1, 10), (2, 20)])
+
+    assert copied == 2
+    cursor.copy.assert_called_once_with("COPY schema_tyriavault.wallet_history (currency_id, amount) FROM STDIN")
+    assert [call.args[0] for call in copy.write_row.await_args_list] == [(1, 10), (2, 20)]
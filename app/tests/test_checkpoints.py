@@ -0,0 +1,69 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.crawls import get_crawl
+from app.crawlers.checkpoints import CrawlCheckpoint
+from app.db.bulk import BulkSyncResult
+from app.db.model import CrawlCheckpoints
+
+
+def _db(previous=None):
+    db = AsyncMock()
+    db.get.return_value = previous
+    return db
+
+
+@pytest.mark.asyncio
+async def test_start_resumes_after_the_watermark():
+    previous = CrawlCheckpoints(job_name="items", status="running", watermark=20, chunks_done=2,
+                                inserted=5, updated=1, unchanged=14)
+    checkpoint = CrawlCheckpoint("items", chunk_size=10)
+
+    with patch("app.crawlers.checkpoints.bulk_upsert", new=AsyncMock()) as mock_bulk_upsert:
+        ids = await checkpoint.start(_db(previous), [30, 10, 40, 20])
+
+    assert ids == [30, 40]
+    assert checkpoint.result == BulkSyncResult(inserted=5, updated=1, unchanged=14)
+    assert mock_bulk_upsert.await_args.args[2][0]["total_ids"] == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, restart", [("completed", False), ("running", True)])
+async def test_start_from_zero_after_a_finished_crawl_or_on_restart(status, restart):
+    previous = CrawlCheckpoints(job_name="items", status=status, watermark=20, chunks_done=2,
+                                inserted=5, updated=1, unchanged=14)
+    checkpoint = CrawlCheckpoint("items")
+
+    with patch("app.crawlers.checkpoints.bulk_upsert", new=AsyncMock()):
+        ids = await checkpoint.start(_db(previous), [20, 10], restart=restart)
+
+    assert ids == [10, 20]
+    assert checkpoint.watermark is None
+    assert checkpoint.result == BulkSyncResult()
+
+
+@pytest.mark.asyncio
+async def test_watermark_only_moves_over_contiguous_chunks():
+    checkpoint = CrawlCheckpoint("items", chunk_size=2)
+    with patch("app.crawlers.checkpoints.bulk_upsert", new=AsyncMock()):
+        await checkpoint.start(_db(), [1, 2, 3, 4, 5])
+
+    checkpoint.chunk_done(1, BulkSyncResult(inserted=2))
+    assert checkpoint.watermark is None
+    checkpoint.chunk_done(0, BulkSyncResult(updated=2))
+    assert checkpoint.watermark == 4
+    checkpoint.chunk_done(2)
+    assert checkpoint.watermark == 5
+    assert checkpoint.result == BulkSyncResult(inserted=2, updated=2)
+
+
+@pytest.mark.asyncio
+async def test_get_crawl_unknown_job():
+    db = AsyncMock()
+    db.get.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_crawl("nothing", db)
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.api.v1.common import health
+from app.gw2.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, CircuitState
+from app.gw2.client import GW2Client
+from app.gw2.response_cache import ResponseCache
+
+
+def _client(handler, registry, cache=None):
+    http_client = httpx.AsyncClient(base_url="https://gw2.test/v2", transport=httpx.MockTransport(handler))
+    with patch("app.gw2.client.get_gw2_http_client", return_value=http_client), \
+            patch("app.gw2.client.get_gw2_token_response_cache", return_value=cache), \
+            patch("app.gw2.client.get_gw2_circuit_breakers", return_value=registry):
+        return GW2Client(api_key="key", max_retries=5, backoff_factor=0)
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    breaker = CircuitBreaker("/account", failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    # reset_timeout elapsed -> a single probe is allowed
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker("/account", failure_threshold=3, reset_timeout=0)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_probe_does_not_wedge_the_half_open_circuit():
+    responses = iter([httpx.Response(500), httpx.Response(500), httpx.Response(429, headers={"Retry-After": "0"}),
+                      httpx.Response(200, json={"name": "Jade.1234"})])
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return next(responses)
+
+    registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=0)
+    gw2 = _client(handler, registry)
+
+    # 500, 500 (circuit opens), then the half-open probe gets a 429 and the retry probes again
+    assert await gw2.get_account() == {"name": "Jade.1234"}
+    assert len(calls) == 4
+    assert registry.get("/account").state is CircuitState.CLOSED
+
+
+def test_registry_groups_endpoints_without_ids_and_query():
+    assert CircuitBreakerRegistry.endpoint_name("/items/123") == "/items"
+    assert CircuitBreakerRegistry.endpoint_name("/worlds?lang=en&ids=all") == "/worlds"
+    assert CircuitBreakerRegistry.endpoint_name("/account/wallet") == "/account/wallet"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_retrying():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+    gw2 = _client(handler, registry)
+
+    with pytest.raises(CircuitOpenError):
+        await gw2.get_account()
+    # The retry sequence stopped as soon as the circuit opened
+    assert len(calls) == 2
+
+    with pytest.raises(httpx.RequestError):
+        await gw2.get_account()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_last_known_good_response():
+    responses = iter([httpx.Response(200, json={"name": "Jade.1234"}, headers={"ETag": '"v1"'}),
+                      httpx.Response(500)])
+
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    gw2 = _client(lambda request: next(responses), registry, cache=ResponseCache(max_entries=4))
+
+    assert await gw2.get_account() == {"name": "Jade.1234"}
+    assert not gw2.last_response_stale
+
+    assert await gw2.get_account() == {"name": "Jade.1234"}
+    assert gw2.last_response_stale
+
+
+def test_health_reports_open_circuits():
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    registry.get("/tokeninfo").record_failure()
+    with patch("app.api.v1.common.get_gw2_circuit_breakers", return_value=registry), \
+            patch("app.api.v1.common.get_gw2_response_cache", return_value=None):
+        result = health()
+    assert result["status"] == "degraded"
+    assert result["circuit_breakers"]["/tokeninfo"]["state"] == "open"
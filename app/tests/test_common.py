@@ -2,13 +2,25 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.common import status, check_token_info
+from app.api.responses import MsgspecJSONResponse
+from app.api.v1.common import status, check_token_info, ready
+from app.api.v1.schemas import TokenInfoOut
+from app.core.token_cache import TokenCache
+from app.core.warmup import WarmupState
 from app.db.model import ApiKeys
 
 
+@pytest.fixture(autouse=True)
+def token_cache():
+    # Caché vacía en cada test: la global conservaría los tokens de los tests anteriores
+    cache = TokenCache(max_entries=100, ttl=300, negative_ttl=30)
+    with patch("app.api.v1.common.token_cache", cache):
+        yield cache
+
+
 # Test para status()
 def test_status():
     response = status()
@@ -17,6 +29,26 @@ def test_status():
     assert response.media_type == "text/plain"
 
 
+# Test para ready(): 503 mientras el warm-up sigue en curso, 200 cuando termina (aunque algún paso falle)
+@pytest.mark.asyncio
+async def test_ready_reports_warmup_progress():
+    state = WarmupState()
+    state.plan("seed_data", "worlds_crawler")
+    state.startup_finished()
+
+    with patch("app.api.v1.common.warmup", state):
+        await state.run("seed_data", AsyncMock())
+        response = ready()
+        assert response.status_code == 503
+        assert b'"worlds_crawler":{"status":"pending"}' in response.body
+
+        await state.run("worlds_crawler", AsyncMock(side_effect=RuntimeError("GW2 down")))
+        response = ready()
+        assert response.status_code == 200
+        assert state.steps["worlds_crawler"]["status"] == "failed"
+        assert state.steps["worlds_crawler"]["detail"] == "GW2 down"
+
+
 # Test para check_token_info: token válido en la base de datos
 @pytest.mark.asyncio
 async def test_check_token_info_token_in_db():
@@ -28,10 +60,28 @@ async def test_check_token_info_token_in_db():
     mock_db.execute.return_value = mock_result
 
     with patch("app.core.utils.split_bearer_token", return_value=mock_token):
-        result = await check_token_info(authorization="Bearer valid_token", db=mock_db)
+        result = await check_token_info(response=Response(), authorization="Bearer valid_token", db=mock_db)
         assert result == mock_api_key
 
 
+# Test para check_token_info: solo se leen y serializan las columnas del modelo de respuesta
+@pytest.mark.asyncio
+async def test_check_token_info_loads_only_response_columns():
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_api_key = ApiKeys(id=3, api_key="valid_token", permissions=["account"], game_account_id=None)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = mock_api_key
+    mock_db.execute.return_value = mock_result
+
+    result = await check_token_info(response=Response(), authorization="Bearer valid_token", db=mock_db)
+
+    statement = str(mock_db.execute.await_args.args[0])
+    assert "api_keys.last_time_checked" in statement and "api_keys.last_used" not in statement
+    response = MsgspecJSONResponse(TokenInfoOut.model_validate(result).model_dump(mode="json"))
+    assert response.body == (b'{"id":3,"api_key":"valid_token","permissions":["account"],'
+                             b'"game_account_id":null,"last_time_checked":null}')
+
+
 # Test para check_token_info: token no está en la base de datos, pero es válido en GW2 API
 @pytest.mark.asyncio
 async def test_check_token_info_token_not_in_db_but_valid_in_api():
@@ -48,7 +98,7 @@ async def test_check_token_info_token_not_in_db_but_valid_in_api():
     with patch("app.core.utils.split_bearer_token", return_value=mock_token), \
             patch("app.gw2.client.GW2Client.token_info", new=AsyncMock(return_value=mock_token_info)), \
             patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
-        result = await check_token_info(authorization="Bearer new_token", db=mock_db)
+        result = await check_token_info(response=Response(), authorization="Bearer new_token", db=mock_db)
         assert result.api_key == mock_token
         assert result.permissions == ["account"]
 
@@ -59,7 +109,7 @@ async def test_check_token_info_invalid_token_format():
     mock_db = AsyncMock(spec=AsyncSession)
     with patch("app.core.utils.split_bearer_token", side_effect=ValueError("Invalid authorization header format")):
         with pytest.raises(HTTPException) as exc:
-            await check_token_info(authorization="bad_header", db=mock_db)
+            await check_token_info(response=Response(), authorization="bad_header", db=mock_db)
         assert exc.value.status_code == 400
         assert "Invalid authorization header format" in exc.value.detail
 
@@ -81,7 +131,7 @@ async def test_check_token_info_invalid_token_gw2():
             patch("app.gw2.client.GW2Client.token_info", new=AsyncMock(side_effect=http_error)), \
             patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
         with pytest.raises(HTTPException) as exc:
-            await check_token_info(authorization="Bearer bad_token", db=mock_db)
+            await check_token_info(response=Response(), authorization="Bearer bad_token", db=mock_db)
         assert exc.value.status_code == 401
 
 
@@ -98,7 +148,7 @@ async def test_check_token_info_gw2_request_error():
             patch("app.gw2.client.GW2Client.token_info", new=AsyncMock(side_effect=request_error)), \
             patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
         with pytest.raises(HTTPException) as exc:
-            await check_token_info(authorization="Bearer bad_token", db=mock_db)
+            await check_token_info(response=Response(), authorization="Bearer bad_token", db=mock_db)
         assert exc.value.status_code == 503
 
 
@@ -114,5 +164,63 @@ async def test_check_token_info_gw2_generic_exception():
             patch("app.gw2.client.GW2Client.token_info", new=AsyncMock(side_effect=Exception("Internal error"))), \
             patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
         with pytest.raises(HTTPException) as exc:
-            await check_token_info(authorization="Bearer bad_token", db=mock_db)
+            await check_token_info(response=Response(), authorization="Bearer bad_token", db=mock_db)
         assert exc.value.status_code == 500
+
+
+# Test para check_token_info: un token en caché no consulta la base de datos
+@pytest.mark.asyncio
+async def test_check_token_info_cached_token_skips_db(token_cache):
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = ApiKeys(id=3, api_key="valid_token",
+                                                                 permissions=["account"], game_account_id=7)
+    mock_db.execute.return_value = mock_result
+
+    await check_token_info(response=Response(), authorization="Bearer valid_token", db=mock_db)
+    result = await check_token_info(response=Response(), authorization="Bearer valid_token", db=mock_db)
+
+    assert mock_db.execute.await_count == 1
+    assert result == TokenInfoOut(id=3, api_key="valid_token", permissions=["account"], game_account_id=7)
+    assert token_cache.stats()["hits"] == 1
+
+
+# Test para check_token_info: un token rechazado por GW2 se rechaza desde la caché sin BD ni GW2
+@pytest.mark.asyncio
+async def test_check_token_info_rejected_token_is_cached():
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = None
+    mock_db.execute.return_value = mock_result
+    mock_response = MagicMock()
+    mock_response.status_code = 403
+    http_error = httpx.HTTPStatusError("403", request=MagicMock(), response=mock_response)
+    token_info = AsyncMock(side_effect=http_error)
+    with patch("app.gw2.client.GW2Client.token_info", new=token_info), \
+            patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc:
+                await check_token_info(response=Response(), authorization="Bearer bad_token", db=mock_db)
+            assert exc.value.status_code == 403
+
+    assert token_info.await_count == 1
+    assert mock_db.execute.await_count == 1
+
+
+# Test para check_token_info: respuesta obsoleta de GW2 (circuito abierto) marcada con Warning y no cacheada
+@pytest.mark.asyncio
+async def test_check_token_info_flags_stale_gw2_data(token_cache):
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = None
+    mock_db.execute.return_value = mock_result
+    mock_db.add = MagicMock()
+    response = Response()
+    with patch("app.api.v1.common.GW2Client") as mock_client:
+        mock_client.return_value.token_info = AsyncMock(return_value={"permissions": ["account"]})
+        mock_client.return_value.last_response_stale = True
+        result = await check_token_info(response=response, authorization="Bearer stale_token", db=mock_db)
+
+    assert result.permissions == ["account"]
+    assert response.headers["Warning"] == '110 - "Response is Stale"'
+    assert len(token_cache) == 0
@@ -0,0 +1,155 @@
+import argparse
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.crawlers import __main__ as crawler_runner
+from app.crawlers.catalogue import CRAWLERS, CrawlerSpec, normalize_achievements, normalize_dyes, update_catalogue
+from app.crawlers.items_crawler import LANGUAGES
+from app.crawlers.pipeline import iter_localized_chunks, run_pipeline
+from app.db.bulk import BulkSyncResult
+from app.gw2.client import GW2Client
+from app.gw2.fake_server import create_fake_gw2_app
+
+
+def _fake_gw2():
+    http_client = httpx.AsyncClient(base_url="http://fake-gw2/v2",
+                                    transport=httpx.ASGITransport(app=create_fake_gw2_app()))
+    with patch("app.gw2.client.get_gw2_http_client", return_value=http_client):
+        return GW2Client()
+
+
+def double(value: int) -> list[int]:
+    return [value, value]
+
+
+async def _numbers(count: int):
+    for value in range(count):
+        yield value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_run_pipeline_batches_normalized_records(workers):
+    batches = []
+    completed = []
+
+    async def write(batch, completed_units):
+        batches.append(batch)
+        completed.append(completed_units)
+
+    stats = await run_pipeline(_numbers(5), double, write, workers=workers, batch_size=4, queue_size=1)
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(record for batch in batches for record in batch) == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+    # Every unit is reported once, with the batch holding its last record
+    assert [len(units) for units in completed] == [2, 2, 1]
+    assert sorted(unit for units in completed for unit in units) == [0, 1, 2, 3, 4]
+    assert [(stage.name, stage.count) for stage in stats] == [("fetch", 5), ("normalize", 10), ("write", 10)]
+
+
+def split_in_three(value: int) -> list[int]:
+    return [value] * 3 if value else []
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_reports_units_split_across_batches_once_fully_written():
+    completed = []
+
+    async def write(batch, completed_units):
+        completed.append(completed_units)
+
+    await run_pipeline(_numbers(3), split_in_three, write, workers=0, batch_size=2, queue_size=1)
+
+    # Unit 0 has no records, unit 1 ends in the second batch, unit 2 in the third one
+    assert completed == [[0], [1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_propagates_stage_errors():
+    write = AsyncMock(side_effect=RuntimeError("database down"))
+
+    with pytest.raises(RuntimeError, match="database down"):
+        await run_pipeline(_numbers(50), double, write, workers=0, batch_size=1, queue_size=1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", list(CRAWLERS))
+async def test_normalizers_handle_recorded_payloads(name):
+    spec = CRAWLERS[name]
+    gw2 = _fake_gw2()
+    ids = await gw2.get_ids(spec.endpoint)
+
+    records = []
+    async for raw_by_lang in iter_localized_chunks(gw2, spec.endpoint, ids, LANGUAGES, model=bytes):
+        records.extend(spec.normalize(raw_by_lang))
+
+    assert records
+
+
+@pytest.mark.asyncio
+async def test_update_catalogue_writes_and_checkpoints_every_chunk():
+    gw2 = _fake_gw2()
+    write = AsyncMock(side_effect=lambda db, rows: BulkSyncResult(inserted=len(rows)))
+    spec = CrawlerSpec("currencies", "/currencies", CRAWLERS["currencies"].normalize, write)
+    db = AsyncMock()
+
+    with patch("app.crawlers.catalogue.GW2Client", return_value=gw2), \
+            patch("app.crawlers.catalogue.CrawlCheckpoint.start", new=AsyncMock(side_effect=lambda db, ids: ids)), \
+            patch("app.crawlers.catalogue.CrawlCheckpoint.save", new=AsyncMock()) as save:
+        result = await update_catalogue(db, spec)
+
+    assert result.inserted == len(await gw2.get_ids("/currencies")) > 0
+    assert save.await_count == write.await_count + 1
+    assert db.commit.await_count == write.await_count + 1
+
+
+def test_normalize_dyes_formats_the_base_color():
+    raw = b'[{"id": 1, "name": "Dye Remover", "base_rgb": [128, 26, 26]}, {"id": 2, "name": "Broken"}]'
+    assert normalize_dyes({"en": raw, "es": b'[{"id": 1, "name": "Quitatintes"}]'}) == [{
+        "id": 1, "color": "[128,26,26]",
+        "name_en": "Dye Remover", "name_es": "Quitatintes", "name_de": "Dye Remover", "name_fr": "Dye Remover",
+    }]
+
+
+def test_normalize_achievements_maps_the_type_and_hashes_the_row():
+    raw = b'[{"id": 1, "name": "Centaur Slayer", "type": "Default", "flags": ["Pvp"], "tiers": []}]'
+    [row] = normalize_achievements({"en": raw})
+    assert row["achievement_type"] == "Default"
+    assert row["flags"] == ["Pvp"]
+    assert len(row.pop("content_hash")) == 64
+
+
+def _runner_args(**kwargs) -> argparse.Namespace:
+    return argparse.Namespace(**{"crawler": "dyes", "concurrency": 1, "workers": 0, "batch_size": 10,
+                                 "dry_run": False, "restart": False, "every": None, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_crawler_runner_refuses_to_crawl_while_the_leader_holds_the_lock():
+    election = MagicMock(is_leader=False, tick=AsyncMock(), stop=AsyncMock())
+
+    with patch("app.crawlers.__main__.LeaderElection", return_value=election), \
+            patch("app.crawlers.__main__.startup_gw2_client", new=AsyncMock()), \
+            patch("app.crawlers.__main__.shutdown_gw2_client", new=AsyncMock()), \
+            patch("app.crawlers.__main__.run_crawler", new=AsyncMock()) as mock_run_crawler:
+        with pytest.raises(SystemExit):
+            await crawler_runner.run(_runner_args())
+
+    mock_run_crawler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_crawler_runner_releases_the_lock_after_crawling():
+    election = MagicMock(is_leader=True, tick=AsyncMock(), stop=AsyncMock())
+
+    with patch("app.crawlers.__main__.LeaderElection", return_value=election), \
+            patch("app.crawlers.__main__.startup_gw2_client", new=AsyncMock()), \
+            patch("app.crawlers.__main__.shutdown_gw2_client", new=AsyncMock()), \
+            patch("app.crawlers.__main__.run_crawler", new=AsyncMock(side_effect=RuntimeError("boom"))) \
+            as mock_run_crawler:
+        await crawler_runner.run(_runner_args())
+
+    assert mock_run_crawler.await_args.args[0] is CRAWLERS["dyes"]
+    election.stop.assert_awaited_once()
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.gw2.client import GW2Client
+from app.gw2.fake_server import FaultConfig, create_fake_gw2_app
+
+
+def _client(faults=None, api_key=None):
+    transport = httpx.ASGITransport(app=create_fake_gw2_app(faults=faults))
+    http_client = httpx.AsyncClient(base_url="http://fake-gw2/v2", transport=transport)
+    with patch("app.gw2.client.get_gw2_http_client", return_value=http_client):
+        return GW2Client(api_key=api_key, backoff_factor=0)
+
+
+@pytest.mark.asyncio
+async def test_replays_localized_worlds():
+    gw2 = _client()
+    worlds_en = await gw2.get_worlds(lang="en")
+    worlds_es = await gw2.get_worlds(lang="es")
+    assert worlds_en[0]["name"] == "Anvil Rock"
+    assert worlds_es[0]["name"] == "Roca del Yunque"
+
+
+@pytest.mark.asyncio
+async def test_bulk_ids_report_missing():
+    gw2 = _client()
+    result = await gw2.get_items([19721, 19976, 1])
+    assert set(result.found) == {19721, 19976}
+    assert result.missing == [1]
+
+
+@pytest.mark.asyncio
+async def test_pagination_headers():
+    gw2 = _client()
+    pages = [page async for page in gw2.iter_pages("/items", page_size=3)]
+    assert len(pages) == pages[0].page_total == 3
+    assert sum(len(page.items) for page in pages) == pages[0].result_total
+
+
+@pytest.mark.asyncio
+async def test_authenticated_endpoints_require_a_valid_key():
+    with pytest.raises(httpx.HTTPStatusError) as exc:
+        await _client(api_key="invalid").token_info()
+    assert exc.value.response.status_code == 401
+
+    account = await _client(api_key="valid").get_account(typed=True)
+    assert account.name == "Jade.1234"
+
+
+@pytest.mark.asyncio
+async def test_client_retries_through_injected_rate_limits():
+    faults = FaultConfig(rate_limit_ratio=0.5, retry_after=0, seed=3)
+    gw2 = _client(faults=faults)
+    gw2.max_retries = 10
+
+    for _ in range(5):
+        assert (await gw2.get_exchange_rates())["coins_per_gem"] == 3114
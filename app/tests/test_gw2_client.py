@@ -0,0 +1,348 @@
+import asyncio
+import datetime
+import email.utils
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.gw2 import client as gw2_client
+from app.gw2.client import GW2Client, MAX_IDS_PER_REQUEST, count_requests, parse_retry_after
+from app.gw2.models import Item
+from app.gw2.rate_limiter import Priority, RateLimiter
+from app.gw2.response_cache import ResponseCache
+from app.gw2.single_flight import SingleFlight
+
+
+@pytest.fixture
+def gw2():
+    with patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()):
+        yield GW2Client()
+    gw2_client._batch_loaders.clear()
+
+
+def _echo_ids(endpoint, params=None, require_token=False, model=None):
+    return [{"id": int(i)} for i in params["ids"].split(",") if int(i) > 0]
+
+
+@pytest.mark.asyncio
+async def test_get_many_splits_ids_in_chunks(gw2):
+    gw2._get = AsyncMock(side_effect=_echo_ids)
+    ids = list(range(1, 2 * MAX_IDS_PER_REQUEST + 2))
+
+    result = await gw2.get_items(ids + ids[:10])
+
+    assert gw2._get.await_count == 3
+    assert set(result.found) == set(ids)
+    assert result.missing == []
+
+
+@pytest.mark.asyncio
+async def test_get_many_reports_missing_ids(gw2):
+    gw2._get = AsyncMock(side_effect=_echo_ids)
+
+    result = await gw2.get_items([1, -2, 3])
+
+    assert set(result.found) == {1, 3}
+    assert result.missing == [-2]
+
+
+@pytest.mark.asyncio
+async def test_get_many_all_ids_invalid(gw2):
+    response = MagicMock()
+    response.status_code = 404
+    gw2._get = AsyncMock(side_effect=httpx.HTTPStatusError("404", request=MagicMock(), response=response))
+
+    result = await gw2.get_items([-1, -2])
+
+    assert result.found == {}
+    assert result.missing == [-1, -2]
+
+
+@pytest.mark.asyncio
+async def test_get_item_coalesces_concurrent_lookups(gw2):
+    with patch.object(GW2Client, "_get", AsyncMock(side_effect=_echo_ids)) as get:
+        other = GW2Client()
+        results = await asyncio.gather(gw2.get_item(1), other.get_item(2), gw2.get_item("1"), gw2.get_item(-5))
+
+    # One request for every client of the lane, string ids matched as integers
+    assert get.await_count == 1
+    assert results == [{"id": 1}, {"id": 2}, {"id": 1}, None]
+    # Idle loaders are dropped
+    assert gw2_client._batch_loaders == {}
+
+
+@pytest.mark.asyncio
+async def test_item_loaders_are_not_shared_across_keys_or_lanes(gw2):
+    with patch("app.gw2.client.get_gw2_http_client", return_value=MagicMock()), \
+            patch.object(GW2Client, "_get", autospec=True,
+                         side_effect=lambda client, *args, **kwargs: _echo_ids(*args, **kwargs)) as get:
+        keyed = GW2Client(api_key="key")
+        crawler = GW2Client(priority=Priority.CRAWLER)
+        await asyncio.gather(gw2.get_item(1), keyed.get_item(2), crawler.get_item(3))
+
+        assert get.await_count == 3
+        # Shared loaders resolve with a client of their own lane
+        lanes = sorted(call.args[0].priority for call in get.await_args_list if call.args[0].api_key is None)
+    assert lanes == [Priority.INTERACTIVE, Priority.CRAWLER]
+    assert keyed._batch_loaders == {} and gw2_client._batch_loaders == {}
+
+
+def _client_with_transport(handler, cache_size=8):
+    http_client = httpx.AsyncClient(base_url="https://gw2.test/v2", transport=httpx.MockTransport(handler))
+    with patch("app.gw2.client.get_gw2_http_client", return_value=http_client), \
+            patch("app.gw2.client.get_gw2_response_cache", return_value=ResponseCache(max_entries=cache_size)):
+        return GW2Client()
+
+
+@pytest.mark.asyncio
+async def test_get_serves_fresh_responses_from_cache():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"coins_per_gem": 3000}, headers={"Cache-Control": "public, max-age=300"})
+
+    gw2 = _client_with_transport(handler)
+    first = await gw2.get_exchange_rates()
+    second = await gw2.get_exchange_rates()
+
+    assert len(calls) == 1
+    assert second is first
+    assert gw2.response_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_revalidates_stale_responses_with_etag():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=[{"id": 1001, "name": "Anvil Rock"}], headers={"ETag": '"v1"'})
+
+    gw2 = _client_with_transport(handler)
+    first = await gw2.get_worlds()
+    second = await gw2.get_worlds()
+
+    assert len(calls) == 2
+    assert second is first
+    stats = gw2.response_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["revalidations"] == 1
+    assert stats["not_modified"] == 1
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    headers = httpx.Headers({"ETag": '"x"'})
+    for endpoint in ("/a", "/b"):
+        cache.store(ResponseCache.key(endpoint, None, None), endpoint, headers)
+    cache.lookup(ResponseCache.key("/a", None, None))
+    cache.store(ResponseCache.key("/c", None, None), "/c", headers)
+
+    assert cache.peek(ResponseCache.key("/a", None, None)) is not None
+    assert cache.peek(ResponseCache.key("/b", None, None)) is None
+
+
+def test_response_cache_only_stores_revalidatable_or_fresh_responses():
+    cache = ResponseCache(max_entries=4)
+    key = ResponseCache.key("/items", {"ids": "1,2"}, None)
+
+    assert cache.store(key, [], httpx.Headers()) is None
+    assert cache.store(key, [], httpx.Headers({"Cache-Control": "max-age=0"})) is None
+    assert cache.store(key, [], httpx.Headers({"Cache-Control": "no-store", "ETag": '"x"'})) is None
+    assert cache.store(key, [], httpx.Headers({"Cache-Control": "max-age=60"})) is not None
+    assert len(cache) == 1
+
+
+def test_crawler_and_per_key_clients_stay_out_of_the_shared_cache():
+    shared, per_key = ResponseCache(max_entries=4), ResponseCache(max_entries=4)
+    with patch("app.gw2.client.get_gw2_http_client"), \
+            patch("app.gw2.client.get_gw2_response_cache", return_value=shared), \
+            patch("app.gw2.client.get_gw2_token_response_cache", return_value=per_key):
+        assert GW2Client().response_cache is shared
+        assert GW2Client(api_key="key").response_cache is per_key
+        assert GW2Client(priority=Priority.CRAWLER).response_cache is None
+        assert GW2Client(api_key="key", priority=Priority.CRAWLER).response_cache is None
+
+
+def test_response_cache_key_hashes_api_key():
+    key = ResponseCache.key("/account", None, "secret-key")
+    assert "secret-key" not in key
+    assert key != ResponseCache.key("/account", None, "other-key")
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"id": "abc", "permissions": ["account"]})
+
+    gw2 = _client_with_transport(handler)
+    gw2.api_key = "key"
+    results = await asyncio.gather(*(gw2.token_info() for _ in range(5)))
+
+    assert len(calls) == 1
+    assert all(result == {"id": "abc", "permissions": ["account"]} for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_of_different_lanes_are_not_shared():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"id": "abc", "permissions": ["account"]})
+
+    interactive = _client_with_transport(handler)
+    crawler = _client_with_transport(handler)
+    interactive.api_key = crawler.api_key = "key"
+    crawler.priority = Priority.CRAWLER
+    await asyncio.gather(interactive.token_info(), crawler.token_info(), interactive.token_info())
+
+    # One call per lane
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", slow))
+    second = asyncio.create_task(flight.do("k", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    assert first.cancelled()
+
+
+def _paginated_handler(total_items, calls):
+    def handler(request):
+        page = int(request.url.params["page"])
+        page_size = int(request.url.params["page_size"])
+        page_total = (total_items + page_size - 1) // page_size
+        calls.append(page)
+        if page >= page_total:
+            return httpx.Response(400, json={"text": "page out of range"})
+        ids = range(page * page_size, min(total_items, (page + 1) * page_size))
+        return httpx.Response(
+            200,
+            json=[{"id": i} for i in ids],
+            headers={"X-Page-Total": str(page_total), "X-Result-Total": str(total_items)},
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_walks_every_page_in_order():
+    calls = []
+    gw2 = _client_with_transport(_paginated_handler(25, calls))
+
+    pages = [page async for page in gw2.iter_pages("/items", page_size=10, max_in_flight=2)]
+
+    assert [page.index for page in pages] == [0, 1, 2]
+    assert [entry["id"] for page in pages for entry in page.items] == list(range(25))
+    assert pages[0].page_total == 3
+    assert pages[0].result_total == 25
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_resumes_from_given_page():
+    calls = []
+    gw2 = _client_with_transport(_paginated_handler(25, calls))
+
+    pages = [page async for page in gw2.iter_pages("/items", page_size=10, start_page=2)]
+    assert [page.index for page in pages] == [2]
+
+    past_the_end = [page async for page in gw2.iter_pages("/items", page_size=10, start_page=5)]
+    assert past_the_end == []
+
+
+@pytest.mark.asyncio
+async def test_iter_id_chunks_yields_chunks_in_order(gw2):
+    gw2._get = AsyncMock(side_effect=_echo_ids)
+
+    pages = [page async for page in gw2.iter_id_chunks("/items", list(range(1, 11)), chunk_size=4, start_chunk=1)]
+
+    assert [page.index for page in pages] == [1, 2]
+    assert [entry["id"] for page in pages for entry in page.items] == [5, 6, 7, 8, 9, 10]
+
+
+@pytest.mark.asyncio
+async def test_typed_decoding_drops_unknown_fields():
+    def handler(request):
+        return httpx.Response(200, json=[
+            {"id": 19721, "name": "Glob of Ectoplasm", "type": "CraftingMaterial", "rarity": "Exotic",
+             "chat_link": "[&AgEJTQAA]", "level": 0, "vendor_value": 256, "flags": ["NoSell"],
+             "game_types": ["Activity", "Wvw"], "restrictions": []},
+        ])
+
+    gw2 = _client_with_transport(handler)
+    result = await gw2.get_items([19721], typed=True)
+
+    item = result.found[19721]
+    assert isinstance(item, Item)
+    assert item.name == "Glob of Ectoplasm"
+    assert item.flags == ["NoSell"]
+    assert not hasattr(item, "game_types")
+
+
+@pytest.mark.asyncio
+async def test_count_requests_counts_sent_requests_only():
+    def handler(request):
+        return httpx.Response(200, json={"id": 182712}, headers={"Cache-Control": "public, max-age=60"})
+
+    gw2 = _client_with_transport(handler)
+    with count_requests() as counter:
+        assert await gw2.get_build() == 182712
+        # Served from the response cache
+        await gw2.get_build()
+
+    assert counter.requests == 1
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # In the past
+    in_a_minute = email.utils.format_datetime(datetime.datetime.now(datetime.timezone.utc)
+                                              + datetime.timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(in_a_minute) <= 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_response_with_an_http_date_is_retried():
+    responses = iter([httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+                      httpx.Response(200, json={"coins_per_gem": 3000})])
+    gw2 = _client_with_transport(lambda request: next(responses))
+    gw2.rate_limiter = RateLimiter(requests_per_minute=600, burst=10, crawler_max_concurrency=1)
+    gw2.backoff_factor = 0
+
+    assert await gw2.get_exchange_rates() == {"coins_per_gem": 3000}
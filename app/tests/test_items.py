@@ -0,0 +1,162 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1 import items
+from app.api.v1.schemas import ItemsBatchIn
+from app.gw2.models import Item
+from app.gw2.rate_limiter import Priority
+
+
+@pytest.fixture(autouse=True)
+def unknown_item_ids():
+    unknown = items.UnknownItemIds(max_entries=100, ttl=3600)
+    with patch("app.api.v1.items.unknown_item_ids", unknown):
+        yield unknown
+
+
+def _db_returning(rows):
+    db = AsyncMock()
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = rows
+    db.execute.return_value = result
+    return db
+
+
+async def _list(db, **params):
+    defaults = {"rarity_id": None, "item_type_id": None, "min_level": None, "max_level": None, "fields": None,
+                "cursor": None, "limit": 2, "lang": None}
+    return await items.items_cached_list(**{**defaults, **params}, db=db)
+
+
+async def _aiter(values):
+    for value in values:
+        yield value
+
+
+def test_parse_fields_always_keeps_the_id():
+    assert items.parse_fields("name_en,id,icon,name_en") == ["id", "name_en", "icon"]
+    assert "content_hash" not in items.parse_fields(None)
+    with pytest.raises(ValueError):
+        items.parse_fields("name_en,content_hash")
+
+
+def test_parse_fields_flattens_the_requested_language():
+    fields = items.parse_fields(None, "fr")
+    assert fields[:2] == ["id", "name"] and "description" in fields
+    assert not any(field.startswith(("name_", "description_")) for field in fields)
+    assert items.parse_fields("name,icon", "fr") == ["id", "name", "icon"]
+    with pytest.raises(ValueError):
+        items.parse_fields("name")
+
+
+@pytest.mark.asyncio
+async def test_items_list_uses_keyset_pagination():
+    db = _db_returning([{"id": 11, "name_en": "a"}, {"id": 12, "name_en": "b"}, {"id": 15, "name_en": "c"}])
+
+    page = await _list(db, rarity_id=3, min_level=10, max_level=80, fields="name_en", cursor=10)
+
+    assert page == {"items": [{"id": 11, "name_en": "a"}, {"id": 12, "name_en": "b"}], "next_cursor": 12}
+    statement = db.execute.await_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("SELECT schema_tyriavault.items_cache.id, schema_tyriavault.items_cache.name_en ")
+    assert "items_cache.id > " in sql and "OFFSET" not in sql
+    assert "ORDER BY schema_tyriavault.items_cache.id \n LIMIT" in sql
+    assert statement.compile().params["param_1"] == 3
+
+
+@pytest.mark.asyncio
+async def test_items_list_reads_only_the_requested_language():
+    db = _db_returning([{"id": 1, "name": "Épée", "icon": "i.png"}])
+
+    page = await _list(db, fields="name,icon", lang="fr")
+
+    assert page["items"] == [{"id": 1, "name": "Épée", "icon": "i.png"}]
+    sql = str(db.execute.await_args.args[0])
+    assert "items_cache.name_fr AS name" in sql and "name_en" not in sql
+
+
+@pytest.mark.asyncio
+async def test_items_list_last_page_has_no_cursor():
+    page = await _list(_db_returning([{"id": 1}]))
+
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_items_list_rejects_bad_parameters():
+    with pytest.raises(HTTPException) as exc:
+        await _list(AsyncMock(), fields="nope")
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc:
+        await _list(AsyncMock(), min_level=80, max_level=10)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_items_batch_fills_cache_misses_from_upstream():
+    db = _db_returning([{"id": 3, "name": "Cached"}])
+    pages = {lang: [Item(id=5, name=f"Fetched {lang}", type="Weapon", rarity="Exotic", chat_link="[&AgEFAAAA]")]
+             for lang in ("en", "es", "de", "fr")}
+    iter_item_chunks = MagicMock(return_value=_aiter([pages]))
+
+    with patch("app.api.v1.items.GW2Client") as gw2, \
+            patch("app.api.v1.items.iter_item_chunks", iter_item_chunks), \
+            patch("app.api.v1.items.upsert_items", new=AsyncMock()) as upsert_items:
+        batch = await items.items_batch(ItemsBatchIn(ids=[5, 3, 404, 3]), fields="name", lang="es", db=db)
+
+    assert batch == {"items": [{"id": 5, "name": "Fetched es"}, {"id": 3, "name": "Cached"}],
+                     "cached": [3], "fetched": [5], "missing": [404], "deferred": []}
+    # Hits in one statement with a single array parameter
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "items_cache.id = ANY (%(ids)s::INTEGER[])" in sql
+    assert iter_item_chunks.call_args.args[1] == [5, 404]
+    # The fill does not compete with the interactive traffic
+    assert gw2.call_args.kwargs["priority"] is Priority.CRAWLER
+    assert [row["id"] for row in upsert_items.await_args.args[1]] == [5]
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_items_batch_caps_the_fetched_misses_and_remembers_unknown_ids(unknown_item_ids):
+    iter_item_chunks = MagicMock(side_effect=lambda gw2, ids: _aiter([{"en": [], "es": [], "de": [], "fr": []}]))
+
+    with patch("app.api.v1.items.GW2Client"), patch("app.api.v1.items.iter_item_chunks", iter_item_chunks), \
+            patch("app.api.v1.items.settings.ITEMS_BATCH_MAX_FETCH", 2):
+        batch = await items.items_batch(ItemsBatchIn(ids=[1, 2, 3]), fields="id", lang=None, db=_db_returning([]))
+        assert (batch["missing"], batch["deferred"]) == ([1, 2], [3])
+        assert 1 in unknown_item_ids and 3 not in unknown_item_ids
+
+        # The unknown ids are not asked for again, only the deferred one is fetched
+        batch = await items.items_batch(ItemsBatchIn(ids=[1, 2, 3]), fields="id", lang=None, db=_db_returning([]))
+        assert (batch["missing"], batch["deferred"]) == ([1, 2, 3], [])
+    assert [call.args[1] for call in iter_item_chunks.call_args_list] == [[1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_items_batch_all_cached_does_not_call_upstream():
+    db = _db_returning([{"id": 1}, {"id": 2}])
+
+    with patch("app.api.v1.items.GW2Client") as gw2:
+        batch = await items.items_batch(ItemsBatchIn(ids=[2, 1]), fields="id", lang=None, db=db)
+
+    assert (batch["cached"], batch["fetched"], batch["missing"], batch["deferred"]) == ([2, 1], [], [], [])
+    gw2.assert_not_called()
+    db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_items_batch_rejects_bad_requests_and_upstream_failures():
+    with pytest.raises(HTTPException) as exc:
+        await items.items_batch(ItemsBatchIn(ids=list(range(items.MAX_BATCH_SIZE + 1))), fields=None, lang=None, db=AsyncMock())
+    assert exc.value.status_code == 400
+
+    failing = MagicMock(side_effect=httpx.RequestError("Connection failure", request=MagicMock()))
+    with patch("app.api.v1.items.GW2Client"), patch("app.api.v1.items.iter_item_chunks", failing):
+        with pytest.raises(HTTPException) as exc:
+            await items.items_batch(ItemsBatchIn(ids=[1]), fields=None, lang=None, db=_db_returning([]))
+    assert exc.value.status_code == 503
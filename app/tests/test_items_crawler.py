@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.crawlers.checkpoints import CrawlCheckpoint
+from app.crawlers.items_crawler import merge_items, update_items_catalogue, upsert_items
+from app.db.bulk import BulkSyncResult
+from app.gw2.client import Page
+from app.gw2.models import Item
+
+
+def _item(item_id, name, **kwargs):
+    defaults = {"type": "Weapon", "rarity": "Exotic", "chat_link": "[&AgEAAAA=]", "level": 80}
+    return Item(id=item_id, name=name, **{**defaults, **kwargs})
+
+
+def test_merge_items_combines_languages():
+    item_rows, detail_rows = merge_items({
+        "en": [_item(1, "Sword", description="Sharp", details={"type": "Sword"}, flags=["NoSell"])],
+        "es": [_item(1, "Espada", description="Afilada")],
+        "de": [_item(1, "Schwert")],
+        "fr": [],
+    })
+
+    content_hash = item_rows[0].pop("content_hash")
+    assert len(content_hash) == 64
+    assert item_rows == [{
+        "id": 1,
+        "item_type_id": 18,
+        "rarity_id": 5,
+        "chat_link": "[&AgEAAAA=]",
+        "icon": None,
+        "required_level": 80,
+        "vendor_value": 0,
+        "flags": ["NoSell"],
+        "name_en": "Sword", "description_en": "Sharp",
+        "name_es": "Espada", "description_es": "Afilada",
+        "name_de": "Schwert", "description_de": None,
+        # Missing translations fall back to english
+        "name_fr": "Sword", "description_fr": "Sharp",
+    }]
+    assert detail_rows == [{"item_id": 1, "details": {"type": "Sword"}}]
+
+
+def test_merge_items_hash_tracks_content():
+    def hashes(**kwargs):
+        item_rows, _ = merge_items({"en": [_item(1, "Sword", **kwargs)]})
+        return item_rows[0]["content_hash"]
+
+    assert hashes() == hashes()
+    assert hashes() != hashes(vendor_value=10)
+    assert hashes(details={"type": "Sword"}) != hashes(details={"type": "Axe"})
+
+
+def test_merge_items_skips_unknown_types():
+    item_rows, _ = merge_items({"en": [_item(1, "Thing", type="SomethingNew")]})
+    assert item_rows == []
+
+
+@pytest.mark.asyncio
+async def test_update_items_catalogue_writes_one_batch_per_chunk():
+    mock_db = AsyncMock()
+    gw2 = MagicMock()
+    gw2.get_ids = AsyncMock(return_value=[2, 1])
+
+    async def walk(endpoint, ids, chunk_size, max_in_flight, lang, model):
+        for index in range(2):
+            yield Page(index=index, items=[_item(ids[index], f"{lang}-{ids[index]}")], page_total=2, result_total=2)
+
+    gw2.iter_id_chunks = walk
+    checkpoint = CrawlCheckpoint("items")
+    checkpoint.save = AsyncMock()
+    mock_db.get.return_value = None
+    with patch("app.crawlers.items_crawler.GW2Client", return_value=gw2), \
+            patch("app.crawlers.items_crawler.CrawlCheckpoint", return_value=checkpoint), \
+            patch("app.crawlers.items_crawler.bulk_upsert", new=AsyncMock(return_value=BulkSyncResult(inserted=1))) \
+                    as mock_bulk_upsert:
+        result = await update_items_catalogue(mock_db)
+
+    assert result.inserted == 2
+    # The checkpoint is committed with every chunk
+    assert checkpoint.watermark == 2
+    assert checkpoint.save.await_count == 4
+    assert checkpoint.save.await_args.kwargs == {"status": "completed"}
+    assert mock_db.commit.await_count == 4
+    # items_cache and item_details upserts for every chunk
+    assert mock_bulk_upsert.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_upsert_items_skips_details_of_unchanged_items():
+    mock_db = AsyncMock()
+    item_rows, detail_rows = merge_items({"en": [_item(1, "Sword", details={}), _item(2, "Axe", details={})]})
+
+    with patch("app.crawlers.items_crawler.bulk_upsert",
+               new=AsyncMock(side_effect=[BulkSyncResult(updated=1, unchanged=1, changed_keys=[2]),
+                                          BulkSyncResult(updated=1)])) as mock_bulk_upsert:
+        result = await upsert_items(mock_db, item_rows, detail_rows)
+
+    assert result.changed_keys == [2]
+    assert mock_bulk_upsert.await_args_list[0].kwargs["compare_columns"] == ("content_hash",)
+    assert mock_bulk_upsert.await_args_list[1].args[2] == [{"item_id": 2, "details": {}}]
+    # The unchanged item only gets its last_fetched touched, and only once per resolution interval
+    touch = mock_db.execute.await_args.args[0]
+    assert touch.compile().params["id_1"] == [1]
+    assert "items_cache.last_fetched < now() -" in str(touch)
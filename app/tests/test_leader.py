@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.db.leader import LeaderElection, advisory_lock_key, run_as_leader
+
+
+def _engine(acquired):
+    connection = AsyncMock()
+    connection.execution_options.return_value = connection
+    lock_result = MagicMock()
+    lock_result.scalar.return_value = acquired
+    connection.execute.return_value = lock_result
+    engine = MagicMock()
+    engine.connect = AsyncMock(return_value=connection)
+    return engine, connection
+
+
+def test_advisory_lock_key_is_a_stable_bigint():
+    key = advisory_lock_key("tyriavault-scheduler")
+    assert key == advisory_lock_key("tyriavault-scheduler")
+    assert -2 ** 63 <= key < 2 ** 63
+    assert key != advisory_lock_key("other")
+
+
+@pytest.mark.asyncio
+async def test_follower_closes_its_connection():
+    engine, connection = _engine(acquired=False)
+    election = LeaderElection(engine)
+
+    await election.tick()
+
+    assert not election.is_leader
+    connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leader_keeps_the_lock_connection_and_abandons_orphan_runs():
+    engine, connection = _engine(acquired=True)
+    election = LeaderElection(engine)
+
+    await election.tick()
+
+    assert election.is_leader
+    connection.close.assert_not_awaited()
+    abandon = str(connection.execute.await_args_list[-1].args[0])
+    assert "UPDATE schema_tyriavault.crawl_runs" in abandon
+
+    # Already leading: the next tick only checks the connection
+    await election.tick()
+    engine.connect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_its_connection_dies():
+    engine, connection = _engine(acquired=True)
+    election = LeaderElection(engine)
+    await election.tick()
+
+    connection.execute.side_effect = DBAPIError("SELECT 1", None, Exception("connection closed"))
+    await election.tick()
+
+    assert not election.is_leader
+
+
+@pytest.mark.asyncio
+async def test_run_as_leader_skips_followers():
+    election = MagicMock(is_leader=False)
+    job = AsyncMock()
+
+    assert await run_as_leader(election, "job", job) is None
+    job.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_as_leader_records_failed_runs():
+    mock_db = AsyncMock()
+    mock_db.execute.return_value.scalar_one = MagicMock(return_value=7)
+
+    async def fake_get_db():
+        yield mock_db
+
+    job = AsyncMock(side_effect=RuntimeError("boom"))
+    with patch("app.db.leader.get_db", fake_get_db):
+        await run_as_leader(MagicMock(is_leader=True), "job", job)
+
+    job.assert_awaited_once_with(mock_db)
+    mock_db.rollback.assert_awaited_once()
+    finish = mock_db.execute.await_args_list[-1].args[0].compile()
+    assert finish.params["status"] == "failed"
+    assert finish.params["detail"] == "boom"
+    assert mock_db.commit.await_count == 2
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.localization import get_lang, localized_name, parse_accept_language
+
+
+def test_parse_accept_language_picks_the_preferred_supported_language():
+    assert parse_accept_language("fr-CH, fr;q=0.9, en;q=0.8") == "fr"
+    assert parse_accept_language("pt-BR, de;q=0.5, es;q=0.7") == "es"
+    assert parse_accept_language("en, de") == "en"
+    assert parse_accept_language("de;q=bad, es;q=0.1") == "es"
+    assert parse_accept_language("pt-BR, *;q=0.5") is None
+    assert parse_accept_language(None) is None
+
+
+def test_lang_parameter_wins_over_accept_language():
+    assert get_lang(lang="de", accept_language="fr") == "de"
+    assert get_lang(lang=None, accept_language="fr-FR") == "fr"
+    assert get_lang(lang=None, accept_language=None) is None
+    with pytest.raises(HTTPException) as exc:
+        get_lang(lang="pt", accept_language=None)
+    assert exc.value.status_code == 400
+
+
+def test_localized_name():
+    assert localized_name("name_fr") == "name"
+    assert localized_name("description_en") == "description"
+    assert localized_name("vendor_value") is None
+    assert localized_name("item_type_id") is None
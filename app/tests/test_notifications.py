@@ -0,0 +1,38 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.notifications import CHANGES_CHANNEL, NotificationListener, notify_changed
+
+
+@pytest.mark.asyncio
+async def test_notify_changed_is_sent_in_the_session_transaction():
+    db = AsyncMock()
+
+    await notify_changed(db, "worlds")
+
+    statement = db.execute.await_args.args[0]
+    assert "pg_notify" in str(statement)
+    assert list(statement.compile().params.values()) == [CHANGES_CHANNEL, "worlds"]
+    db.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_listener_reports_a_reset_then_every_payload():
+    async def notifies():
+        for payload in ("worlds", "items"):
+            yield MagicMock(payload=payload)
+
+    raw_connection = MagicMock()
+    raw_connection.driver_connection.notifies = notifies
+    connection = AsyncMock()
+    connection.execution_options.return_value = connection
+    connection.get_raw_connection.return_value = raw_connection
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__.return_value = connection
+    received = []
+
+    await NotificationListener(engine, on_notify=received.append).listen()
+
+    connection.exec_driver_sql.assert_awaited_once_with(f"LISTEN {CHANGES_CHANNEL}")
+    assert received == [None, "worlds", "items"]
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.gw2.rate_limiter import Priority, RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_go_before_crawler_requests():
+    limiter = RateLimiter(requests_per_minute=600, burst=1, crawler_max_concurrency=4)
+    limiter._tokens = 0.0
+    order = []
+
+    async def request(priority, name):
+        async with limiter.slot(priority):
+            order.append(name)
+
+    crawler = asyncio.create_task(request(Priority.CRAWLER, "crawler"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request(Priority.INTERACTIVE, "interactive"))
+    await asyncio.gather(crawler, interactive)
+
+    assert order == ["interactive", "crawler"]
+
+
+@pytest.mark.asyncio
+async def test_crawler_concurrency_is_bounded():
+    limiter = RateLimiter(requests_per_minute=6000, burst=100, crawler_max_concurrency=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.slot(Priority.CRAWLER):
+            peak = max(peak, limiter.crawler_in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.crawler_in_flight == 0
+
+
+def test_aimd_window_halves_on_429_and_grows_on_success():
+    limiter = RateLimiter(requests_per_minute=300, burst=10, crawler_max_concurrency=8)
+
+    limiter.observe(429, 0.1, retry_after=1)
+    assert limiter.crawler_limit == 4
+    assert limiter._tokens == 0
+
+    for _ in range(4):
+        limiter.observe(200, 0.1)
+    assert limiter.crawler_limit == pytest.approx(5, abs=0.1)
+
+
+def test_aimd_window_never_exceeds_maximum():
+    limiter = RateLimiter(requests_per_minute=300, burst=10, crawler_max_concurrency=3)
+
+    for _ in range(20):
+        limiter.observe(200, 0.1)
+
+    assert limiter.crawler_limit == 3
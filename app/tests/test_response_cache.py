@@ -0,0 +1,87 @@
+import gzip
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.requests import Request
+
+from app.api.response_cache import PrecomputedResponse, PrecomputedResponseCache
+
+
+def make_request(headers: dict | None = None) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/",
+                    "headers": [(name.encode(), value.encode()) for name, value in (headers or {}).items()]})
+
+
+def test_precomputed_response_is_serialized_once_with_a_stable_etag():
+    entry = PrecomputedResponse.from_content([{"id": 1, "name_fr": "Mer de Jade"}])
+
+    assert entry.body == b'[{"id":1,"name_fr":"Mer de Jade"}]'
+    assert gzip.decompress(entry.gzip_body) == entry.body
+    assert entry.etag == PrecomputedResponse.from_content([{"id": 1, "name_fr": "Mer de Jade"}]).etag
+    assert entry.etag != PrecomputedResponse.from_content([{"id": 2, "name_fr": "Mer de Jade"}]).etag
+    assert entry.matches(f'"other", W/{entry.etag}')
+    assert entry.matches("*")
+    assert not entry.matches(None)
+
+
+@pytest.mark.asyncio
+async def test_cache_builds_once_until_invalidated():
+    cache = PrecomputedResponseCache(ttl=600)
+    build = AsyncMock(side_effect=[["v1"], ["v2"]])
+
+    first = await cache.get("worlds", build)
+    assert await cache.get("worlds", build) is first
+    assert build.await_count == 1
+
+    cache.invalidate("worlds")
+    assert (await cache.get("worlds", build)).body == b'["v2"]'
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_after_ttl():
+    cache = PrecomputedResponseCache(ttl=0)
+    build = AsyncMock(return_value=[])
+
+    await cache.get("worlds", build)
+    await cache.get("worlds", build)
+
+    assert build.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_build_racing_an_invalidation_is_not_kept():
+    cache = PrecomputedResponseCache(ttl=600)
+
+    async def build():
+        # The data changes while the response is being built
+        cache.invalidate()
+        return ["stale"]
+
+    await cache.get("worlds", build)
+
+    assert cache.peek("worlds") is None
+
+
+def test_respond_serves_gzip_and_not_modified():
+    entry = PrecomputedResponse.from_content({"a": 1})
+
+    plain = PrecomputedResponseCache.respond(make_request(), entry)
+    assert (plain.status_code, plain.body) == (200, b'{"a":1}')
+    assert plain.headers["etag"] == entry.etag
+
+    compressed = PrecomputedResponseCache.respond(make_request({"accept-encoding": "gzip, br"}), entry)
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.body == entry.gzip_body
+    # Each representation has its own ETag
+    assert compressed.headers["etag"] == entry.gzip_etag != entry.etag
+
+    not_modified = PrecomputedResponseCache.respond(make_request({"if-none-match": entry.etag}), entry)
+    assert (not_modified.status_code, not_modified.body) == (304, b"")
+
+    # The identity ETag does not validate the gzipped representation
+    changed_encoding = PrecomputedResponseCache.respond(
+        make_request({"if-none-match": entry.etag, "accept-encoding": "gzip"}), entry)
+    assert changed_encoding.status_code == 200
+    not_modified = PrecomputedResponseCache.respond(
+        make_request({"if-none-match": entry.gzip_etag, "accept-encoding": "gzip"}), entry)
+    assert not_modified.status_code == 304
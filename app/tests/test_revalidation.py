@@ -0,0 +1,90 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.crawlers.revalidation import plan_stalest, revalidate_items
+from app.db.bulk import BulkSyncResult
+from app.db.model import ItemsCache
+from app.gw2.models import Item
+
+
+def _item(item_id):
+    return Item(id=item_id, name=f"Item {item_id}", type="Weapon", rarity="Exotic", chat_link="", level=80)
+
+
+@pytest.mark.asyncio
+async def test_plan_stalest_orders_by_last_fetched():
+    mock_db = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [3, 1]
+    mock_db.execute.return_value = result
+
+    ids = await plan_stalest(mock_db, ItemsCache, 400, datetime.timedelta(hours=24))
+
+    assert ids == [3, 1]
+    statement = str(mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "WHERE schema_tyriavault.items_cache.last_fetched <" in statement
+    assert "ORDER BY schema_tyriavault.items_cache.last_fetched, schema_tyriavault.items_cache.id" in statement
+    assert "LIMIT" in statement
+
+
+@pytest.mark.asyncio
+async def test_revalidate_items_respects_request_budget():
+    mock_db = AsyncMock()
+
+    async def chunks(gw2, ids, max_in_flight):
+        # Item 2 disappeared from the API
+        yield {"en": [_item(1)]}
+
+    with patch("app.crawlers.revalidation.plan_stalest", new=AsyncMock(return_value=[1, 2])) as mock_plan, \
+            patch("app.crawlers.revalidation.GW2Client"), \
+            patch("app.crawlers.revalidation.iter_item_chunks", new=chunks), \
+            patch("app.crawlers.revalidation.upsert_items",
+                  new=AsyncMock(return_value=BulkSyncResult(unchanged=1))), \
+            patch("app.crawlers.revalidation.touch_items", new=AsyncMock()) as mock_touch:
+        result = await revalidate_items(mock_db, request_budget=9, time_budget_seconds=60,
+                                        min_age=datetime.timedelta(hours=1))
+
+    # 9 requests afford 2 chunks of 4 languages
+    assert mock_plan.await_args.args[2] == 400
+    assert result.unchanged == 1
+    mock_touch.assert_awaited_once_with(mock_db, [2])
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_revalidate_items_without_stale_rows_does_not_call_the_api():
+    with patch("app.crawlers.revalidation.plan_stalest", new=AsyncMock(return_value=[])), \
+            patch("app.crawlers.revalidation.GW2Client") as mock_client:
+        result = await revalidate_items(AsyncMock(), request_budget=200, time_budget_seconds=60,
+                                        min_age=datetime.timedelta(hours=1))
+
+    assert result == BulkSyncResult()
+    mock_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_revalidate_items_stops_the_look_ahead_once_the_time_budget_is_spent():
+    closed = []
+
+    async def localized_chunks(gw2, endpoint, ids, languages, max_in_flight, model=None):
+        try:
+            for item_id in ids:
+                yield {"en": [_item(item_id)]}
+        finally:
+            # Where the prefetched chunk requests get cancelled
+            closed.append(True)
+
+    with patch("app.crawlers.revalidation.plan_stalest", new=AsyncMock(return_value=[1, 2, 3])), \
+            patch("app.crawlers.revalidation.GW2Client"), \
+            patch("app.crawlers.items_crawler.iter_localized_chunks", new=localized_chunks), \
+            patch("app.crawlers.revalidation.upsert_items", new=AsyncMock(return_value=BulkSyncResult(unchanged=1))), \
+            patch("app.crawlers.revalidation.touch_items", new=AsyncMock()):
+        result = await revalidate_items(AsyncMock(), request_budget=200, time_budget_seconds=0,
+                                        min_age=datetime.timedelta(hours=1))
+
+    assert result.unchanged == 1
+    # Closed before revalidate_items returns, not whenever the generator gets finalized
+    assert closed == [True]
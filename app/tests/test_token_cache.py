@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from app.core.token_cache import RejectedToken, TokenCache, ValidatedToken, token_hash
+
+
+def test_tokens_are_stored_hashed_and_evicted_least_recently_used_first():
+    cache = TokenCache(max_entries=2, ttl=300, negative_ttl=30)
+    cache.store("a", 1, ["account"], None)
+    cache.store("b", 2, ["account"], 10)
+    assert isinstance(cache.lookup("a"), ValidatedToken)  # "a" becomes the most recently used
+
+    cache.store("c", 3, ["account"], None)
+
+    assert "a" not in cache._entries and token_hash("a") in cache._entries
+    assert cache.lookup("b") is None
+    assert cache.lookup("a").api_key_id == 1
+    assert cache.lookup("c").api_key_id == 3
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 3, "misses": 1}
+
+
+def test_rejected_tokens_expire_sooner_than_valid_ones():
+    cache = TokenCache(max_entries=10, ttl=300, negative_ttl=30)
+    with patch("app.core.token_cache.time.monotonic", return_value=1000.0):
+        cache.store("good", 1, ["account"], None)
+        cache.reject("bad", 401, "Missing or invalid token.")
+
+    with patch("app.core.token_cache.time.monotonic", return_value=1029.0):
+        assert cache.lookup("bad") == RejectedToken(401, "Missing or invalid token.", expires_at=1030.0)
+    with patch("app.core.token_cache.time.monotonic", return_value=1030.0):
+        assert cache.lookup("bad") is None
+        assert cache.lookup("good") is not None
+    with patch("app.core.token_cache.time.monotonic", return_value=1300.0):
+        assert cache.lookup("good") is None
+    assert len(cache) == 0
+
+
+def test_change_notifications_drop_one_token_or_all():
+    cache = TokenCache(max_entries=10, ttl=300, negative_ttl=30)
+    cache.store("a", 1, ["account"], None)
+    cache.reject("b", 403, "Missing or unauthorized token.")
+
+    payload = TokenCache.changed_payload("b")
+    assert payload == TokenCache.NOTIFICATION_PREFIX + token_hash("b")
+    cache.invalidate_hash(payload.removeprefix(TokenCache.NOTIFICATION_PREFIX))
+    assert cache.lookup("b") is None and cache.lookup("a") is not None
+
+    cache.invalidate_hash(None)
+    assert len(cache) == 0
+
+
+def test_rejection_notifications_refuse_the_token():
+    cache = TokenCache(max_entries=10, ttl=300, negative_ttl=30)
+    cache.store("a", 1, ["account"], None)
+
+    cache.reject_notified(TokenCache.rejected_payload("a", 401))
+
+    entry = cache.lookup("a")
+    assert isinstance(entry, RejectedToken)
+    assert (entry.status_code, entry.detail) == (401, "Missing or invalid token.")
@@ -0,0 +1,67 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.crawlers.wallet_crawler import fetch_wallets, update_wallets, write_wallets
+from app.db.bulk import BulkSyncResult
+from app.gw2.models import WalletEntry
+
+NOW = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_write_wallets_appends_history_for_changed_balances_only():
+    wallets = {10: [WalletEntry(1, 500), WalletEntry(2, 3), WalletEntry(999, 1)], 11: [WalletEntry(1, 7)]}
+
+    with patch("app.crawlers.wallet_crawler.bulk_upsert",
+               new=AsyncMock(return_value=BulkSyncResult(updated=1, unchanged=2, changed_keys=[(1, 10)]))) \
+            as mock_bulk_upsert, \
+            patch("app.crawlers.wallet_crawler.copy_rows", new=AsyncMock(return_value=1)) as mock_copy_rows:
+        changed, unchanged, history_rows = await write_wallets(AsyncMock(), wallets, {1, 2}, NOW)
+
+    # Currency 999 is unknown and left out
+    assert mock_bulk_upsert.await_args.args[2] == [
+        {"currency_id": 1, "game_account_id": 10, "amount": 500},
+        {"currency_id": 2, "game_account_id": 10, "amount": 3},
+        {"currency_id": 1, "game_account_id": 11, "amount": 7},
+    ]
+    assert mock_bulk_upsert.await_args.kwargs["key_columns"] == ("currency_id", "game_account_id")
+    assert list(mock_copy_rows.await_args.args[3]) == [(10, 1, NOW, 500)]
+    assert (changed, unchanged, history_rows) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_fetch_wallets_skips_failed_accounts():
+    request = httpx.Request("GET", "https://gw2.test/v2/account/wallet")
+    revoked = httpx.HTTPStatusError("401", request=request, response=httpx.Response(401, request=request))
+    clients = {
+        "valid": MagicMock(get_wallet=AsyncMock(return_value=[WalletEntry(1, 5)])),
+        "revoked": MagicMock(get_wallet=AsyncMock(side_effect=revoked)),
+    }
+
+    with patch("app.crawlers.wallet_crawler.GW2Client", side_effect=lambda api_key, priority: clients[api_key]):
+        wallets = await fetch_wallets([(1, "valid"), (2, "revoked")], concurrency=2)
+
+    assert wallets == {1: [WalletEntry(1, 5)]}
+
+
+@pytest.mark.asyncio
+async def test_update_wallets_commits_one_transaction_per_batch():
+    mock_db = AsyncMock()
+    currencies = MagicMock()
+    currencies.scalars.return_value.all.return_value = [1]
+    mock_db.execute.return_value = currencies
+    keys = [(game_account_id, f"key-{game_account_id}") for game_account_id in range(5)]
+
+    with patch("app.crawlers.wallet_crawler.select_wallet_keys", new=AsyncMock(return_value=keys)), \
+            patch("app.crawlers.wallet_crawler.fetch_wallets",
+                  new=AsyncMock(side_effect=lambda batch, concurrency: {batch[0][0]: []})), \
+            patch("app.crawlers.wallet_crawler.write_wallets", new=AsyncMock(return_value=(2, 1, 2))):
+        result = await update_wallets(mock_db, batch_size=2)
+
+    assert mock_db.commit.await_count == 3
+    assert result.accounts == 3
+    assert result.failed == 2
+    assert result.history_rows == 6
@@ -3,9 +3,15 @@ from unittest.mock import AsyncMock, patch, MagicMock
 import pytest
 import pytest_asyncio
 from fastapi import HTTPException
+from starlette.requests import Request
 
+from app.api.response_cache import PrecomputedResponseCache
 from app.api.v1 import worlds
-from app.db.model import Worlds
+
+
+def make_request(headers: dict | None = None) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/v1/worlds/",
+                    "headers": [(name.encode(), value.encode()) for name, value in (headers or {}).items()]})
 
 
 @pytest_asyncio.fixture
@@ -18,17 +24,78 @@ def mock_db():
 async def test_get_worlds_from_db(mock_db):
     # Simulate worlds existing in the database
     mock_result = MagicMock()
-    world_obj = Worlds(id=1, name_es="World1ES", name_en="World1EN", name_fr="World1FR", name_de="World1DE")
-    mock_result.scalars.return_value.all.return_value = [world_obj]
+    world_row = {"id": 1, "name_es": "World1ES", "name_fr": "World1FR", "name_en": "World1EN", "name_de": "World1DE"}
+    mock_result.mappings.return_value.all.return_value = [world_row]
     mock_db.execute.return_value = mock_result
 
-    result = await worlds.get_worlds(mock_db)
-    assert len(result) == 1
-    assert result[0].id == world_obj.id
-    assert result[0].name_es == world_obj.name_es
-    assert result[0].name_en == world_obj.name_en
-    assert result[0].name_fr == world_obj.name_fr
-    assert result[0].name_de == world_obj.name_de
+    result = await worlds.load_worlds(mock_db)
+    assert result == [world_row]
+    # Only the columns of the response are selected, as plain rows
+    statement = mock_db.execute.await_args.args[0]
+    assert [column.name for column in statement.selected_columns] == list(world_row)
+
+
+@pytest.mark.asyncio
+async def test_get_worlds_is_served_from_the_response_cache(mock_db):
+    mock_result = MagicMock()
+    mock_result.mappings.return_value.all.return_value = [
+        {"id": 1, "name_es": "World1ES", "name_fr": "World1FR", "name_en": "World1EN", "name_de": "World1DE"}
+    ]
+    mock_db.execute.return_value = mock_result
+
+    with patch("app.api.v1.worlds.response_cache", PrecomputedResponseCache(ttl=600)):
+        response = await worlds.get_worlds(make_request(), lang=None, db=mock_db)
+        assert response.status_code == 200
+        assert b'"name_en":"World1EN"' in response.body
+
+        # The client already has this version: 304, and no new query
+        not_modified = await worlds.get_worlds(make_request({"if-none-match": response.headers["etag"]}), lang=None,
+                                              db=mock_db)
+        assert not_modified.status_code == 304
+    mock_db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_worlds_in_one_language(mock_db):
+    mock_result = MagicMock()
+    mock_result.mappings.return_value.all.return_value = [{"id": 1, "name": "World1FR"}]
+    mock_db.execute.return_value = mock_result
+
+    with patch("app.api.v1.worlds.response_cache", PrecomputedResponseCache(ttl=600)) as cache:
+        response = await worlds.get_worlds(make_request(), lang="fr", db=mock_db)
+        assert response.body == b'[{"id":1,"name":"World1FR"}]'
+        assert "Accept-Language" in response.headers["vary"]
+        assert cache.peek("worlds:fr") is not None and cache.peek("worlds") is None
+
+        # Invalidating the worlds drops every language
+        cache.invalidate("worlds")
+        assert cache.peek("worlds:fr") is None
+
+    # Only the requested language is read
+    statement = mock_db.execute.await_args.args[0]
+    assert [column.name for column in statement.selected_columns] == ["id", "name"]
+    assert "worlds.name_fr AS name" in str(statement)
+
+
+@pytest.mark.asyncio
+@patch("app.api.v1.worlds.GW2Client")
+@patch("app.api.v1.worlds.get_worlds_info_from_api")
+async def test_get_worlds_flags_stale_gw2_data(mock_get_worlds_info_from_api, mock_GW2Client, mock_db):
+    mock_result = MagicMock()
+    mock_result.mappings.return_value.all.return_value = []
+    mock_db.execute.return_value = mock_result
+    mock_get_worlds_info_from_api.return_value = [
+        {"id": 2, "name_es": "World2ES", "name_en": "World2EN", "name_fr": "World2FR", "name_de": "World2DE"}
+    ]
+    # Last known good response, served while the GW2 circuit is open
+    mock_GW2Client.return_value = MagicMock(last_response_stale=True)
+
+    with patch("app.api.v1.worlds.response_cache", PrecomputedResponseCache(ttl=600)) as cache:
+        response = await worlds.get_worlds(make_request(), lang="en", db=mock_db)
+        assert response.body == b'[{"id":2,"name":"World2EN"}]'
+        assert response.headers["warning"] == '110 - "Response is Stale"'
+        assert cache.peek("worlds:en") is None
+    mock_db.add.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -37,16 +104,16 @@ async def test_get_worlds_from_db(mock_db):
 async def test_get_worlds_from_api(mock_get_worlds_info_from_api, mock_GW2Client, mock_db):
     # Simulate no worlds in the database
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = []
+    mock_result.mappings.return_value.all.return_value = []
     mock_db.execute.return_value = mock_result
     # Simulate worlds returned from the API
     mock_get_worlds_info_from_api.return_value = [
         {"id": 2, "name_es": "World2ES", "name_en": "World2EN", "name_fr": "World2FR", "name_de": "World2DE"}
     ]
     # Simulate GW2Client instance
-    mock_GW2Client.return_value = MagicMock()
+    mock_GW2Client.return_value = MagicMock(last_response_stale=False)
 
-    result = await worlds.get_worlds(mock_db)
+    result = await worlds.load_worlds(mock_db)
     assert result == [
         {"id": 2, "name_es": "World2ES", "name_en": "World2EN", "name_fr": "World2FR", "name_de": "World2DE"}
     ]
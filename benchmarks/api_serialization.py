@@ -0,0 +1,160 @@
+# Requests per second of /account/, /common/tokeninfo and /worlds/ before (ORM objects serialized through
+# jsonable_encoder and the stdlib json JSONResponse) and after (load_only / Core rows, Pydantic response models,
+# msgspec rendering, precomputed /worlds/ response).
+#
+# The database is replaced by an in-memory fake session, so only the request handling and serialization are
+# measured.
+#
+# Usage: python -m benchmarks.api_serialization [--requests 2000] [--worlds 50]
+import argparse
+import asyncio
+import datetime
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Header
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import MsgspecJSONResponse
+from app.api.v1 import api_router
+from app.core.utils import split_bearer_token
+from app.crawlers.account_sync import mark_api_key_used
+from app.db.dependency import get_db
+from app.db.model import ApiKeys, GameAccounts, Worlds
+
+TOKEN = "00000000-0000-0000-0000-000000000000"
+NOW = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows: list, mappings: list[dict] | None = None):
+        self._rows = rows
+        self._mappings = mappings or []
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+    def mappings(self):
+        return _Result(self._mappings)
+
+
+class FakeSession:
+    """Answers the few statements of the benchmarked routes from memory."""
+
+    def __init__(self, worlds: int):
+        self.api_key = ApiKeys(id=1, api_key=TOKEN, permissions=["account", "wallet", "characters"],
+                               game_account_id=1, last_time_checked=NOW, last_used=NOW)
+        self.game_account = GameAccounts(id=1, account_name="Tester.1234", world_id=2001, creation_date=NOW,
+                                         fractal_level=100, last_modified=NOW)
+        self.world_rows = [
+            {"id": 1000 + i, "name_es": f"Mundo {i}", "name_fr": f"Monde {i}", "name_en": f"World {i}",
+             "name_de": f"Welt {i}"}
+            for i in range(worlds)
+        ]
+        self.worlds = [Worlds(**row) for row in self.world_rows]
+
+    async def execute(self, statement, params=None):
+        if not hasattr(statement, "column_descriptions"):
+            return _Result([])  # UPDATE of api_keys.last_used
+        entity = statement.column_descriptions[0]["entity"]
+        if entity is ApiKeys and len(statement.column_descriptions) > 1:
+            # ACCOUNT_BY_TOKEN_QUERY: a few api_keys columns and the linked account
+            key = self.api_key
+            return _Result([SimpleNamespace(id=key.id, permissions=key.permissions,
+                                            game_account_id=key.game_account_id,
+                                            last_time_checked=key.last_time_checked,
+                                            GameAccounts=self.game_account)])
+        if entity is ApiKeys:
+            return _Result([self.api_key])
+        if entity is GameAccounts:
+            return _Result([self.game_account])
+        return _Result(self.worlds, self.world_rows)
+
+    async def get(self, entity, ident, options=None):
+        # The account of a token already in the token cache
+        return self.game_account if entity is GameAccounts and ident == self.game_account.id else None
+
+    async def commit(self):
+        pass
+
+
+def _legacy_router() -> APIRouter:
+    # The handlers as they were before the response models: same statements, but whole ORM entities returned
+    # as is and serialized by jsonable_encoder
+    router = APIRouter()
+
+    @router.get("/common/tokeninfo")
+    async def tokeninfo(authorization: str = Header(...), db: AsyncSession = Depends(get_db)):
+        token = split_bearer_token(authorization)
+        return (await db.execute(select(ApiKeys).filter(ApiKeys.api_key == token))).scalars().first()
+
+    @router.get("/account/")
+    async def account(authorization: str = Header(...), db: AsyncSession = Depends(get_db)):
+        token = split_bearer_token(authorization)
+        await mark_api_key_used(db, token)
+        await db.commit()
+        result = await db.execute(
+            select(GameAccounts)
+            .join(ApiKeys, GameAccounts.id == ApiKeys.game_account_id)
+            .filter(ApiKeys.api_key == token)
+        )
+        return result.scalars().first()
+
+    @router.get("/worlds/")
+    async def worlds(db: AsyncSession = Depends(get_db)):
+        return (await db.execute(select(Worlds))).scalars().all()
+
+    return router
+
+
+def _app(router: APIRouter, session: FakeSession, **kwargs) -> FastAPI:
+    app = FastAPI(**kwargs)
+    app.include_router(router, prefix="/api/v1")
+
+    async def fake_db():
+        yield session
+
+    app.dependency_overrides[get_db] = fake_db
+    return app
+
+
+async def _requests_per_second(app: FastAPI, path: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path, headers=headers)
+        return requests / (time.perf_counter() - start)
+
+
+async def run(args):
+    session = FakeSession(args.worlds)
+    before = _app(_legacy_router(), session)
+    after = _app(api_router, session, default_response_class=MsgspecJSONResponse)
+
+    print(f"{'route':<24}{'before':>12}{'after':>12}")
+    for path in ("/api/v1/account/", "/api/v1/common/tokeninfo", "/api/v1/worlds/"):
+        before_rps = await _requests_per_second(before, path, args.requests)
+        after_rps = await _requests_per_second(after, path, args.requests)
+        print(f"{path:<24}{before_rps:>10,.0f}/s{after_rps:>10,.0f}/s  x{after_rps / before_rps:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API serialization throughput, before and after response models")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--worlds", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Throughput of GW2Client (retries, rate limiter, cache) against the in-process fake GW2 API under a
+# configurable failure profile.
+#
+# Usage: python -m benchmarks.fake_gw2_throughput [--requests 500] [--rate-limit-ratio 0.05] ...
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.gw2 import client as gw2_client
+from app.gw2.client import GW2Client
+from app.gw2.fake_server import FaultConfig, create_fake_gw2_app
+from app.gw2.rate_limiter import Priority, RateLimiter
+
+
+async def run(args):
+    faults = FaultConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit_ratio=args.rate_limit_ratio,
+                         retry_after=0, server_error_ratio=args.server_error_ratio, seed=args.seed)
+    fake = create_fake_gw2_app(faults=faults)
+    gw2_client._gw2_http_client = httpx.AsyncClient(base_url="http://fake-gw2/v2",
+                                                    transport=httpx.ASGITransport(app=fake))
+    gw2_client._gw2_rate_limiter = RateLimiter(requests_per_minute=args.requests_per_minute, burst=args.burst,
+                                               crawler_max_concurrency=args.concurrency)
+    gw2 = GW2Client(priority=Priority.CRAWLER, max_retries=10, backoff_factor=0.01)
+
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        try:
+            # A distinct id set per call, so neither the cache nor single-flight short-circuits it
+            await gw2.get_items([19721, 19976, 1_000_000 + index])
+        except Exception:
+            failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await gw2_client.shutdown_gw2_client()
+
+    upstream = fake.state.request_count
+    print(f"{args.requests} calls in {elapsed:.2f}s -> {args.requests / elapsed:,.0f} calls/s")
+    print(f"upstream requests: {upstream} ({upstream - args.requests} retries), failed calls: {failures}")
+    print(f"final crawler concurrency window: {gw2.rate_limiter.crawler_limit:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GW2Client throughput against the fake GW2 API")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.05)
+    parser.add_argument("--server-error-ratio", type=float, default=0.02)
+    parser.add_argument("--requests-per-minute", type=int, default=6000)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Payload size and requests per second of /worlds/ and /items/ with every language (no `lang`, the default)
+# and with a single language (`lang=en`, flat `name` / `description` fields).
+#
+# The database is replaced by an in-memory fake session which only returns the selected columns,
+# so the measures cover the request handling and serialization of the projected rows.
+#
+# Usage: python -m benchmarks.localized_payloads [--requests 1000] [--worlds 50] [--items 500]
+import argparse
+import asyncio
+import gzip
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.response_cache import response_cache
+from app.api.responses import MsgspecJSONResponse
+from app.api.v1 import api_router
+from app.db.dependency import get_db
+from app.db.model import Worlds
+
+LANGUAGES = {"en": "Sword", "es": "Espada", "de": "Schwert", "fr": "Épée"}
+
+
+class _Result:
+    def __init__(self, rows: list[dict]):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Answers the worlds and items selects from memory, with the selected (and labeled) columns only."""
+
+    def __init__(self, worlds: int, items: int):
+        self.worlds = [
+            {"id": 1000 + i, **{f"name_{lang}": f"{name} {i}" for lang, name in LANGUAGES.items()}}
+            for i in range(worlds)
+        ]
+        self.items = [
+            {"id": i, "item_type_id": 18, "rarity_id": 6, "last_fetched": None, "chat_link": "[&AgEAAAA=]",
+             "icon": f"https://render.guildwars2.com/file/{i:032X}/{i}.png", "required_level": 80,
+             "vendor_value": 330, "flags": ["HideSuffix", "NoSalvage"],
+             **{f"name_{lang}": f"{name} {i}" for lang, name in LANGUAGES.items()},
+             **{f"description_{lang}": f"{name} {i}: " + "lorem ipsum " * 8 for lang, name in LANGUAGES.items()}}
+            for i in range(1, items + 1)
+        ]
+
+    async def execute(self, statement, params=None):
+        rows = self.worlds if statement.column_descriptions[0]["entity"] is Worlds else self.items
+        # (output key, source column) of every selected column, e.g. ("name", "name_en")
+        columns = [(column.key, getattr(column, "element", column).name) for column in statement.selected_columns]
+        return _Result([{key: row[source] for key, source in columns} for row in rows])
+
+    async def commit(self):
+        pass
+
+
+async def _measure(client: httpx.AsyncClient, path: str, requests: int) -> tuple[int, int, float]:
+    response = await client.get(path, headers={"Accept-Encoding": "identity"})
+    response.raise_for_status()
+    size = len(response.content)
+    gzip_size = len(gzip.compress(response.content))
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path, headers={"Accept-Encoding": "identity"})
+    return size, gzip_size, requests / (time.perf_counter() - start)
+
+
+async def run(args):
+    session = FakeSession(args.worlds, args.items)
+    app = FastAPI(default_response_class=MsgspecJSONResponse)
+    app.include_router(api_router, prefix="/api/v1")
+
+    async def fake_db():
+        yield session
+
+    app.dependency_overrides[get_db] = fake_db
+    response_cache.invalidate()
+
+    print(f"{'route':<36}{'bytes':>10}{'gzip':>10}{'req/s':>10}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ("/api/v1/worlds/", f"/api/v1/items/?limit={args.items}"):
+            baseline = None
+            for query in ("", "lang=en"):
+                url = path + ("&" if "?" in path else "?") + query if query else path
+                size, gzip_size, rps = await _measure(client, url, args.requests)
+                ratio = f"  x{baseline / size:.2f} smaller" if baseline else ""
+                baseline = baseline or size
+                print(f"{url:<36}{size:>10,}{gzip_size:>10,}{rps:>9,.0f}/s{ratio}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload size and throughput with and without a language")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--worlds", type=int, default=50)
+    parser.add_argument("--items", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+-- Content hash of the items and achievements (change detection of the crawlers).
+-- Base.metadata.create_all does not add columns to existing tables, run this once on databases created before.
+-- Existing rows keep a NULL hash: the next crawl sees them as changed and rewrites them once.
+ALTER TABLE schema_tyriavault.items_cache ADD COLUMN IF NOT EXISTS content_hash char(64);
+
+ALTER TABLE schema_tyriavault.achievements ADD COLUMN IF NOT EXISTS content_hash char(64);
+
+COMMENT ON COLUMN schema_tyriavault.items_cache.content_hash IS 'SHA-256 of the normalized upstream payload';
+
+COMMENT ON COLUMN schema_tyriavault.achievements.content_hash IS 'SHA-256 of the normalized upstream payload';
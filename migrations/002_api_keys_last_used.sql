@@ -0,0 +1,6 @@
+-- Last request of a user with a key, read by the account sync scheduler.
+-- Base.metadata.create_all does not add columns to existing tables, run this once on databases created before:
+-- without it every query selecting ApiKeys fails (tokeninfo, /account/, the account sync tick).
+ALTER TABLE schema_tyriavault.api_keys ADD COLUMN IF NOT EXISTS last_used timestamptz;
+
+COMMENT ON COLUMN schema_tyriavault.api_keys.last_used IS 'Last request of a user with this key, with a few minutes precision';
@@ -0,0 +1,26 @@
+-- One bank row per slot instead of one per account (synced by slot with sync_rows).
+-- Base.metadata.create_all does not alter existing tables, run this once on databases created before:
+-- without it the bank sync fails, ON CONFLICT (game_account_id, slot) has no matching constraint.
+BEGIN;
+
+-- The old rows have no slot, and nothing wrote them before the slot sync. The next sync of a changed account
+-- writes its slots again
+TRUNCATE schema_tyriavault.bank;
+
+ALTER TABLE schema_tyriavault.bank DROP CONSTRAINT IF EXISTS unq_bank_game_account_id;
+
+ALTER TABLE schema_tyriavault.bank ALTER COLUMN id TYPE bigint;
+
+ALTER TABLE schema_tyriavault.bank ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY ( START WITH 0 INCREMENT BY 1 MINVALUE 0 );
+
+ALTER TABLE schema_tyriavault.bank ADD COLUMN slot integer NOT NULL;
+
+ALTER TABLE schema_tyriavault.bank ADD CONSTRAINT unq_bank_slot UNIQUE ( game_account_id, slot );
+
+ALTER TABLE schema_tyriavault.bank ADD CONSTRAINT fk_bank_game_accounts FOREIGN KEY ( game_account_id ) REFERENCES schema_tyriavault.game_accounts( id ) ON DELETE CASCADE ON UPDATE CASCADE;
+
+COMMENT ON TABLE schema_tyriavault.bank IS 'Non empty bank slots of a given game account';
+
+COMMENT ON COLUMN schema_tyriavault.bank.slot IS 'Position of the slot in the bank, from 0';
+
+COMMIT;